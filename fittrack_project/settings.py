@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     'workouts',
     'goals',
     'users',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -98,6 +99,16 @@ DATABASES = {
     )
 }
 
+# Per-process cache. Entries that must agree across gunicorn workers are keyed
+# by version counters kept in the database (users.CacheVersion), so a bump in
+# one process is seen by all and an evicted entry is simply recomputed.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -141,6 +152,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Rendered PDF exports (private, served through the export views only)
+EXPORTS_ROOT = BASE_DIR / 'exports'
+
 # Authentication
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
@@ -154,6 +168,16 @@ AUTHENTICATION_BACKENDS = [
     'allauth.account.auth_backends.AuthenticationBackend',
 ]
 
+# Background job queue (see jobs app and `manage.py run_worker`)
+JOB_QUEUE = {
+    'CONCURRENCY': config('JOB_CONCURRENCY', default=2, cast=int),
+    'POOL': config('JOB_POOL', default='thread'),  # 'thread' or 'process'
+    'POLL_INTERVAL': config('JOB_POLL_INTERVAL', default=2, cast=float),
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 10,  # seconds, doubled after each failed attempt
+    'LOCK_TIMEOUT': 15 * 60,  # seconds before a running task is assumed lost
+}
+
 # Static files configuration for production
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -20,10 +20,16 @@ urlpatterns = [
     # PDF Exports
     path('workouts/export-pdf/', workout_views.export_workouts_pdf, name='export_workouts_pdf'),
     path('goals/export-pdf/', goal_views.export_goals_pdf, name='export_goals_pdf'),
+    path('exports/<str:kind>/', workout_views.export_status, name='export_status'),
+
+    # Data exports
+    path('workouts/export/<str:file_format>/', workout_views.export_workouts_data, name='export_workouts_data'),
 
     path('workouts/', workout_views.workout_list, name='workout_list'),
     path('workouts/<int:pk>/', workout_views.workout_detail, name='workout_detail'),
     path('workouts/new/', workout_views.workout_create, name='workout_create'),
+    path('workouts/import/', workout_views.workout_import, name='workout_import'),
+    path('workouts/sync/', workout_views.workout_sync, name='workout_sync'),
     path('workouts/<int:pk>/edit/', workout_views.workout_update, name='workout_update'),
     path('workouts/<int:pk>/delete/', workout_views.workout_delete, name='workout_delete'),
 
@@ -37,10 +43,12 @@ urlpatterns = [
     path('templates/', workout_views.template_list, name='template_list'),
     path('workouts/<int:pk>/save-as-template/', workout_views.save_as_template, name='save_as_template'),
     path('templates/<int:pk>/use/', workout_views.use_template, name='use_template'),
+    path('templates/<int:pk>/schedule/', workout_views.schedule_template, name='schedule_template'),
     path('templates/<int:pk>/delete/', workout_views.template_delete, name='template_delete'),
 
     # Calendar View
     path('calendar/', workout_views.workout_calendar, name='workout_calendar'),
+    path('calendar/<str:token>/workouts.ics', workout_views.workout_calendar_feed, name='workout_calendar_feed'),
 
     # Goals View
     path('goals/', goal_views.goal_list, name='goal_list'),
@@ -1,59 +1,123 @@
+from dataclasses import dataclass
+
 from django.contrib import messages
+from django.core.cache import cache
+
 from .models import Badge
-from workouts.models import Workout, Exercise
+from users.cache_utils import user_cache_key
+from users.stats_utils import rebuild_user_stats, sync_badge_count
+
+
+# Events that can trigger a badge check
+WORKOUT_CREATED = 'workout_created'
+WORKOUT_DELETED = 'workout_deleted'
+GOAL_COMPLETED = 'goal_completed'
+EXERCISE_CREATED = 'exercise_created'
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    """A badge is earned once `metric` reaches `threshold` after one of `events`"""
+    badge_type: str
+    metric: str
+    threshold: int
+    events: tuple
+
+
+# Evaluated in this order, so newly earned badges are announced in this order too.
+# Deleting a workout only lowers metrics, so no rule listens to WORKOUT_DELETED.
+BADGE_RULES = [
+    BadgeRule('first_workout', 'workout_count', 1, (WORKOUT_CREATED,)),  # 🎯 First Workout
+    BadgeRule('10_workouts', 'workout_count', 10, (WORKOUT_CREATED,)),  # 💪 10 Workouts
+    BadgeRule('50_workouts', 'workout_count', 50, (WORKOUT_CREATED,)),  # 🚀 50 Workouts
+    BadgeRule('first_goal', 'completed_goal_count', 1, (GOAL_COMPLETED,)),  # ⭐ First Goal
+    BadgeRule('custom_exercise', 'custom_exercise_count', 1, (EXERCISE_CREATED,)),  # ✨ Custom Exercise
+    BadgeRule('7_day_streak', 'current_streak', 7, (WORKOUT_CREATED,)),  # 🔥 7-Day Streak
+    BadgeRule('30_day_streak', 'current_streak', 30, (WORKOUT_CREATED,)),  # 👑 30-Day Streak
+]
+
+EARNED_CACHE_TIMEOUT = 60 * 60
+
+
+def earned_cache_key(user):
+    return user_cache_key(user, 'badges', 'earned')
 
 
-def check_and_award_badges(user, request=None):
+def load_earned_badge_types(user):
+    """Load the set of badge types a user has earned and refresh the cache"""
+    earned = set(Badge.objects.filter(user=user).values_list('badge_type', flat=True))
+    cache.set(earned_cache_key(user), earned, EARNED_CACHE_TIMEOUT)
+    return earned
+
+
+def get_badge_metrics(user, metrics):
+    """Read the requested metrics from the user's stats row in a single query"""
+    from users.models import UserProfile, UserStats
+
+    counters = [name for name in metrics if name in UserStats.COUNTER_FIELDS]
+    fields = list(counters)
+    if 'current_streak' in metrics:
+        fields += ['user__profile__current_streak', 'user__profile__last_active_date']
+
+    row = UserStats.objects.filter(user=user).values(*fields).first()
+    if row is None:
+        # Stats row missing (e.g. created outside the signals); derive it once
+        rebuild_user_stats([user.pk])
+        row = UserStats.objects.filter(user=user).values(*fields).first() or {}
+
+    result = {name: row.get(name, 0) for name in counters}
+    if 'current_streak' in metrics:
+        profile = UserProfile(
+            current_streak=row.get('user__profile__current_streak') or 0,
+            last_active_date=row.get('user__profile__last_active_date'),
+        )
+        result['current_streak'] = profile.get_current_streak()
+    return result
+
+
+def check_and_award_badges(user, request=None, event=None):
     """
     Check if user has earned any badges and award them
+    Only rules listening to `event` are evaluated (all rules if event is None)
     Returns list of newly earned badges
     """
-    newly_earned = []
-
-    # 🎯 First Workout
-    if not Badge.objects.filter(user=user, badge_type='first_workout').exists():
-        if Workout.objects.filter(user=user).count() >= 1:
-            badge = Badge.objects.create(user=user, badge_type='first_workout')
-            newly_earned.append(badge)
-
-    # 💪 10 Workouts
-    if not Badge.objects.filter(user=user, badge_type='10_workouts').exists():
-        if Workout.objects.filter(user=user).count() >= 10:
-            badge = Badge.objects.create(user=user, badge_type='10_workouts')
-            newly_earned.append(badge)
-
-    # 🚀 50 Workouts
-    if not Badge.objects.filter(user=user, badge_type='50_workouts').exists():
-        if Workout.objects.filter(user=user).count() >= 50:
-            badge = Badge.objects.create(user=user, badge_type='50_workouts')
-            newly_earned.append(badge)
-
-    # ⭐ First Goal
-    if not Badge.objects.filter(user=user, badge_type='first_goal').exists():
-        from goals.models import Goal
-        if Goal.objects.filter(user=user, is_completed=True).count() >= 1:
-            badge = Badge.objects.create(user=user, badge_type='first_goal')
-            newly_earned.append(badge)
-
-    # ✨ Custom Exercise
-    if not Badge.objects.filter(user=user, badge_type='custom_exercise').exists():
-        if Exercise.objects.filter(created_by=user, is_custom=True).count() >= 1:
-            badge = Badge.objects.create(user=user, badge_type='custom_exercise')
-            newly_earned.append(badge)
-
-    # 🔥 7-Day Streak (check current streak from dashboard calculation)
-    if not Badge.objects.filter(user=user, badge_type='7_day_streak').exists():
-        current_streak = calculate_current_streak(user)
-        if current_streak >= 7:
-            badge = Badge.objects.create(user=user, badge_type='7_day_streak')
-            newly_earned.append(badge)
-
-    # 👑 30-Day Streak
-    if not Badge.objects.filter(user=user, badge_type='30_day_streak').exists():
-        current_streak = calculate_current_streak(user)
-        if current_streak >= 30:
-            badge = Badge.objects.create(user=user, badge_type='30_day_streak')
-            newly_earned.append(badge)
+    rules = [rule for rule in BADGE_RULES if event is None or event in rule.events]
+    if not rules:
+        return []
+
+    # Badges are never taken back, so a cached earned set is safe for skipping rules
+    earned = cache.get(earned_cache_key(user))
+    from_cache = earned is not None
+    if not from_cache:
+        earned = load_earned_badge_types(user)
+    pending = [rule for rule in rules if rule.badge_type not in earned]
+    if not pending:
+        return []
+
+    metrics = get_badge_metrics(user, {rule.metric for rule in pending})
+    reached = [rule for rule in pending if metrics[rule.metric] >= rule.threshold]
+    if not reached:
+        return []
+
+    if from_cache:
+        # The cache may be behind another worker process, so confirm against the database
+        earned = load_earned_badge_types(user)
+    newly_earned = [
+        Badge(user=user, badge_type=rule.badge_type)
+        for rule in reached
+        if rule.badge_type not in earned
+    ]
+
+    if newly_earned:
+        # A concurrent request may have awarded the same badge; skip it instead of failing
+        Badge.objects.bulk_create(newly_earned, ignore_conflicts=True)
+        # bulk_create skips post_save and may have ignored some rows, so recount
+        sync_badge_count(user.pk)
+        cache.set(
+            earned_cache_key(user),
+            earned | {badge.badge_type for badge in newly_earned},
+            EARNED_CACHE_TIMEOUT,
+        )
 
     # Show success messages for newly earned badges
     if request and newly_earned:
@@ -68,22 +132,7 @@ def check_and_award_badges(user, request=None):
 
 
 def calculate_current_streak(user):
-    """Calculate user's current workout streak"""
-    from datetime import timedelta
-    from django.utils import timezone
-
-    today = timezone.now().date()
-    workouts = Workout.objects.filter(user=user).order_by('-date')
-
-    if not workouts.exists():
-        return 0
-
-    workout_dates = set(workouts.values_list('date', flat=True))
-    current_streak = 0
-    check_date = today
-
-    while check_date in workout_dates:
-        current_streak += 1
-        check_date -= timedelta(days=1)
+    """Return user's current workout streak from the stored streak state"""
+    from workouts.utils import calculate_workout_streak
 
-    return current_streak
+    return calculate_workout_streak(user)['current_streak']
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 13:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0004_badge'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='badge',
+            index=models.Index(fields=['user', '-earned_date'], name='badge_user_earned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['user', 'target_date'], name='goal_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['user', '-completed_date'], name='goal_completed_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 
@@ -56,10 +60,24 @@ class Goal(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Partial indexes per status, matching the goal_list and dashboard queries
+        indexes = [
+            models.Index(fields=['user', 'target_date'], condition=Q(is_completed=False), name='goal_active_idx'),
+            models.Index(
+                fields=['user', '-completed_date'], condition=Q(is_completed=True), name='goal_completed_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so completing a goal can move it between counters
+        instance._loaded_is_completed = instance.__dict__.get('is_completed')
+        return instance
+
     def mark_complete(self):
         """Mark goal as completed"""
         self.is_completed = True
@@ -119,8 +137,12 @@ class Badge(models.Model):
     earned_date = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # unique_together already indexes (user, badge_type) for the earned-set lookups
         unique_together = ['user', 'badge_type']
         ordering = ['-earned_date']
+        indexes = [
+            models.Index(fields=['user', '-earned_date'], name='badge_user_earned_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_badge_type_display()} - {self.user.username}"
@@ -166,3 +188,63 @@ class Badge(models.Model):
             '30_day_streak': 'Maintain a 30-day workout streak',
         }
         return descriptions.get(self.badge_type, 'Complete a challenge')
+
+
+def _goal_counter(is_completed):
+    return 'completed_goal_count' if is_completed else 'active_goal_count'
+
+
+@receiver(post_save, sender=Goal)
+def count_goal_on_save(sender, instance, created, **kwargs):
+    """Keep the active/completed goal counters in step with new and completed goals"""
+    from users.stats_utils import bump_user_stats
+
+    previous = getattr(instance, '_loaded_is_completed', None)
+    if created:
+        bump_user_stats(instance.user_id, **{_goal_counter(instance.is_completed): 1})
+    elif previous is not None and previous != instance.is_completed:
+        bump_user_stats(instance.user_id, **{_goal_counter(previous): -1, _goal_counter(instance.is_completed): 1})
+    instance._loaded_is_completed = instance.is_completed
+
+
+@receiver(post_delete, sender=Goal)
+def count_goal_on_delete(sender, instance, origin=None, **kwargs):
+    """Uncount a deleted goal"""
+    from users.stats_utils import bump_user_stats
+
+    if isinstance(origin, User):
+        return
+    is_completed = getattr(instance, '_loaded_is_completed', None)
+    if is_completed is None:
+        is_completed = instance.is_completed
+    bump_user_stats(instance.user_id, **{_goal_counter(is_completed): -1})
+
+
+@receiver(post_save, sender=Badge)
+def count_badge_on_save(sender, instance, created, **kwargs):
+    """Count a badge awarded outside the engine (which updates badge_count itself)"""
+    from users.stats_utils import bump_user_stats
+
+    if created:
+        bump_user_stats(instance.user_id, badge_count=1)
+
+
+@receiver(post_delete, sender=Badge)
+def count_badge_on_delete(sender, instance, origin=None, **kwargs):
+    """Uncount a removed badge"""
+    from users.stats_utils import bump_user_stats
+
+    if isinstance(origin, User):
+        return
+    bump_user_stats(instance.user_id, badge_count=-1)
+
+
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def clear_earned_badges_cache(sender, instance, origin=None, **kwargs):
+    """Forget the cached earned-badge set when a badge is added or removed outside the engine"""
+    from .badge_utils import earned_cache_key
+
+    if isinstance(origin, User):
+        return
+    cache.delete(earned_cache_key(instance.user))
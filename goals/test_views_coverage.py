@@ -1,5 +1,7 @@
 """Additional tests to increase coverage for goals views"""
-from django.test import TestCase, Client
+import tempfile
+
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from .models import Goal
@@ -263,6 +265,7 @@ class GoalViewsCoverageTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+@override_settings(EXPORTS_ROOT=tempfile.mkdtemp())
 class GoalExportTests(TestCase):
     """Test PDF export functionality"""
 
@@ -280,9 +283,18 @@ class GoalExportTests(TestCase):
         response = self.client.get(reverse('export_goals_pdf'))
         self.assertEqual(response.status_code, 302)
 
+    def download(self):
+        """Request the export, let the background job render it, then download"""
+        from jobs.worker import run_pending
+
+        response = self.client.get(reverse('export_goals_pdf'))
+        self.assertRedirects(response, reverse('export_status', args=['goals']))
+        run_pending()
+        return self.client.get(reverse('export_goals_pdf'))
+
     def test_export_goals_pdf_empty(self):
         """Test exporting PDF with no goals"""
-        response = self.client.get(reverse('export_goals_pdf'))
+        response = self.download()
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['Content-Type'], 'application/pdf')
 
@@ -297,6 +309,6 @@ class GoalExportTests(TestCase):
             target_date=date.today() + timedelta(days=30)
         )
 
-        response = self.client.get(reverse('export_goals_pdf'))
+        response = self.download()
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['Content-Type'], 'application/pdf')
@@ -1,7 +1,7 @@
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
-from .models import Goal
+from .models import Goal, Badge
 from datetime import date, timedelta
 
 
@@ -366,6 +366,98 @@ class BadgeUtilsTests(TestCase):
         streak = calculate_current_streak(self.user)
         self.assertEqual(streak, 3)
 
+    def test_badge_check_uses_constant_queries(self):
+        """Test earned set, metrics, inserts and the badge counter take four queries"""
+        from workouts.models import Workout
+        from .badge_utils import check_and_award_badges
+
+        for i in range(12):
+            Workout.objects.create(
+                user=self.user,
+                title=f'Workout {i}',
+                date=date.today() - timedelta(days=i),
+                duration=30
+            )
+
+        with self.assertNumQueries(4):
+            badges = check_and_award_badges(self.user)
+
+        badge_types = [b.badge_type for b in badges]
+        self.assertEqual(badge_types, ['first_workout', '10_workouts', '7_day_streak'])
+        self.assertEqual(Badge.objects.filter(user=self.user).count(), 3)
+
+    def test_badge_check_skips_metrics_when_all_earned(self):
+        """Test no metric query runs once every badge is earned"""
+        from .badge_utils import check_and_award_badges, BADGE_RULES
+
+        for rule in BADGE_RULES:
+            Badge.objects.create(user=self.user, badge_type=rule.badge_type)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(check_and_award_badges(self.user), [])
+
+    def test_get_badge_metrics(self):
+        """Test all metrics are fetched in one query"""
+        from workouts.models import Workout, Exercise
+        from .badge_utils import get_badge_metrics
+
+        Workout.objects.create(user=self.user, title='Run', date=date.today(), duration=30)
+        Exercise.objects.create(name='Mine', category='cardio', created_by=self.user, is_custom=True)
+
+        with self.assertNumQueries(1):
+            metrics = get_badge_metrics(
+                self.user,
+                {'workout_count', 'completed_goal_count', 'custom_exercise_count', 'current_streak'}
+            )
+
+        self.assertEqual(metrics, {
+            'workout_count': 1,
+            'completed_goal_count': 0,
+            'custom_exercise_count': 1,
+            'current_streak': 1,
+        })
+
+    def test_event_only_evaluates_its_rules(self):
+        """Test creating a custom exercise does not award workout badges"""
+        from workouts.models import Workout, Exercise
+        from .badge_utils import check_and_award_badges, EXERCISE_CREATED
+
+        Workout.objects.create(user=self.user, title='Run', date=date.today(), duration=30)
+        Exercise.objects.create(name='Mine', category='cardio', created_by=self.user, is_custom=True)
+
+        badges = check_and_award_badges(self.user, event=EXERCISE_CREATED)
+        self.assertEqual([b.badge_type for b in badges], ['custom_exercise'])
+
+    def test_earned_rules_skipped_without_queries(self):
+        """Test an event whose rules are all earned does not touch the database"""
+        from workouts.models import Exercise
+        from .badge_utils import check_and_award_badges, EXERCISE_CREATED
+
+        Exercise.objects.create(name='Mine', category='cardio', created_by=self.user, is_custom=True)
+        check_and_award_badges(self.user, event=EXERCISE_CREATED)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(check_and_award_badges(self.user, event=EXERCISE_CREATED), [])
+
+    def test_workout_deleted_event_awards_nothing(self):
+        """Test deleting a workout never evaluates any rule"""
+        from .badge_utils import check_and_award_badges, WORKOUT_DELETED
+
+        with self.assertNumQueries(0):
+            self.assertEqual(check_and_award_badges(self.user, event=WORKOUT_DELETED), [])
+
+    def test_deleted_badge_can_be_earned_again(self):
+        """Test removing a badge clears the cached earned set"""
+        from workouts.models import Workout
+        from .badge_utils import check_and_award_badges, WORKOUT_CREATED
+
+        Workout.objects.create(user=self.user, title='Run', date=date.today(), duration=30)
+        check_and_award_badges(self.user, event=WORKOUT_CREATED)
+        Badge.objects.filter(user=self.user).get().delete()
+
+        badges = check_and_award_badges(self.user, event=WORKOUT_CREATED)
+        self.assertEqual([b.badge_type for b in badges], ['first_workout'])
+
 
 class GoalProgressTests(TestCase):
     """Test cases for goal progress tracking"""
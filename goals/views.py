@@ -3,7 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Goal
 from .forms import GoalForm
-from .badge_utils import check_and_award_badges
+from .badge_utils import check_and_award_badges, GOAL_COMPLETED
 
 
 @login_required
@@ -83,7 +83,7 @@ def goal_complete(request, pk):
     goal.mark_complete()
 
     # Check for new badges
-    check_and_award_badges(request.user, request)
+    check_and_award_badges(request.user, request, event=GOAL_COMPLETED)
 
     messages.success(request, f'Goal "{goal.title}" marked as complete! 🎉')
     return redirect('goal_list')
@@ -91,21 +91,7 @@ def goal_complete(request, pk):
 
 @login_required
 def export_goals_pdf(request):
-    """Export user's goals to PDF"""
-    from django.http import HttpResponse
-    from workouts.pdf_utils import generate_goals_pdf
-    from datetime import datetime
+    """Download the user's goals as a PDF, rendered in the background and cached"""
+    from workouts.export_utils import serve_export
 
-    goals = Goal.objects.filter(user=request.user).order_by('-created_at')
-
-    # Generate PDF
-    pdf_buffer = generate_goals_pdf(goals, request.user)
-
-    # Create response
-    response = HttpResponse(pdf_buffer, content_type='application/pdf')
-    filename = f"FitTrack_Goals_{datetime.now().strftime('%Y%m%d')}.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    messages.success(request, 'Goals exported successfully! 📄')
-
-    return response
+    return serve_export(request, 'goals')
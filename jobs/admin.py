@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'queue', 'status', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status', 'queue']
+    search_fields = ['name', 'last_error']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['created_at', 'updated_at', 'finished_at', 'locked_at', 'locked_by']
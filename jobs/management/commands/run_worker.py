@@ -0,0 +1,46 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import queue_setting
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run a background worker that processes queued tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', default='default', help='Queue to process')
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help=f"Tasks to run at once (default: {queue_setting('CONCURRENCY')})",
+        )
+        parser.add_argument(
+            '--pool', choices=['thread', 'process'], default=None,
+            help=f"Run tasks in threads or processes (default: {queue_setting('POOL')})",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queue=options['queue'],
+            concurrency=options['concurrency'],
+            pool=options['pool'],
+            poll_interval=options['poll_interval'],
+        )
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+
+        self.stdout.write(
+            f"👷 Worker {worker.worker_id} processing '{worker.queue}' "
+            f"with {worker.concurrency} {worker.pool}(s)"
+        )
+        executed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Worker stopped after {executed} task(s)'))
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+DEFAULTS = {
+    'CONCURRENCY': 2,
+    'POOL': 'thread',
+    'POLL_INTERVAL': 2,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 10,
+    'LOCK_TIMEOUT': 15 * 60,
+}
+
+
+def queue_setting(name):
+    """Read a JOB_QUEUE setting, falling back to the defaults above"""
+    return getattr(settings, 'JOB_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+def task_name(func):
+    """Dotted path the worker uses to import `func`"""
+    if isinstance(func, str):
+        return func
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, args=(), kwargs=None, queue='default', delay=None, max_attempts=None):
+    """
+    Queue `func(*args, **kwargs)` to run on a background worker.
+    `func` must be a module-level function (or its dotted path) and the
+    arguments must be JSON serializable. Returns the Task row.
+    """
+    from .models import Task
+
+    run_after = timezone.now()
+    if delay:
+        run_after += delay if isinstance(delay, timedelta) else timedelta(seconds=delay)
+
+    return Task.objects.create(
+        name=task_name(func),
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue,
+        run_after=run_after,
+        max_attempts=max_attempts or queue_setting('MAX_ATTEMPTS'),
+    )
+
+
+def find_pending(func, args=(), kwargs=None, queue='default'):
+    """Return a queued or running task with the same call, so callers can avoid duplicates"""
+    from .models import Task
+
+    return Task.objects.filter(
+        name=task_name(func),
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue,
+        status__in=[Task.STATUS_QUEUED, Task.STATUS_RUNNING],
+    ).first()
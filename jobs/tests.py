@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import enqueue, find_pending
+from .worker import claim_tasks, execute_task, requeue_stale_tasks, run_pending
+
+
+def add(a, b):
+    return a + b
+
+
+def fail():
+    raise ValueError('boom')
+
+
+class EnqueueTests(TestCase):
+    def test_enqueue_stores_call(self):
+        """Test enqueue records the dotted path and arguments"""
+        task = enqueue(add, args=(1, 2))
+
+        self.assertEqual(task.name, 'jobs.tests.add')
+        self.assertEqual(task.args, [1, 2])
+        self.assertEqual(task.status, Task.STATUS_QUEUED)
+        self.assertEqual(task.max_attempts, 3)
+
+    def test_enqueue_with_delay(self):
+        """Test delayed tasks are not claimed before they are due"""
+        enqueue(add, args=(1, 2), delay=60)
+        self.assertEqual(claim_tasks(), [])
+
+    def test_find_pending(self):
+        """Test duplicate calls can be detected while queued"""
+        task = enqueue(add, args=(1, 2))
+        self.assertEqual(find_pending(add, args=(1, 2)), task)
+        self.assertIsNone(find_pending(add, args=(2, 2)))
+
+
+class WorkerTests(TestCase):
+    def test_run_pending_executes_tasks(self):
+        """Test queued tasks run and store their result"""
+        task = enqueue(add, args=(2, 3))
+
+        self.assertEqual(run_pending(), 1)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.STATUS_DONE)
+        self.assertEqual(task.result, 5)
+        self.assertEqual(task.attempts, 1)
+        self.assertIsNotNone(task.finished_at)
+
+    def test_claimed_task_is_not_claimed_again(self):
+        """Test a running task is invisible to other workers"""
+        enqueue(add, args=(1, 1))
+
+        self.assertEqual(len(claim_tasks(worker_id='a')), 1)
+        self.assertEqual(claim_tasks(worker_id='b'), [])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        """Test a failing task is requeued for later"""
+        task = enqueue(fail)
+        with self.assertLogs('jobs.worker', level='ERROR'):
+            execute_task(claim_tasks()[0])
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.STATUS_QUEUED)
+        self.assertGreater(task.run_after, timezone.now())
+        self.assertIn('ValueError', task.last_error)
+
+    @override_settings(JOB_QUEUE={'RETRY_DELAY': 0})
+    def test_task_fails_after_max_attempts(self):
+        """Test a task gives up after max_attempts"""
+        task = enqueue(fail, max_attempts=2)
+
+        with self.assertLogs('jobs.worker', level='ERROR'):
+            self.assertEqual(run_pending(), 2)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.STATUS_FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_requeue_stale_tasks(self):
+        """Test tasks abandoned by a dead worker are put back"""
+        task = enqueue(add, args=(1, 1))
+        claim_tasks()
+        Task.objects.filter(pk=task.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_tasks(), 1)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.STATUS_QUEUED)
+
+    def test_stale_task_out_of_attempts_fails(self):
+        """Test a task that keeps killing its worker stops being requeued after its last attempt"""
+        task = enqueue(add, args=(1, 1), max_attempts=2)
+        for _ in range(2):
+            claim_tasks()
+            Task.objects.filter(pk=task.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+            requeue_stale_tasks()
+
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.STATUS_FAILED, 2))
+        self.assertIn('last attempt', task.last_error)
+        self.assertEqual(claim_tasks(), [])
+
+
+class RunWorkerCommandTests(TransactionTestCase):
+    def test_burst_worker_drains_queue(self):
+        """Test run_worker --burst processes tasks on a thread pool and exits"""
+        # One thread only: the in-memory SQLite test database locks under concurrent writers
+        tasks = [enqueue(add, args=(i, i)) for i in range(3)]
+
+        out = StringIO()
+        call_command('run_worker', '--burst', '--concurrency', '1', '--poll-interval', '0.1', stdout=out)
+
+        self.assertIn('after 3 task(s)', out.getvalue())
+        for i, task in enumerate(tasks):
+            task.refresh_from_db()
+            self.assertEqual(task.result, i * 2)
@@ -0,0 +1,208 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+from .queue import queue_setting
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_tasks(queue='default', limit=1, worker_id=None):
+    """
+    Atomically mark up to `limit` due tasks as running and return their ids.
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it
+    (PostgreSQL); otherwise each task is claimed with a conditional UPDATE.
+    """
+    worker_id = worker_id or default_worker_id()
+    now = timezone.now()
+    due = Task.objects.filter(
+        status=Task.STATUS_QUEUED, queue=queue, run_after__lte=now
+    ).order_by('run_after', 'id')
+    claim = {
+        'status': Task.STATUS_RUNNING,
+        'locked_at': now,
+        'locked_by': worker_id,
+        'attempts': F('attempts') + 1,
+    }
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Task.objects.filter(pk__in=ids).update(**claim)
+            return ids
+
+        # No row locks (SQLite): only the worker whose UPDATE matches still-queued rows wins
+        ids = []
+        for task_id in due.values_list('id', flat=True)[:limit]:
+            if Task.objects.filter(pk=task_id, status=Task.STATUS_QUEUED).update(**claim):
+                ids.append(task_id)
+        return ids
+
+
+def requeue_stale_tasks():
+    """
+    Put back tasks whose worker disappeared while running them, and return
+    how many were requeued. A task that has used up its attempts is marked
+    failed instead: one that kills its worker (out of memory, a crash in a C
+    extension) never reaches execute_task's failure branch, and would
+    otherwise be claimed and requeued forever.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=queue_setting('LOCK_TIMEOUT'))
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.STATUS_FAILED,
+        finished_at=now,
+        locked_at=None,
+        locked_by='',
+        last_error='The worker stopped while running the task on its last attempt',
+    )
+    if failed:
+        logger.warning("Marked %s abandoned task(s) as failed after their last attempt", failed)
+    return stale.update(status=Task.STATUS_QUEUED, locked_at=None, locked_by='')
+
+
+def execute_task(task_id):
+    """Run one claimed task and record its outcome"""
+    task = Task.objects.get(pk=task_id)
+    try:
+        func = import_string(task.name)
+        result = func(*task.args, **task.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Task %s (%s) failed", task.pk, task.name)
+        if task.attempts < task.max_attempts:
+            # Exponential backoff: RETRY_DELAY, 2x, 4x, ...
+            delay = queue_setting('RETRY_DELAY') * 2 ** (task.attempts - 1)
+            Task.objects.filter(pk=task.pk).update(
+                status=Task.STATUS_QUEUED,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                locked_at=None,
+                locked_by='',
+                last_error=error,
+            )
+        else:
+            Task.objects.filter(pk=task.pk).update(
+                status=Task.STATUS_FAILED,
+                finished_at=timezone.now(),
+                last_error=error,
+            )
+        return Task.STATUS_FAILED
+
+    if not isinstance(result, (dict, list, str, int, float, bool)):
+        result = None
+    Task.objects.filter(pk=task.pk).update(
+        status=Task.STATUS_DONE,
+        finished_at=timezone.now(),
+        result=result,
+        last_error='',
+    )
+    return Task.STATUS_DONE
+
+
+def _execute_in_pool(task_id):
+    # Pool threads and processes keep their own connections between tasks
+    close_old_connections()
+    try:
+        return execute_task(task_id)
+    finally:
+        close_old_connections()
+
+
+def run_pending(queue='default', limit=None):
+    """
+    Run due tasks synchronously in this process until none are left.
+    Handy for tests, cron-style invocations and `run_worker --burst`.
+    Returns the number of tasks executed.
+    """
+    executed = 0
+    while limit is None or executed < limit:
+        ids = claim_tasks(queue, limit=1)
+        if not ids:
+            break
+        execute_task(ids[0])
+        executed += 1
+    return executed
+
+
+def _init_process():
+    # Worker processes need their own app registry and database connections
+    django.setup()
+
+
+class Worker:
+    """
+    Polls the Task table and runs tasks on a thread or process pool.
+    """
+
+    def __init__(self, queue='default', concurrency=None, pool=None, poll_interval=None, worker_id=None):
+        self.queue = queue
+        self.concurrency = concurrency or queue_setting('CONCURRENCY')
+        self.pool = pool or queue_setting('POOL')
+        self.poll_interval = poll_interval or queue_setting('POLL_INTERVAL')
+        self.worker_id = worker_id or default_worker_id()
+        self.stopping = False
+
+    def make_executor(self):
+        if self.pool == 'process':
+            # Forked children must not share the parent's database connections
+            connections.close_all()
+            return ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_process)
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job-worker')
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self, burst=False):
+        """Process tasks until stopped (or until the queue is empty with burst=True)"""
+        in_flight = set()
+        executed = 0
+
+        with self.make_executor() as executor:
+            while not self.stopping:
+                requeue_stale_tasks()
+
+                claimed = []
+                free_slots = self.concurrency - len(in_flight)
+                if free_slots > 0:
+                    claimed = claim_tasks(self.queue, limit=free_slots, worker_id=self.worker_id)
+                    for task_id in claimed:
+                        in_flight.add(executor.submit(_execute_in_pool, task_id))
+
+                if not in_flight:
+                    if burst:
+                        break
+                    if not claimed:
+                        time.sleep(self.poll_interval)
+                    continue
+
+                done, in_flight = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                executed += self._collect(done)
+
+            # Let running tasks finish before exiting
+            executed += self._collect(wait(in_flight).done)
+
+        return executed
+
+    def _collect(self, futures):
+        for future in futures:
+            if future.exception() is not None:
+                # The task could not even record its outcome; LOCK_TIMEOUT will requeue it
+                logger.error("Worker %s lost a task", self.worker_id, exc_info=future.exception())
+        return len(futures)
@@ -0,0 +1,8 @@
+#!/usr/bin/env bash
+# exit on error
+set -o errexit
+
+# PDF exports and data archives are built by the background worker. It runs on
+# the same instance as the web server so both see the same EXPORTS_ROOT files.
+python manage.py run_worker &
+exec gunicorn fittrack_project.wsgi:application
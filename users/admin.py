@@ -1,8 +1,29 @@
 from django.contrib import admin
-from .models import UserProfile
+from .models import CacheVersion, DataArchive, UserProfile, UserStats
 
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'date_of_birth', 'weight_unit', 'created_at']
     search_fields = ['user__username', 'user__email']
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'workout_count', 'active_goal_count', 'completed_goal_count', 'badge_count']
+    search_fields = ['user__username']
+    readonly_fields = UserStats.COUNTER_FIELDS
+
+
+@admin.register(DataArchive)
+class DataArchiveAdmin(admin.ModelAdmin):
+    list_display = ['user', 'status', 'member', 'size', 'created_at', 'completed_at']
+    list_filter = ['status']
+    search_fields = ['user__username']
+    readonly_fields = ['member', 'last_pk', 'staged_bytes', 'progress', 'size', 'completed_at']
+
+
+@admin.register(CacheVersion)
+class CacheVersionAdmin(admin.ModelAdmin):
+    list_display = ['key', 'version']
+    search_fields = ['key']
@@ -0,0 +1,226 @@
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+ARCHIVE_CHUNK_SIZE = 1000
+# Rows one worker step writes before it re-enqueues itself, so a huge
+# account never holds a worker (or loses more than one step) at a time
+ARCHIVE_ROWS_PER_STEP = 50000
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    """One JSONL file in the archive: a model's rows for the user, as `fields`"""
+    name: str
+    model: str
+    user_field: str
+    # Field lookups; (key, lookup) pairs rename related fields in the output
+    fields: tuple
+    filters: tuple = ()
+
+    def queryset(self, user_id):
+        plain = [field for field in self.fields if isinstance(field, str)]
+        renamed = {field[0]: F(field[1]) for field in self.fields if not isinstance(field, str)}
+        return apps.get_model(self.model).objects.filter(
+            **{self.user_field: user_id}, **dict(self.filters)
+        ).order_by('pk').values(*plain, **renamed)
+
+
+EXERCISE_ENTRY_FIELDS = ('sets', 'reps', 'weight', 'unit', 'distance', 'duration', 'notes')
+
+ARCHIVE_MEMBERS = [
+    ArchiveMember('profile.jsonl', 'users.UserProfile', 'user_id', (
+        'id', ('username', 'user__username'), ('email', 'user__email'), ('first_name', 'user__first_name'),
+        ('last_name', 'user__last_name'), ('date_joined', 'user__date_joined'), 'bio', 'date_of_birth',
+        'height', 'weight_unit', 'theme', 'current_streak', 'best_streak', 'last_active_date',
+        'created_at', 'updated_at',
+    )),
+    ArchiveMember('workouts.jsonl', 'workouts.Workout', 'user_id', (
+        'id', 'date', 'title', 'duration', 'notes', 'exercise_count', 'total_sets', 'total_volume_kg',
+        'total_distance_km', 'created_at', 'updated_at',
+    )),
+    ArchiveMember('workout_exercises.jsonl', 'workouts.WorkoutExercise', 'workout__user_id', (
+        'id', 'workout_id', ('exercise_name', 'exercise__name'), *EXERCISE_ENTRY_FIELDS,
+    )),
+    ArchiveMember('goals.jsonl', 'goals.Goal', 'user_id', (
+        'id', 'title', 'description', 'category', 'target_number', 'current_number', 'unit',
+        'target_date', 'is_completed', 'completed_date', 'created_at', 'updated_at',
+    )),
+    ArchiveMember('badges.jsonl', 'goals.Badge', 'user_id', ('id', 'badge_type', 'earned_date')),
+    ArchiveMember('templates.jsonl', 'workouts.WorkoutTemplate', 'user_id', (
+        'id', 'name', 'description', 'created_at', 'updated_at',
+    )),
+    ArchiveMember('template_exercises.jsonl', 'workouts.TemplateExercise', 'template__user_id', (
+        'id', 'template_id', ('exercise_name', 'exercise__name'), *EXERCISE_ENTRY_FIELDS, 'order',
+    )),
+    ArchiveMember('custom_exercises.jsonl', 'workouts.Exercise', 'created_by_id', (
+        'id', 'name', 'category', 'description', 'created_at',
+    ), filters=(('is_custom', True),)),
+]
+
+
+def archive_dir(archive):
+    """Per-archive staging directory; members are written here before zipping"""
+    from workouts.export_utils import exports_root
+
+    return exports_root() / str(archive.user_id) / f'archive-{archive.pk}'
+
+
+def archive_path(archive):
+    from workouts.export_utils import exports_root
+
+    return exports_root() / str(archive.user_id) / f'archive-{archive.pk}.zip'
+
+
+def _checkpoint(archive, **fields):
+    from .models import DataArchive
+
+    for name, value in fields.items():
+        setattr(archive, name, value)
+    DataArchive.objects.filter(pk=archive.pk).update(**fields, updated_at=timezone.now())
+
+
+def _write_member(archive, member, staged, budget, chunk_size):
+    """
+    Append the member's rows after `archive.last_pk` to `staged`, checkpointing
+    every `chunk_size` rows. Returns (rows written, finished).
+    """
+    rows = member.queryset(archive.user_id).filter(pk__gt=archive.last_pk)
+    written = pending = 0
+    last_pk = archive.last_pk
+
+    def checkpoint():
+        staged.flush()
+        os.fsync(staged.fileno())
+        progress = dict(archive.progress)
+        progress[member.name] = progress.get(member.name, 0) + pending
+        _checkpoint(archive, last_pk=last_pk, staged_bytes=staged.tell(), progress=progress)
+
+    for row in rows.iterator(chunk_size=chunk_size):
+        staged.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b'\n')
+        last_pk = row['id']
+        written += 1
+        pending += 1
+        if pending >= chunk_size:
+            checkpoint()
+            pending = 0
+            if written >= budget:
+                return written, False
+    checkpoint()
+    return written, True
+
+
+def _zip_members(archive):
+    """Zip the staged members (streamed from disk) and swap the zip into place atomically"""
+    staging, path = archive_dir(archive), archive_path(archive)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for member in ARCHIVE_MEMBERS:
+                zf.write(staging / member.name, arcname=member.name)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    shutil.rmtree(staging, ignore_errors=True)
+    return path.stat().st_size
+
+
+def build_archive(archive_id, rows_per_step=ARCHIVE_ROWS_PER_STEP, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Background task: write the next part of a data archive.
+    Each member is streamed from a server-side cursor into its staging file in
+    chunks; after every chunk the file is synced and the checkpoint saved. A
+    step that crashes or is retried truncates the file back to the checkpoint
+    and carries on from there. After `rows_per_step` rows the step queues the
+    next one; the last step zips the members.
+    """
+    from jobs.queue import enqueue
+    from .models import DataArchive
+
+    archive = DataArchive.objects.filter(pk=archive_id).first()
+    if archive is None or archive.status == DataArchive.STATUS_READY:
+        return None
+
+    staging = archive_dir(archive)
+    staging.mkdir(parents=True, exist_ok=True)
+    budget = rows_per_step
+    while archive.member < len(ARCHIVE_MEMBERS):
+        member = ARCHIVE_MEMBERS[archive.member]
+        staged_path = staging / member.name
+        with open(staged_path, 'ab') as staged:
+            # Drop anything written after the last checkpoint
+            staged.truncate(archive.staged_bytes)
+            staged.seek(archive.staged_bytes)
+            written, finished = _write_member(archive, member, staged, budget, chunk_size)
+        if not finished:
+            enqueue(
+                build_archive, args=(archive.pk,), kwargs={'rows_per_step': rows_per_step, 'chunk_size': chunk_size}
+            )
+            return {'member': member.name, 'rows': archive.progress.get(member.name, 0)}
+        budget -= written
+        _checkpoint(archive, member=archive.member + 1, last_pk=0, staged_bytes=0)
+
+    _checkpoint(
+        archive, status=DataArchive.STATUS_READY, size=_zip_members(archive), completed_at=timezone.now()
+    )
+    return {'size': archive.size}
+
+
+def archive_task(archive):
+    """The most recent build step for an archive, if any"""
+    from jobs.models import Task
+    from jobs.queue import task_name
+
+    return Task.objects.filter(name=task_name(build_archive), args=[archive.pk]).order_by('-id').first()
+
+
+def request_archive(user):
+    """
+    Return the user's archive, starting one if there is none in progress.
+    A build whose job gave up is resumed from its checkpoint, and starting a
+    fresh archive removes the previous ones.
+    """
+    from jobs.models import Task
+    from jobs.queue import enqueue
+    from .models import DataArchive
+
+    archive = DataArchive.objects.filter(user=user, status=DataArchive.STATUS_BUILDING).first()
+    if archive is None:
+        for old in DataArchive.objects.filter(user=user):
+            delete_archive_files(old)
+        DataArchive.objects.filter(user=user).delete()
+        archive = DataArchive.objects.create(user=user)
+    else:
+        task = archive_task(archive)
+        if task is not None and task.status in (Task.STATUS_QUEUED, Task.STATUS_RUNNING):
+            return archive
+    enqueue(build_archive, args=(archive.pk,))
+    return archive
+
+
+def delete_archive_files(archive):
+    shutil.rmtree(archive_dir(archive), ignore_errors=True)
+    archive_path(archive).unlink(missing_ok=True)
+
+
+def discard_if_missing(archive):
+    """
+    Delete a ready archive whose zip is gone (e.g. EXPORTS_ROOT was wiped by a
+    redeploy), so the user can start a new one. Returns True if it was deleted.
+    """
+    from .models import DataArchive
+
+    if archive.status != DataArchive.STATUS_READY or archive_path(archive).exists():
+        return False
+    delete_archive_files(archive)
+    archive.delete()
+    return True
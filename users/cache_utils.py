@@ -0,0 +1,35 @@
+
+def user_cache_key(user, *parts):
+    """
+    Build a cache key scoped to one user account.
+    date_joined is part of the key so entries can never leak to a new
+    account that ends up with a reused id.
+    """
+    joined = user.date_joined.strftime('%Y%m%d%H%M%S%f')
+    return ':'.join(['user', str(user.pk), joined, *(str(part) for part in parts)])
+
+
+def cache_versions(*keys):
+    """
+    Current values of the version counters under `keys` as {key: version},
+    read in one query. Counters live in the database (CacheVersion) and start at 1.
+    """
+    from .models import CacheVersion
+
+    versions = dict(CacheVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return {key: versions.get(key, 1) for key in keys}
+
+
+def cache_version(key):
+    """Current value of a version counter stored under `key`, starting at 1"""
+    return cache_versions(key)[key]
+
+
+def bump_cache_version(key):
+    """Move a version counter on, so every cache entry keyed with the old value is ignored"""
+    from django.db.models import F
+    from .models import CacheVersion
+
+    # Create the counter at 1 if this is its first bump, then increment it atomically
+    CacheVersion.objects.bulk_create([CacheVersion(key=key)], ignore_conflicts=True)
+    CacheVersion.objects.filter(key=key).update(version=F('version') + 1)
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from users.stats_utils import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Re-derive the per-user counters on UserStats and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', help='Only rebuild these users')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report users whose stored counters differ, without writing',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        user_ids = list(users.values_list('pk', flat=True))
+
+        drifted = rebuild_user_stats(user_ids, dry_run=options['check'])
+
+        usernames = dict(User.objects.filter(pk__in=drifted).values_list('pk', 'username'))
+        for user_id, diff in drifted.items():
+            if not diff:
+                self.stdout.write(f'⚠️ {usernames[user_id]}: stats row missing')
+                continue
+            changes = ', '.join(f'{name} {stored} → {expected}' for name, (stored, expected) in diff.items())
+            self.stdout.write(f'⚠️ {usernames[user_id]}: {changes}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f'✅ All {len(user_ids)} users are in sync'))
+        elif options['check']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} of {len(user_ids)} users have drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Repaired stats for {len(drifted)} of {len(user_ids)} users'))
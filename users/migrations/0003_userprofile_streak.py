@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-18 13:22
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_streaks(apps, schema_editor):
+    """Compute the stored streak state from existing workout history"""
+    UserProfile = apps.get_model('users', 'UserProfile')
+    Workout = apps.get_model('workouts', 'Workout')
+
+    dates_by_user = {}
+    for user_id, day in Workout.objects.values_list('user_id', 'date').order_by('user_id', 'date').distinct():
+        dates_by_user.setdefault(user_id, []).append(day)
+
+    for user_id, dates in dates_by_user.items():
+        current_streak = best_streak = 0
+        last_date = None
+        for day in dates:
+            if last_date is not None and day == last_date + timedelta(days=1):
+                current_streak += 1
+            else:
+                current_streak = 1
+            best_streak = max(best_streak, current_streak)
+            last_date = day
+        UserProfile.objects.filter(user_id=user_id).update(
+            current_streak=current_streak,
+            best_streak=best_streak,
+            last_active_date=last_date,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_remove_userprofile_profile_picture_userprofile_theme'),
+        ('workouts', '0003_dailyactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='best_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0, help_text='Consecutive days ending on last_active_date'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='last_active_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
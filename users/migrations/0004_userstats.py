@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-18 13:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_user_stats(apps, schema_editor):
+    """Create a UserStats row for every existing user with counters derived from their data"""
+    User = apps.get_model('auth', 'User')
+    UserStats = apps.get_model('users', 'UserStats')
+    Workout = apps.get_model('workouts', 'Workout')
+    Exercise = apps.get_model('workouts', 'Exercise')
+    Goal = apps.get_model('goals', 'Goal')
+    Badge = apps.get_model('goals', 'Badge')
+
+    def counts(queryset, user_field='user'):
+        grouped = queryset.order_by().values(user_field).annotate(total=Count('pk'))
+        return {row[user_field]: row['total'] for row in grouped}
+
+    workouts = counts(Workout.objects.all())
+    completed_goals = counts(Goal.objects.filter(is_completed=True))
+    active_goals = counts(Goal.objects.filter(is_completed=False))
+    custom_exercises = counts(Exercise.objects.filter(is_custom=True, created_by__isnull=False), 'created_by')
+    badges = counts(Badge.objects.all())
+
+    UserStats.objects.bulk_create([
+        UserStats(
+            user_id=user_id,
+            workout_count=workouts.get(user_id, 0),
+            completed_goal_count=completed_goals.get(user_id, 0),
+            active_goal_count=active_goals.get(user_id, 0),
+            custom_exercise_count=custom_exercises.get(user_id, 0),
+            badge_count=badges.get(user_id, 0),
+        )
+        for user_id in User.objects.values_list('pk', flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_userprofile_streak'),
+        ('goals', '0004_badge'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workout_count', models.PositiveIntegerField(default=0)),
+                ('completed_goal_count', models.PositiveIntegerField(default=0)),
+                ('active_goal_count', models.PositiveIntegerField(default=0)),
+                ('custom_exercise_count', models.PositiveIntegerField(default=0)),
+                ('badge_count', models.PositiveIntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user stats',
+            },
+        ),
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_userprofile_calendar_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('building', 'Building'), ('ready', 'Ready')], default='building', max_length=10)),
+                ('member', models.PositiveIntegerField(default=0, help_text='Index of the member being written')),
+                ('last_pk', models.BigIntegerField(default=0, help_text='Last row written to the current member')),
+                ('staged_bytes', models.BigIntegerField(default=0, help_text="Size of the current member's file at the checkpoint")),
+                ('progress', models.JSONField(blank=True, default=dict)),
+                ('size', models.BigIntegerField(blank=True, help_text='Zip size in bytes, once ready', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='data_archives', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
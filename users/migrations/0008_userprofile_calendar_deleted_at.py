@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_cache_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='calendar_deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
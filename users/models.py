@@ -1,7 +1,11 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from datetime import timedelta
 
 
 class UserProfile(models.Model):
@@ -23,18 +27,124 @@ class UserProfile(models.Model):
         default='dark',
         help_text="Preferred color theme"
     )
+
+    # Streak state, maintained by workouts.utils on every workout write
+    current_streak = models.PositiveIntegerField(default=0, help_text="Consecutive days ending on last_active_date")
+    best_streak = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+
+    # Secret for the read-only .ics feed of the user's workouts; None until they ask for a link
+    calendar_token = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    # When a workout last left that feed, which the remaining rows' updated_at cannot show
+    calendar_deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    STREAK_FIELDS = ['current_streak', 'best_streak', 'last_active_date']
+
     def __str__(self):
         return f"{self.user.username}'s profile"
 
+    def reset_calendar_token(self):
+        """Issue a new calendar feed token, revoking any previous feed URL"""
+        self.calendar_token = secrets.token_urlsafe(32)
+        UserProfile.objects.filter(pk=self.pk).update(calendar_token=self.calendar_token)
+        return self.calendar_token
+
+    def save(self, *args, **kwargs):
+        # Streak state is written by the streak engine only, so a stale copy of
+        # the profile (e.g. cached on request.user) never overwrites it
+        if self.pk and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.STREAK_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def get_current_streak(self, today=None):
+        """Return the current streak, or 0 if the last workout was before yesterday"""
+        today = today or timezone.now().date()
+        if self.last_active_date and self.last_active_date >= today - timedelta(days=1):
+            return self.current_streak
+        return 0
+
+
+class UserStats(models.Model):
+    """
+    Per-user counters kept in step with the source tables by signals,
+    so pages read one row instead of running COUNT(*) queries.
+    Repair with `manage.py rebuild_user_stats`.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+    workout_count = models.PositiveIntegerField(default=0)
+    completed_goal_count = models.PositiveIntegerField(default=0)
+    active_goal_count = models.PositiveIntegerField(default=0)
+    custom_exercise_count = models.PositiveIntegerField(default=0)
+    badge_count = models.PositiveIntegerField(default=0)
+
+    COUNTER_FIELDS = [
+        'workout_count', 'completed_goal_count', 'active_goal_count', 'custom_exercise_count', 'badge_count',
+    ]
+
+    class Meta:
+        verbose_name_plural = 'user stats'
+
+    def __str__(self):
+        return f"{self.user.username}'s stats"
+
+
+class DataArchive(models.Model):
+    """
+    A "download all my data" zip, built by the background worker in resumable
+    steps (see users.archive_utils). `member`, `last_pk` and `staged_bytes`
+    are the checkpoint a step resumes from; `progress` holds rows written per member.
+    """
+    STATUS_BUILDING = 'building'
+    STATUS_READY = 'ready'
+
+    STATUS_CHOICES = [
+        (STATUS_BUILDING, 'Building'),
+        (STATUS_READY, 'Ready'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='data_archives')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_BUILDING)
+    member = models.PositiveIntegerField(default=0, help_text="Index of the member being written")
+    last_pk = models.BigIntegerField(default=0, help_text="Last row written to the current member")
+    staged_bytes = models.BigIntegerField(default=0, help_text="Size of the current member's file at the checkpoint")
+    progress = models.JSONField(default=dict, blank=True)
+    size = models.BigIntegerField(null=True, blank=True, help_text="Zip size in bytes, once ready")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.user.username}'s data archive ({self.get_status_display()})"
+
+
+class CacheVersion(models.Model):
+    """
+    Version counter for a family of cache entries (see users.cache_utils).
+    Kept in the database so every process sees a bump at once and a counter
+    can never be evicted and restart at a value that was already used.
+    """
+    key = models.CharField(max_length=200, primary_key=True)
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
-    """Create UserProfile when User is created"""
+    """Create UserProfile and UserStats when User is created"""
     if created:
         UserProfile.objects.create(user=instance)
+        UserStats.objects.create(user=instance)
 
 
 @receiver(post_save, sender=User)
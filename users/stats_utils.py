@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def _count(queryset, user_field):
+    """Correlated COUNT(*) subquery for a per-user counter"""
+    return Coalesce(
+        Subquery(queryset.order_by().values(user_field).annotate(total=Count('pk')).values('total')),
+        0,
+    )
+
+
+def stat_expressions(user_ref='pk'):
+    """
+    COUNT expressions that re-derive every UserStats counter from the source tables.
+    `user_ref` names the outer query's user id column.
+    """
+    from goals.models import Badge, Goal
+    from workouts.models import Exercise, Workout
+
+    user = OuterRef(user_ref)
+    return {
+        'workout_count': _count(Workout.objects.filter(user=user), 'user'),
+        'completed_goal_count': _count(Goal.objects.filter(user=user, is_completed=True), 'user'),
+        'active_goal_count': _count(Goal.objects.filter(user=user, is_completed=False), 'user'),
+        'custom_exercise_count': _count(
+            Exercise.objects.filter(created_by=user, is_custom=True), 'created_by'
+        ),
+        'badge_count': _count(Badge.objects.filter(user=user), 'user'),
+    }
+
+
+def bump_user_stats(user_id, **deltas):
+    """
+    Apply counter deltas with a single atomic UPDATE, e.g.
+    bump_user_stats(user.pk, workout_count=1).
+    Counters never go below zero; a missing row is rebuilt from scratch.
+    """
+    from .models import UserStats
+
+    changes = {name: Greatest(F(name) + delta, 0) for name, delta in deltas.items() if delta}
+    if not changes:
+        return
+    if not UserStats.objects.filter(user_id=user_id).update(**changes):
+        rebuild_user_stats([user_id])
+
+
+def sync_badge_count(user_id):
+    """Reset badge_count from the Badge table, for bulk awards that bypass signals"""
+    from .models import UserStats
+
+    UserStats.objects.filter(user_id=user_id).update(badge_count=stat_expressions('user_id')['badge_count'])
+
+
+def rebuild_user_stats(user_ids=None, dry_run=False, batch_size=500):
+    """
+    Re-derive the counters from the source tables in bulk.
+    Returns {user_id: {field: (stored, expected)}} for every row that had
+    drifted (a missing row counts as all zeros). Nothing is written with dry_run.
+    """
+    from .models import UserStats
+
+    users = User.objects.order_by('pk')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    fields = UserStats.COUNTER_FIELDS
+
+    drifted = {}
+    for start in range(0, users.count(), batch_size):
+        rows = list(users.values('pk', **stat_expressions())[start:start + batch_size])
+        stored = {
+            stats.user_id: stats
+            for stats in UserStats.objects.filter(user_id__in=[row['pk'] for row in rows])
+        }
+
+        to_create, to_update = [], []
+        for row in rows:
+            stats = stored.get(row['pk'])
+            missing = stats is None
+            if missing:
+                stats = UserStats(user_id=row['pk'])
+            diff = {
+                name: (getattr(stats, name), row[name])
+                for name in fields if getattr(stats, name) != row[name]
+            }
+            if diff or missing:
+                drifted[row['pk']] = diff
+                for name in fields:
+                    setattr(stats, name, row[name])
+                (to_create if missing else to_update).append(stats)
+
+        if not dry_run:
+            UserStats.objects.bulk_create(to_create)
+            UserStats.objects.bulk_update(to_update, fields)
+
+    return drifted
@@ -0,0 +1,139 @@
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from goals.models import Goal
+from jobs.models import Task
+from jobs.worker import run_pending
+from workouts.models import Exercise, Workout, WorkoutExercise
+from .archive_utils import ARCHIVE_MEMBERS, archive_dir, archive_path, build_archive, request_archive
+from .models import DataArchive
+
+
+class DataArchiveTests(TestCase):
+    def setUp(self):
+        self.exports_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.exports_root, ignore_errors=True)
+        settings_override = override_settings(EXPORTS_ROOT=self.exports_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        squat = Exercise.objects.create(name='Squat', category='strength', created_by=self.user, is_custom=True)
+        for day in range(1, 6):
+            workout = Workout.objects.create(user=self.user, title=f'Day {day}', date=date(2025, 6, day))
+            WorkoutExercise.objects.create(workout=workout, exercise=squat, sets=3, reps=5, weight=100)
+        Goal.objects.create(user=self.user, title='Run 100km', target_number=100, unit='km',
+                            target_date=date(2025, 12, 31))
+        Workout.objects.create(user=User.objects.create_user(username='other'), title='Not mine', date=date.today())
+
+    def read_archive(self, archive):
+        with zipfile.ZipFile(archive_path(archive)) as zf:
+            return {
+                name: [json.loads(line) for line in zf.read(name).decode().splitlines()]
+                for name in zf.namelist()
+            }
+
+    def test_archive_contains_every_member(self):
+        """Test the zip has one JSONL file per kind of data, holding only the user's rows"""
+        archive = request_archive(self.user)
+        run_pending()
+        archive.refresh_from_db()
+
+        members = self.read_archive(archive)
+
+        self.assertEqual(archive.status, DataArchive.STATUS_READY)
+        self.assertEqual(list(members), [member.name for member in ARCHIVE_MEMBERS])
+        self.assertEqual(members['profile.jsonl'][0]['username'], 'testuser')
+        self.assertNotIn('calendar_token', members['profile.jsonl'][0])
+        self.assertEqual([w['title'] for w in members['workouts.jsonl']], [f'Day {day}' for day in range(1, 6)])
+        self.assertEqual(members['workout_exercises.jsonl'][0]['exercise_name'], 'Squat')
+        self.assertEqual(members['workout_exercises.jsonl'][0]['weight'], '100.00')
+        self.assertEqual(members['goals.jsonl'][0]['title'], 'Run 100km')
+        self.assertEqual([e['name'] for e in members['custom_exercises.jsonl']], ['Squat'])
+        self.assertEqual(members['templates.jsonl'], [])
+        self.assertEqual(archive.progress['workouts.jsonl'], 5)
+        self.assertFalse(archive_dir(archive).exists())
+
+    def test_steps_resume_from_the_checkpoint(self):
+        """Test a build split over steps, with a crash mid-chunk, yields the same archive"""
+        archive = DataArchive.objects.create(user=self.user)
+
+        build_archive(archive.pk, rows_per_step=4, chunk_size=2)
+        archive.refresh_from_db()
+        self.assertEqual(archive.status, DataArchive.STATUS_BUILDING)
+        self.assertEqual(ARCHIVE_MEMBERS[archive.member].name, 'workouts.jsonl')
+        self.assertEqual(archive.progress['workouts.jsonl'], 4)
+        self.assertEqual(Task.objects.filter(status=Task.STATUS_QUEUED).count(), 1)
+
+        # A step that died after writing past its last checkpoint
+        with open(archive_dir(archive) / 'workouts.jsonl', 'ab') as staged:
+            staged.write(b'{"id": 5, "title": "half writ')
+
+        build_archive(archive.pk)
+        archive.refresh_from_db()
+
+        self.assertEqual(archive.status, DataArchive.STATUS_READY)
+        workouts = self.read_archive(archive)['workouts.jsonl']
+        self.assertEqual([w['title'] for w in workouts], [f'Day {day}' for day in range(1, 6)])
+
+    def test_request_does_not_duplicate_builds(self):
+        """Test asking again while a build is queued reuses it, and a failed build is resumed"""
+        archive = request_archive(self.user)
+        self.assertEqual(request_archive(self.user), archive)
+        self.assertEqual(Task.objects.count(), 1)
+
+        Task.objects.update(status=Task.STATUS_FAILED)
+        self.assertEqual(request_archive(self.user), archive)
+        self.assertEqual(Task.objects.filter(status=Task.STATUS_QUEUED).count(), 1)
+
+    def test_new_archive_replaces_the_old_one(self):
+        """Test starting over removes the previous archive and its file"""
+        old = request_archive(self.user)
+        run_pending()
+
+        new = request_archive(self.user)
+
+        self.assertNotEqual(new, old)
+        self.assertFalse(DataArchive.objects.filter(pk=old.pk).exists())
+        self.assertFalse(archive_path(old).exists())
+
+    def test_views(self):
+        """Test starting, following and downloading an archive from the profile pages"""
+        self.assertContains(self.client.get(reverse('profile')), reverse('data_archive'))
+
+        response = self.client.post(reverse('data_archive'))
+        self.assertRedirects(response, reverse('data_archive'))
+        self.assertContains(self.client.get(reverse('data_archive')), 'Preparing your archive')
+
+        run_pending()
+        archive = DataArchive.objects.get(user=self.user)
+        response = self.client.get(reverse('data_archive'))
+        self.assertContains(response, reverse('download_data_archive', args=[archive.pk]))
+
+        response = self.client.get(reverse('download_data_archive', args=[archive.pk]))
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'PK'))
+
+        self.client.force_login(User.objects.get(username='other'))
+        response = self.client.get(reverse('download_data_archive', args=[archive.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_file_sends_the_user_back_to_rebuild(self):
+        """Test a ready archive whose zip was wiped is dropped instead of failing the download"""
+        archive = request_archive(self.user)
+        run_pending()
+        archive_path(archive).unlink()
+
+        response = self.client.get(reverse('download_data_archive', args=[archive.pk]))
+
+        self.assertRedirects(response, reverse('data_archive'))
+        self.assertFalse(DataArchive.objects.filter(pk=archive.pk).exists())
+        self.assertContains(self.client.get(reverse('data_archive')), 'Create Archive')
@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from .cache_utils import bump_cache_version, cache_version, cache_versions
+from .models import CacheVersion
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_start_at_one_and_increase(self):
+        """Test a counter reads 1 until bumped and is created on the first bump"""
+        self.assertEqual(cache_version('demo:version'), 1)
+        self.assertFalse(CacheVersion.objects.exists())
+
+        bump_cache_version('demo:version')
+        bump_cache_version('demo:version')
+
+        self.assertEqual(cache_versions('demo:version', 'other:version'), {'demo:version': 3, 'other:version': 1})
+
+    def test_counters_survive_cache_eviction(self):
+        """Test clearing the cache (eviction, or a fresh worker process) never rewinds a counter"""
+        bump_cache_version('demo:version')
+        cache.clear()
+        # An entry written under version 1 that outlived the clear
+        cache.set('demo:1', 'stale')
+
+        self.assertEqual(cache_version('demo:version'), 2)
+        self.assertIsNone(cache.get(f"demo:{cache_version('demo:version')}"))
@@ -0,0 +1,133 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from goals.models import Badge, Goal
+from workouts.models import Exercise, Workout
+from .models import UserStats
+from .stats_utils import bump_user_stats, rebuild_user_stats
+
+
+class UserStatsSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def stats(self):
+        return UserStats.objects.get(user=self.user)
+
+    def test_stats_created_on_signup(self):
+        """Test a zeroed UserStats row is created with the user"""
+        stats = self.stats()
+        self.assertEqual(stats.workout_count, 0)
+        self.assertEqual(stats.badge_count, 0)
+
+    def test_workout_counter(self):
+        """Test workouts are counted on create and uncounted on delete"""
+        workout = Workout.objects.create(user=self.user, title='Run', date=date.today(), duration=30)
+        Workout.objects.create(user=self.user, title='Lift', date=date.today(), duration=45)
+        self.assertEqual(self.stats().workout_count, 2)
+
+        workout.title = 'Long Run'
+        workout.save()
+        self.assertEqual(self.stats().workout_count, 2)
+
+        workout.delete()
+        self.assertEqual(self.stats().workout_count, 1)
+
+    def test_goal_counters_follow_completion(self):
+        """Test completing a goal moves it from the active to the completed counter"""
+        goal = Goal.objects.create(user=self.user, title='Run 100km', target_date=date.today())
+        self.assertEqual(self.stats().active_goal_count, 1)
+
+        goal = Goal.objects.get(pk=goal.pk)
+        goal.mark_complete()
+        stats = self.stats()
+        self.assertEqual(stats.active_goal_count, 0)
+        self.assertEqual(stats.completed_goal_count, 1)
+
+        goal.delete()
+        self.assertEqual(self.stats().completed_goal_count, 0)
+
+    def test_custom_exercise_counter(self):
+        """Test only custom exercises owned by the user are counted"""
+        Exercise.objects.create(name='Squat', category='strength')
+        exercise = Exercise.objects.create(name='Mine', category='cardio', created_by=self.user, is_custom=True)
+        self.assertEqual(self.stats().custom_exercise_count, 1)
+
+        exercise.delete()
+        self.assertEqual(self.stats().custom_exercise_count, 0)
+
+    def test_badge_counter(self):
+        """Test badges are counted on award and removal"""
+        badge = Badge.objects.create(user=self.user, badge_type='first_workout')
+        self.assertEqual(self.stats().badge_count, 1)
+
+        badge.delete()
+        self.assertEqual(self.stats().badge_count, 0)
+
+    def test_counters_never_go_negative(self):
+        """Test a decrement on a zero counter stays at zero"""
+        bump_user_stats(self.user.pk, workout_count=-1)
+        self.assertEqual(self.stats().workout_count, 0)
+
+    def test_deleting_user_removes_stats(self):
+        """Test cascaded deletes do not try to update the removed stats row"""
+        Workout.objects.create(user=self.user, title='Run', date=date.today(), duration=30)
+        Goal.objects.create(user=self.user, title='Goal', target_date=date.today())
+        self.user.delete()
+        self.assertFalse(UserStats.objects.exists())
+
+
+class RebuildUserStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Workout.objects.create(user=self.user, title='Run', date=date.today(), duration=30)
+        Goal.objects.create(user=self.user, title='Goal', target_date=date.today(), is_completed=True)
+
+    def test_in_sync_reports_nothing(self):
+        """Test signal-maintained counters match the rebuilt values"""
+        self.assertEqual(rebuild_user_stats(), {})
+
+    def test_drift_is_reported_and_repaired(self):
+        """Test drifted counters are reported with stored and expected values"""
+        UserStats.objects.filter(user=self.user).update(workout_count=7)
+
+        drifted = rebuild_user_stats()
+
+        self.assertEqual(drifted, {self.user.pk: {'workout_count': (7, 1)}})
+        self.assertEqual(UserStats.objects.get(user=self.user).workout_count, 1)
+
+    def test_dry_run_does_not_write(self):
+        """Test dry_run only reports drift"""
+        UserStats.objects.filter(user=self.user).update(completed_goal_count=0)
+
+        rebuild_user_stats(dry_run=True)
+        self.assertEqual(UserStats.objects.get(user=self.user).completed_goal_count, 0)
+
+    def test_missing_row_is_created(self):
+        """Test users without a stats row get one"""
+        UserStats.objects.filter(user=self.user).delete()
+
+        drifted = rebuild_user_stats([self.user.pk])
+
+        self.assertIn(self.user.pk, drifted)
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual(stats.workout_count, 1)
+        self.assertEqual(stats.completed_goal_count, 1)
+
+    def test_command_reports_drift(self):
+        """Test rebuild_user_stats --check lists drifted users without fixing them"""
+        UserStats.objects.filter(user=self.user).update(badge_count=3)
+
+        out = StringIO()
+        call_command('rebuild_user_stats', '--check', stdout=out)
+
+        self.assertIn('testuser: badge_count 3 → 0', out.getvalue())
+        self.assertIn('1 of 1 users have drifted', out.getvalue())
+        self.assertEqual(UserStats.objects.get(user=self.user).badge_count, 3)
+
+        call_command('rebuild_user_stats', stdout=StringIO())
+        self.assertEqual(UserStats.objects.get(user=self.user).badge_count, 0)
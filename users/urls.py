@@ -4,5 +4,8 @@ from . import views
 urlpatterns = [
     path('profile/', views.profile_view, name='profile'),
     path('profile/change-password/', views.change_password, name='change_password'),
+    path('profile/calendar-feed/', views.reset_calendar_feed, name='reset_calendar_feed'),
+    path('profile/data-archive/', views.data_archive, name='data_archive'),
+    path('profile/data-archive/<int:pk>/download/', views.download_data_archive, name='download_data_archive'),
     path('toggle-theme/', views.toggle_theme, name='toggle_theme'),
 ]
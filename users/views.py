@@ -1,9 +1,11 @@
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 from .forms import UserUpdateForm, ProfileUpdateForm
+from .models import DataArchive, UserStats
 
 
 @login_required
@@ -22,18 +24,89 @@ def profile_view(request):
         user_form = UserUpdateForm(instance=request.user)
         profile_form = ProfileUpdateForm(instance=request.user.profile)
 
-    # Calculate active goals count
-    active_goals_count = request.user.goals.filter(is_completed=False).count()
+    # Counters are maintained on UserStats, so no COUNT(*) queries are needed
+    stats = UserStats.objects.filter(user=request.user).first()
 
+    calendar_token = request.user.profile.calendar_token
     context = {
         'user_form': user_form,
         'profile_form': profile_form,
-        'active_goals_count': active_goals_count,
+        'workouts_count': stats.workout_count if stats else 0,
+        'active_goals_count': stats.active_goal_count if stats else 0,
+        'calendar_feed_url': request.build_absolute_uri(
+            reverse('workout_calendar_feed', args=[calendar_token])
+        ) if calendar_token else None,
     }
 
     return render(request, 'users/profile.html', context)
 
 
+@login_required
+def reset_calendar_feed(request):
+    """Create (or replace) the secret link to the user's calendar feed"""
+    if request.method == 'POST':
+        had_feed = request.user.profile.calendar_token is not None
+        request.user.profile.reset_calendar_token()
+        if had_feed:
+            messages.success(request, 'New calendar link created. The old link no longer works. 🔑')
+        else:
+            messages.success(request, 'Calendar link created! Subscribe to it from your calendar app. 📅')
+    return redirect('profile')
+
+
+@login_required
+def data_archive(request):
+    """'Download all my data': start a zip archive and follow its progress"""
+    from jobs.models import Task
+    from .archive_utils import ARCHIVE_MEMBERS, archive_task, discard_if_missing, request_archive
+
+    if request.method == 'POST':
+        request_archive(request.user)
+        messages.success(request, 'Your data archive is being prepared. 📦')
+        return redirect('data_archive')
+
+    archive = DataArchive.objects.filter(user=request.user).first()
+    if archive is not None and discard_if_missing(archive):
+        archive = None
+    building = archive is not None and archive.status == DataArchive.STATUS_BUILDING
+    task = archive_task(archive) if building else None
+    members = [
+        {
+            'name': member.name,
+            'rows': archive.progress.get(member.name, 0),
+            'done': not building or index < archive.member,
+            'current': building and index == archive.member,
+        }
+        for index, member in enumerate(ARCHIVE_MEMBERS)
+    ] if archive else []
+
+    return render(request, 'users/data_archive.html', {
+        'archive': archive,
+        'building': building,
+        'failed': task is not None and task.status == Task.STATUS_FAILED,
+        'members': members,
+        'poll_seconds': 3,
+    })
+
+
+@login_required
+def download_data_archive(request, pk):
+    """Download a finished data archive"""
+    from datetime import datetime
+    from django.http import FileResponse
+    from django.shortcuts import get_object_or_404
+    from .archive_utils import archive_path, discard_if_missing
+
+    archive = get_object_or_404(DataArchive, pk=pk, user=request.user, status=DataArchive.STATUS_READY)
+    if discard_if_missing(archive):
+        messages.warning(request, 'That archive is no longer available. Please create a new one.')
+        return redirect('data_archive')
+    return FileResponse(
+        open(archive_path(archive), 'rb'), as_attachment=True, content_type='application/zip',
+        filename=f"FitTrack_Data_{datetime.now().strftime('%Y%m%d')}.zip",
+    )
+
+
 @login_required
 def change_password(request):
     """Change user password"""
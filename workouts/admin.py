@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exercise, Workout, WorkoutExercise
+from .models import Exercise, Workout, WorkoutExercise, DailyActivity
 from .template_models import WorkoutTemplate, TemplateExercise
 
 
@@ -27,6 +27,8 @@ class WorkoutAdmin(admin.ModelAdmin):
     search_fields = ['title', 'notes']
     inlines = [WorkoutExerciseInline]
     date_hierarchy = 'date'
+    # Derived from the exercises and never written by Workout.save()
+    readonly_fields = Workout.SUMMARY_FIELDS
 
 
 @admin.register(WorkoutTemplate)
@@ -36,3 +38,11 @@ class WorkoutTemplateAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     inlines = [TemplateExerciseInline]
     date_hierarchy = 'created_at'
+
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'workout_count', 'total_minutes', 'exercise_count']
+    list_filter = ['date']
+    search_fields = ['user__username']
+    date_hierarchy = 'date'
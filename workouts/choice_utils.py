@@ -0,0 +1,63 @@
+from django.core.cache import cache
+
+from users.cache_utils import bump_cache_version, cache_version, cache_versions, user_cache_key
+
+CHOICES_CACHE_TIMEOUT = 24 * 60 * 60
+
+DEFAULT_VERSION_KEY = 'exercise_choices:default:version'
+
+
+def _custom_version_key(user):
+    return user_cache_key(user, 'exercise_choices', 'version')
+
+
+def bump_default_exercise_choices():
+    """Invalidate the shared default exercise list everywhere"""
+    bump_cache_version(DEFAULT_VERSION_KEY)
+
+
+def bump_custom_exercise_choices(user):
+    """Invalidate one user's custom exercise list"""
+    bump_cache_version(_custom_version_key(user))
+
+
+def default_exercise_choices(version=None):
+    """(id, name) pairs for the built-in exercise library, shared by all users"""
+    from .models import Exercise
+
+    key = f'exercise_choices:default:{version or cache_version(DEFAULT_VERSION_KEY)}'
+    choices = cache.get(key)
+    if choices is None:
+        choices = list(Exercise.objects.filter(is_custom=False).order_by('name').values_list('id', 'name'))
+        cache.set(key, choices, CHOICES_CACHE_TIMEOUT)
+    return choices
+
+
+def custom_exercise_choices(user, version=None):
+    """(id, label) pairs for a user's own exercises, cached per user"""
+    from .models import Exercise
+
+    key = user_cache_key(user, 'exercise_choices', version or cache_version(_custom_version_key(user)))
+    choices = cache.get(key)
+    if choices is None:
+        exercises = Exercise.objects.filter(created_by=user, is_custom=True).order_by('name')
+        choices = [(pk, f"{name} ✨") for pk, name in exercises.values_list('id', 'name')]
+        cache.set(key, choices, CHOICES_CACHE_TIMEOUT)
+    return choices
+
+
+def exercise_choices(user):
+    """
+    Grouped choices for the exercise dropdown - custom exercises first.
+    Returns an empty list if there are no exercises at all.
+    """
+    # Both version counters in one query
+    versions = cache_versions(_custom_version_key(user), DEFAULT_VERSION_KEY)
+    choices = []
+    custom = custom_exercise_choices(user, versions[_custom_version_key(user)])
+    if custom:
+        choices.append(('My Custom Exercises', custom))
+    default = default_exercise_choices(versions[DEFAULT_VERSION_KEY])
+    if default:
+        choices.append(('Default Exercises', default))
+    return choices
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from .import_utils import CSV_COLUMNS
+
+DATA_EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+DATA_EXPORT_CHUNK_SIZE = 2000
+# Lines joined per yielded chunk, so the response is not one write per row
+DATA_EXPORT_LINES_PER_CHUNK = 200
+
+# Workout columns, then the exercise columns from the LEFT JOIN (all NULL for a workout without exercises)
+EXPORT_FIELDS = [
+    'id', 'date', 'title', 'duration', 'notes',
+    'workout_exercises__exercise__name', 'workout_exercises__sets', 'workout_exercises__reps',
+    'workout_exercises__weight', 'workout_exercises__unit', 'workout_exercises__distance',
+    'workout_exercises__duration', 'workout_exercises__notes',
+]
+
+
+def iter_export_rows(user, chunk_size=DATA_EXPORT_CHUNK_SIZE):
+    """
+    Yield one flat tuple per exercise (or per workout without exercises),
+    ordered so each workout's rows are consecutive. It is a single joined
+    values_list() query read with iterator(), which uses a server-side cursor
+    where the backend supports it, so no model instances are built.
+    """
+    from .models import Workout
+
+    return Workout.objects.filter(user=user).order_by('date', 'id', 'workout_exercises__id').values_list(
+        *EXPORT_FIELDS
+    ).iterator(chunk_size=chunk_size)
+
+
+def _csv_value(value):
+    return '' if value is None else value
+
+
+def _json_number(value):
+    # Decimals have two places and at most four digits before the point, so floats are exact enough
+    return None if value is None else float(value)
+
+
+def _chunked(lines, size=DATA_EXPORT_LINES_PER_CHUNK):
+    """Join lines into chunks; the first line goes out alone so the download starts at once"""
+    lines = iter(lines)
+    yield from islice(lines, 1)
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _csv_lines(user):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield line(CSV_COLUMNS)
+    for workout_id, day, title, duration, notes, *exercise in iter_export_rows(user):
+        yield line([workout_id, day.isoformat(), title, _csv_value(duration), notes, *map(_csv_value, exercise)])
+
+
+def iter_csv_export(user):
+    """
+    Yield the user's history as CSV in the import format: one row per
+    exercise, with the workout columns repeated on each row
+    """
+    return _chunked(_csv_lines(user))
+
+
+def _jsonl_lines(user):
+    current_id, current = None, None
+    for workout_id, day, title, duration, notes, name, sets, reps, weight, unit, distance, minutes, \
+            exercise_notes in iter_export_rows(user):
+        if workout_id != current_id:
+            if current is not None:
+                yield json.dumps(current, ensure_ascii=False) + '\n'
+            current_id = workout_id
+            current = {
+                'date': day.isoformat(), 'title': title, 'duration': duration, 'notes': notes, 'exercises': [],
+            }
+        if name is not None:
+            current['exercises'].append({
+                'exercise': name,
+                'sets': sets,
+                'reps': reps,
+                'weight': _json_number(weight),
+                'unit': unit,
+                'distance': _json_number(distance),
+                'duration': minutes,
+                'notes': exercise_notes,
+            })
+    if current is not None:
+        yield json.dumps(current, ensure_ascii=False) + '\n'
+
+
+def iter_jsonl_export(user):
+    """Yield the user's history as JSON Lines in the import format: one workout per line"""
+    return _chunked(_jsonl_lines(user))
+
+
+def iter_data_export(user, file_format):
+    if file_format not in DATA_EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    return iter_jsonl_export(user) if file_format == 'jsonl' else iter_csv_export(user)
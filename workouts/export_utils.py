@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+EXPORT_KINDS = ['workouts', 'detailed', 'goals']
+# Related name on User each export is rendered from
+EXPORT_SOURCES = {'workouts': 'workouts', 'detailed': 'workouts', 'goals': 'goals'}
+EXPORT_LABELS = {'workouts': 'workouts', 'detailed': 'detailed workout', 'goals': 'goals'}
+EXPORT_POLL_SECONDS = 2
+
+
+def exports_root():
+    """Directory rendered exports are stored in (outside MEDIA_ROOT: they are private)"""
+    return Path(getattr(settings, 'EXPORTS_ROOT', Path(settings.BASE_DIR) / 'exports'))
+
+
+def _export_queryset(user_id, kind):
+    from goals.models import Goal
+    from .models import Workout
+
+    if kind in ('workouts', 'detailed'):
+        return Workout.objects.filter(user_id=user_id).order_by('-date')
+    if kind == 'goals':
+        return Goal.objects.filter(user_id=user_id).order_by('-created_at')
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+def export_version(user_id, kind):
+    """
+    Fingerprint of the data an export is rendered from, from one aggregate query.
+    Any insert, edit or delete changes the row count or the latest updated_at,
+    so a stored file with the same version is still up to date.
+    """
+    from django.contrib.auth.models import User
+
+    source = EXPORT_SOURCES[kind]
+    state = User.objects.filter(pk=user_id).values('username').annotate(
+        count=Count(source), updated=Max(f'{source}__updated_at')
+    ).get()
+    raw = f"{kind}:{state['username']}:{state['count']}:{state['updated']}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def export_path(user_id, kind, version):
+    return exports_root() / str(user_id) / f'{kind}-{version}.pdf'
+
+
+def render_export(user_id, kind):
+    """
+    Background task: render the user's PDF for their current data version.
+    The PDF is written straight to a temporary file and renamed into place, so a
+    download never sees a half-written PDF; older versions are removed.
+    Returns the stored path.
+    """
+    from django.contrib.auth.models import User
+    from .pdf_utils import write_detailed_workouts_pdf, write_goals_pdf, write_workouts_pdf
+
+    version = export_version(user_id, kind)
+    path = export_path(user_id, kind, version)
+    if path.exists():
+        return str(path)
+
+    user = User.objects.get(pk=user_id)
+    write = {
+        'workouts': write_workouts_pdf,
+        'detailed': write_detailed_workouts_pdf,
+        'goals': write_goals_pdf,
+    }[kind]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            write(_export_queryset(user_id, kind), user, tmp)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    for old in path.parent.glob(f'{kind}-*.pdf'):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return str(path)
+
+
+def request_export(user_id, kind):
+    """
+    Return the path of an up-to-date export, or None after making sure a
+    render is queued (at most one per user and kind).
+    """
+    from jobs.queue import enqueue, find_pending
+
+    path = export_path(user_id, kind, export_version(user_id, kind))
+    if path.exists():
+        return path
+    if not find_pending(render_export, args=(user_id, kind)):
+        enqueue(render_export, args=(user_id, kind))
+    return None
+
+
+def export_task(user_id, kind):
+    """The most recent render task for this user and kind, if any"""
+    from jobs.models import Task
+    from jobs.queue import task_name
+
+    return Task.objects.filter(
+        name=task_name(render_export), args=[user_id, kind]
+    ).order_by('-id').first()
+
+
+def export_download_url(kind):
+    """URL of the download view for an export kind"""
+    from django.urls import reverse
+
+    if kind == 'goals':
+        return reverse('export_goals_pdf')
+    url = reverse('export_workouts_pdf')
+    return f'{url}?mode=detailed' if kind == 'detailed' else url
+
+
+def export_filename(kind):
+    return f"FitTrack_{kind.title()}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+
+def serve_export(request, kind):
+    """
+    Download view body shared by the workout and goal exports: stream the
+    stored PDF if it is current, otherwise queue a render and send the user
+    to the status page, which polls until the file is ready.
+    """
+    from django.http import FileResponse
+    from django.shortcuts import redirect
+
+    path = request_export(request.user.pk, kind)
+    if path is None:
+        return redirect('export_status', kind=kind)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=export_filename(kind),
+                        content_type='application/pdf')
@@ -1,6 +1,11 @@
+from datetime import timedelta
+
 from django import forms
-from django.forms import inlineformset_factory
-from .models import Workout, WorkoutExercise, Exercise
+from django.db import transaction
+from django.db.models import Q
+from django.forms import BaseInlineFormSet, inlineformset_factory
+from .choice_utils import exercise_choices
+from .models import Workout, WorkoutExercise, Exercise, deferred_exercise_refresh
 
 
 class WorkoutForm(forms.ModelForm):
@@ -20,26 +25,19 @@ class WorkoutExerciseForm(forms.ModelForm):
     """Form for individual exercises within a workout"""
 
     def __init__(self, *args, **kwargs):
-        # Get user from kwargs if provided
+        # Get user from kwargs if provided; the formset passes prebuilt choices
         user = kwargs.pop('user', None)
+        choices = kwargs.pop('exercise_choices', None)
         super().__init__(*args, **kwargs)
 
         if user:
-            # Get default and custom exercises
-            default_exercises = Exercise.objects.filter(is_custom=False).order_by('name')
-            custom_exercises = Exercise.objects.filter(created_by=user, is_custom=True).order_by('name')
-
-            # Create choices with optgroups - CUSTOM FIRST!
-            choices = []
-            if custom_exercises.exists():
-                choices.append(('My Custom Exercises', [(ex.id, f"{ex.name} ✨") for ex in custom_exercises]))
-            if default_exercises.exists():
-                choices.append(('Default Exercises', [(ex.id, ex.name) for ex in default_exercises]))
-
-            # If no groups, just show all
-            if not choices:
-                self.fields['exercise'].queryset = Exercise.objects.all()
-            else:
+            if choices is None:
+                choices = exercise_choices(user)
+            # Only the library and the user's own exercises are valid picks
+            self.fields['exercise'].queryset = Exercise.objects.filter(Q(is_custom=False) | Q(created_by=user))
+
+            # Without any exercises the field keeps its queryset-backed choices
+            if choices:
                 self.fields['exercise'].choices = [('', '---------')] + choices
 
     class Meta:
@@ -57,11 +55,69 @@ class WorkoutExerciseForm(forms.ModelForm):
         }
 
 
+class BaseWorkoutExerciseFormSet(BaseInlineFormSet):
+    """
+    Builds the exercise dropdown choices once and shares them with every form,
+    and saves all rows with one bulk INSERT, one bulk UPDATE and one DELETE
+    (plus the SELECT the delete signals need).
+    """
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        if kwargs.get('user') and 'exercise_choices' not in kwargs:
+            if not hasattr(self, '_exercise_choices'):
+                self._exercise_choices = exercise_choices(kwargs['user'])
+            kwargs['exercise_choices'] = self._exercise_choices
+        return kwargs
+
+    def save(self, commit=True):
+        """
+        Save the formset with a constant number of statements however many rows
+        changed. Bulk writes skip the per-row signals, so the workout's summary,
+        rollup and search entry are refreshed once at the end instead.
+        """
+        if not commit:
+            return super().save(commit=False)
+
+        self.new_objects, self.changed_objects, self.deleted_objects = [], [], []
+        for form in self.initial_forms:
+            obj = form.instance
+            if obj.pk is None:
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                self.deleted_objects.append(obj)
+            elif form.has_changed():
+                self.changed_objects.append((form.save(commit=False), form.changed_data))
+        for form in self.extra_forms:
+            if form.has_changed() and not (self.can_delete and self._should_delete_form(form)):
+                obj = form.save(commit=False)
+                obj.workout = self.instance
+                self.new_objects.append(obj)
+
+        fields = [name for name in self.form._meta.fields if name in {f.name for f in self.model._meta.fields}]
+        with transaction.atomic():
+            if self.deleted_objects:
+                # The workout is refreshed once below, not once per deleted row
+                with deferred_exercise_refresh():
+                    self.model.objects.filter(
+                        pk__in=[obj.pk for obj in self.deleted_objects], workout=self.instance
+                    ).delete()
+            if self.changed_objects:
+                self.model.objects.bulk_update([obj for obj, _ in self.changed_objects], fields)
+            if self.new_objects:
+                self.model.objects.bulk_create(self.new_objects)
+            if self.deleted_objects or self.changed_objects or self.new_objects:
+                self.instance.exercises_changed()
+
+        return [obj for obj, _ in self.changed_objects] + self.new_objects
+
+
 # Formset for managing multiple exercises in a workout - EXTRA=0 (start with 1 only)
 WorkoutExerciseFormSet = inlineformset_factory(
     Workout,
     WorkoutExercise,
     form=WorkoutExerciseForm,
+    formset=BaseWorkoutExerciseFormSet,
     extra=0,  # Changed from 1 to 0
     can_delete=True,
     min_num=1,
@@ -93,3 +149,50 @@ class ExerciseForm(forms.ModelForm):
             'category': 'Category',
             'description': 'Description (Optional)',
         }
+
+
+class WorkoutImportForm(forms.Form):
+    """Upload a CSV or JSON Lines file of workouts"""
+    FORMAT_CHOICES = [
+        ('', 'Detect from file name'),
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ]
+
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.jsonl'}))
+    file_format = forms.ChoiceField(
+        choices=FORMAT_CHOICES, required=False, label='Format',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+
+
+class TemplateScheduleForm(forms.Form):
+    """Pick the days to create workouts from a template on"""
+    WEEKDAY_CHOICES = [
+        ('0', 'Mon'), ('1', 'Tue'), ('2', 'Wed'), ('3', 'Thu'), ('4', 'Fri'), ('5', 'Sat'), ('6', 'Sun'),
+    ]
+
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    end_date = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    weekdays = forms.MultipleChoiceField(
+        choices=WEEKDAY_CHOICES,
+        widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
+    )
+
+    def clean(self):
+        from .template_utils import MAX_TEMPLATE_DATES
+
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        weekdays = {int(day) for day in cleaned_data.get('weekdays', [])}
+        if start and end and weekdays:
+            if end < start:
+                raise forms.ValidationError("End date must be on or after the start date.")
+            days = (end - start).days + 1
+            if days > MAX_TEMPLATE_DATES:
+                raise forms.ValidationError(f"You can schedule at most {MAX_TEMPLATE_DATES} days at once.")
+            dates = [start + timedelta(days=offset) for offset in range(days)]
+            cleaned_data['dates'] = [day for day in dates if day.weekday() in weekdays]
+            if not cleaned_data['dates']:
+                raise forms.ValidationError("None of the chosen weekdays fall in that range.")
+        return cleaned_data
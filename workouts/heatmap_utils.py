@@ -0,0 +1,155 @@
+from calendar import monthrange
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from users.cache_utils import bump_cache_version, cache_versions, user_cache_key
+
+HEATMAP_MONTHS = 12
+# Month entries sit in each worker's local cache and are keyed by the version
+# counters in the database, so a bump anywhere retires them everywhere. The
+# retired entries linger until they expire, so they are kept for a day rather
+# than a month; rereading a year from the rollup is a single query anyway.
+MONTH_CACHE_TIMEOUT = 24 * 60 * 60
+HEATMAP_LEVELS = 4
+
+# Bumped by a full rollup rebuild, which can touch any user's history
+GLOBAL_VERSION_KEY = 'activity_months:version'
+
+
+def _user_version_key(user_id):
+    # Keyed by id alone: the month entries themselves are scoped with user_cache_key
+    return f'activity_months:version:{user_id}'
+
+
+def _month_key(user, versions, year, month):
+    return user_cache_key(user, 'activity_month', *versions, f'{year:04d}-{month:02d}')
+
+
+def _month_versions(user):
+    """The global and per-user version counters, read in one query"""
+    versions = cache_versions(GLOBAL_VERSION_KEY, _user_version_key(user.pk))
+    return versions[GLOBAL_VERSION_KEY], versions[_user_version_key(user.pk)]
+
+
+def month_bounds(year, month):
+    """First and last day of a month"""
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def shift_month(year, month, offset):
+    """(year, month) moved by `offset` months"""
+    index = year * 12 + month - 1 + offset
+    return index // 12, index % 12 + 1
+
+
+def invalidate_activity_months(user_id, dates=None):
+    """
+    Drop a user's cached month aggregates if any of `dates` is in a finished
+    month (always, if dates is None). The current month is computed live, so
+    logging today's workout never invalidates anything.
+    """
+    if dates is not None:
+        # ISO strings order like dates, and signals may pass either
+        current_month = timezone.localdate().replace(day=1).isoformat()
+        if not any(str(day) < current_month for day in dates):
+            return
+    bump_cache_version(_user_version_key(user_id))
+
+
+def invalidate_all_activity_months():
+    """Drop every user's cached month aggregates"""
+    bump_cache_version(GLOBAL_VERSION_KEY)
+
+
+def activity_by_month(user, months):
+    """
+    Return {(year, month): {date: (workout_count, total_minutes)}} for the given months.
+    Finished months come from the cache; the rest (and any cache misses) are read
+    from the DailyActivity rollup in a single query, and finished ones are cached.
+    """
+    from .models import DailyActivity
+
+    current_month = timezone.localdate().replace(day=1)
+    finished = {(year, month) for year, month in months if date(year, month, 1) < current_month}
+
+    versions = _month_versions(user) if finished else ()
+    keys = {_month_key(user, versions, year, month): (year, month) for year, month in finished}
+    activity = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = [month for month in months if month not in activity]
+    if missing:
+        start = month_bounds(*min(missing))[0]
+        end = month_bounds(*max(missing))[1]
+        for month in missing:
+            activity[month] = {}
+        rows = DailyActivity.objects.filter(user=user, date__range=(start, end)).values_list(
+            'date', 'workout_count', 'total_minutes'
+        )
+        for day, workout_count, total_minutes in rows:
+            month = (day.year, day.month)
+            if month in missing:
+                activity[month][day] = (workout_count, total_minutes)
+
+        cache.set_many({
+            _month_key(user, versions, year, month): activity[(year, month)]
+            for year, month in missing if (year, month) in finished
+        }, MONTH_CACHE_TIMEOUT)
+
+    return activity
+
+
+def _level(workout_count, total_minutes, max_minutes):
+    """Heatmap intensity from 0 (rest day) to HEATMAP_LEVELS"""
+    if not workout_count:
+        return 0
+    if not max_minutes:
+        return 1
+    return max(1, -(-total_minutes * HEATMAP_LEVELS // max_minutes))
+
+
+def year_heatmap(user, end_year, end_month):
+    """
+    Contributions-style heatmap of the 12 months ending with `end_year`/`end_month`.
+    Returns a dict with `weeks` (columns of 7 day cells, Monday first, labelled
+    with the month that starts in them) and the window's totals.
+    """
+    months = [shift_month(end_year, end_month, offset) for offset in range(1 - HEATMAP_MONTHS, 1)]
+    activity = {}
+    for days in activity_by_month(user, months).values():
+        activity.update(days)
+
+    first_day = month_bounds(*months[0])[0]
+    last_day = month_bounds(*months[-1])[1]
+    today = timezone.localdate()
+    max_minutes = max((minutes for _, minutes in activity.values()), default=0)
+
+    weeks = []
+    day = first_day - timedelta(days=first_day.weekday())
+    while day <= last_day:
+        week = {'label': '', 'days': []}
+        for _ in range(7):
+            in_range = first_day <= day <= last_day
+            workout_count, total_minutes = activity.get(day, (0, 0))
+            week['days'].append({
+                'date': day,
+                'in_range': in_range,
+                'is_today': day == today,
+                'workout_count': workout_count,
+                'total_minutes': total_minutes,
+                'level': _level(workout_count, total_minutes, max_minutes),
+            })
+            if day.day == 1 and in_range:
+                week['label'] = day.strftime('%b')
+            day += timedelta(days=1)
+        weeks.append(week)
+
+    return {
+        'weeks': weeks,
+        'first_day': first_day,
+        'last_day': last_day,
+        'total_workouts': sum(count for count, _ in activity.values()),
+        'total_duration': sum(minutes for _, minutes in activity.values()),
+        'active_days': len(activity),
+    }
@@ -0,0 +1,99 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+ICAL_CHUNK_SIZE = 500
+PRODID = '-//FitTrack Aura//Workouts//EN'
+
+
+def mark_feed_deleted(user_id):
+    """Record that a workout left the user's feed, which max(updated_at) cannot show"""
+    from users.models import UserProfile
+
+    UserProfile.objects.filter(user_id=user_id).update(calendar_deleted_at=timezone.now())
+
+
+def feed_state(user):
+    """
+    (etag, last_modified) for a user's feed from one aggregate query.
+    The ETag covers edits (latest updated_at) and deletions (row count);
+    Last-Modified also takes the last deletion into account. Everything comes
+    from the database, so every worker answers the same for the same feed.
+    """
+    from .models import Workout
+
+    profile = user.profile
+    state = Workout.objects.filter(user=user).aggregate(count=Count('id'), updated=Max('updated_at'))
+    last_modified = max(filter(None, [state['updated'], profile.calendar_deleted_at]), default=profile.created_at)
+    etag = f"{state['count']}-{last_modified.timestamp():.6f}"
+    return etag, last_modified
+
+
+def escape_text(value):
+    """Escape a TEXT value per RFC 5545"""
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def fold_line(line):
+    """Fold a content line to 75 octets, without splitting UTF-8 characters"""
+    folded, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            folded.append(current)
+            # Continuation lines start with a space, which counts towards the limit
+            current, size = ' ', 1
+        current += char
+        size += width
+    folded.append(current)
+    return '\r\n'.join(folded) + '\r\n'
+
+
+def workout_event(workout, domain):
+    """One VEVENT for a workout, as an all-day event on its date"""
+    description = []
+    if workout.duration:
+        description.append(f"Duration: {workout.duration} min")
+    if workout.notes:
+        description.append(workout.notes)
+
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:workout-{workout.pk}@{domain}',
+        f"DTSTAMP:{workout.updated_at.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART;VALUE=DATE:{workout.date.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{(workout.date + timedelta(days=1)).strftime('%Y%m%d')}",
+        f'SUMMARY:{escape_text(workout.title)}',
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(chr(10).join(description))}")
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
+
+
+def iter_calendar(user, domain, chunk_size=ICAL_CHUNK_SIZE):
+    """
+    Yield the user's workouts as an iCalendar document, one event at a time.
+    Rows are read with iterator(), so the database streams them in chunks
+    (a server-side cursor where the backend supports it) and memory stays flat.
+    """
+    from .models import Workout
+
+    yield ''.join(fold_line(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(f"FitTrack Aura - {user.username}")}',
+    ])
+    workouts = Workout.objects.filter(user=user).only(
+        'id', 'title', 'date', 'duration', 'notes', 'updated_at'
+    ).order_by('date', 'id')
+    for workout in workouts.iterator(chunk_size=chunk_size):
+        yield workout_event(workout, domain)
+    yield fold_line('END:VCALENDAR')
@@ -0,0 +1,305 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+# One row per exercise; the workout columns repeat on each of its rows and
+# consecutive rows with the same `workout` key belong to the same workout
+# (the same date and title, for files without that column). The key only
+# groups rows within the file. A row with an empty `exercise` column is a
+# workout without exercises.
+CSV_COLUMNS = [
+    'workout', 'date', 'title', 'duration', 'notes',
+    'exercise', 'sets', 'reps', 'weight', 'unit', 'distance', 'exercise_duration', 'exercise_notes',
+]
+
+IMPORT_FORMATS = ['csv', 'jsonl']
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportRowError(ValueError):
+    """A workout in the file that cannot be imported"""
+
+
+@dataclass
+class ImportResult:
+    workouts_created: int = 0
+    exercises_created: int = 0
+    custom_exercises_created: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Line {line}: {message}")
+
+
+def guess_format(filename):
+    """'csv' or 'jsonl' from a file name, defaulting to csv"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def iter_csv_workouts(lines):
+    """
+    Yield (line_number, workout_dict) from CSV text lines, grouping consecutive
+    exercise rows of the same workout. Only one workout is held in memory.
+    """
+    current, current_key = None, None
+    reader = csv.DictReader(lines)
+    for row in reader:
+        line = reader.line_num
+        workout_key = (row.get('workout') or '').strip()
+        key = ('workout', workout_key) if workout_key else ('date', row.get('date'), row.get('title'))
+        if current is None or key != current_key:
+            if current is not None:
+                yield current
+            current_key = key
+            current = (line, {
+                'date': row.get('date'),
+                'title': row.get('title'),
+                'duration': row.get('duration'),
+                'notes': row.get('notes'),
+                'exercises': [],
+            })
+        if (row.get('exercise') or '').strip():
+            current[1]['exercises'].append({
+                'exercise': row.get('exercise'),
+                'sets': row.get('sets'),
+                'reps': row.get('reps'),
+                'weight': row.get('weight'),
+                'unit': row.get('unit'),
+                'distance': row.get('distance'),
+                'duration': row.get('exercise_duration'),
+                'notes': row.get('exercise_notes'),
+            })
+    if current is not None:
+        yield current
+
+
+def iter_jsonl_workouts(lines):
+    """Yield (line_number, workout_dict) from JSON Lines text, one workout per line"""
+    for line, text in enumerate(lines, start=1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            workout = json.loads(text)
+        except json.JSONDecodeError as exc:
+            workout = {'_error': f"Invalid JSON ({exc.msg})"}
+        if not isinstance(workout, dict):
+            workout = {'_error': "Expected a JSON object"}
+        yield line, workout
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _int(value, name):
+    if _blank(value):
+        return None
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ImportRowError(f"{name} must be a whole number")
+    if number < 0:
+        raise ImportRowError(f"{name} cannot be negative")
+    return number
+
+
+def _decimal(value, name):
+    if _blank(value):
+        return None
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ImportRowError(f"{name} must be a number")
+    if not number.is_finite() or number < 0 or number >= 10000:
+        raise ImportRowError(f"{name} must be between 0 and 9999.99")
+    return number.quantize(Decimal('0.01'))
+
+
+def _text(value):
+    return '' if _blank(value) else str(value).strip()
+
+
+class WorkoutImporter:
+    """
+    Stream workouts into the database for one user.
+    Rows are validated and buffered per batch; each batch is written with two
+    bulk_create calls in its own transaction, so memory stays bounded by the
+    batch size. Exercise names are resolved against an in-memory name -> id map;
+    unknown names become the user's custom exercises.
+    """
+
+    def __init__(self, user, batch_size=IMPORT_BATCH_SIZE, create_exercises=True, incremental=False):
+        from .models import Exercise
+
+        self.user = user
+        self.batch_size = batch_size
+        self.create_exercises = create_exercises
+        # Refresh only the days written (small batches) instead of rebuilding the user's history
+        self.incremental = incremental
+        self.result = ImportResult()
+        self.batch = []
+        self.dates = set()
+
+        # Library first so the user's own exercises win on a name clash
+        self.exercise_ids = {}
+        library = Exercise.objects.filter(is_custom=False).values_list('name', 'id')
+        custom = Exercise.objects.filter(created_by=user, is_custom=True).values_list('name', 'id')
+        for name, pk in [*library, *custom]:
+            self.exercise_ids[name.strip().lower()] = pk
+        self.new_exercises = {}
+
+    def run(self, workouts):
+        """Import an iterable of (line_number, workout_dict) and return the ImportResult"""
+        for line, data in workouts:
+            try:
+                self.batch.append(self.build(data))
+            except ImportRowError as exc:
+                self.result.add_error(line, exc)
+                continue
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+        self.flush()
+        self.finish()
+        return self.result
+
+    def build(self, data):
+        """Validate one workout dict and return (Workout, [(exercise name, WorkoutExercise)])"""
+        from .models import Workout, WorkoutExercise
+        from .summary_utils import summarize_exercises
+
+        if '_error' in data:
+            raise ImportRowError(data['_error'])
+        try:
+            day = date.fromisoformat(_text(data.get('date')))
+        except ValueError:
+            raise ImportRowError("date must be YYYY-MM-DD")
+        title = _text(data.get('title'))
+        if not title:
+            raise ImportRowError("title is required")
+        if len(title) > 200:
+            raise ImportRowError("title is longer than 200 characters")
+
+        workout = Workout(
+            user=self.user,
+            title=title,
+            date=day,
+            duration=_int(data.get('duration'), 'duration'),
+            notes=_text(data.get('notes')),
+        )
+
+        exercises = []
+        for item in data.get('exercises') or []:
+            if not isinstance(item, dict):
+                raise ImportRowError("exercises must be objects")
+            name = _text(item.get('exercise') or item.get('name'))
+            if not name:
+                raise ImportRowError("exercise name is required")
+            if len(name) > 200:
+                raise ImportRowError("exercise name is longer than 200 characters")
+            unit = _text(item.get('unit')).lower() or 'kg'
+            if unit not in ('kg', 'lbs'):
+                raise ImportRowError("unit must be kg or lbs")
+            exercises.append((name, WorkoutExercise(
+                sets=_int(item.get('sets'), 'sets'),
+                reps=_int(item.get('reps'), 'reps'),
+                weight=_decimal(item.get('weight'), 'weight'),
+                unit=unit,
+                distance=_decimal(item.get('distance'), 'distance'),
+                duration=_int(item.get('duration'), 'exercise duration'),
+                notes=_text(item.get('notes')),
+            )))
+            if name.lower() not in self.exercise_ids and not self.create_exercises:
+                raise ImportRowError(f"unknown exercise '{name}'")
+
+        # Fill the summary columns in now rather than re-aggregating after the insert
+        for name, value in summarize_exercises(exercise for _, exercise in exercises).items():
+            setattr(workout, name, value)
+        return workout, exercises
+
+    def resolve_exercises(self):
+        """Create any exercise names in the batch that are not known yet"""
+        from .models import Exercise
+
+        missing = {}
+        for _, exercises in self.batch:
+            for name, _ in exercises:
+                key = name.lower()
+                if key not in self.exercise_ids and key not in missing:
+                    missing[key] = Exercise(
+                        name=name, category='strength', created_by=self.user, is_custom=True
+                    )
+        if missing:
+            Exercise.objects.bulk_create(missing.values())
+            for key, exercise in missing.items():
+                self.exercise_ids[key] = exercise.pk
+            self.new_exercises.update(missing)
+            self.result.custom_exercises_created += len(missing)
+
+    def flush(self):
+        from .models import Workout, WorkoutExercise
+        from .search_utils import index_workouts
+
+        if not self.batch:
+            return
+        with transaction.atomic():
+            self.resolve_exercises()
+            workouts = Workout.objects.bulk_create([workout for workout, _ in self.batch])
+
+            rows = []
+            for workout, (_, exercises) in zip(workouts, self.batch):
+                for name, workout_exercise in exercises:
+                    workout_exercise.workout_id = workout.pk
+                    workout_exercise.exercise_id = self.exercise_ids[name.lower()]
+                    rows.append(workout_exercise)
+            WorkoutExercise.objects.bulk_create(rows, batch_size=self.batch_size)
+
+            # bulk_create skips the post_save signals, so index the batch here
+            index_workouts([workout.pk for workout in workouts])
+
+        self.result.workouts_created += len(workouts)
+        self.result.exercises_created += len(rows)
+        self.dates.update(workout.date for workout in workouts)
+        self.batch = []
+
+    def finish(self):
+        """Refresh the per-user data the skipped signals would have maintained"""
+        from .choice_utils import bump_custom_exercise_choices
+        from .rollup_utils import rebuild_daily_activity, refresh_daily_activity
+        from .utils import recompute_workout_streak, record_workout_days
+        from users.stats_utils import bump_user_stats, rebuild_user_stats
+
+        if not self.result.workouts_created and not self.new_exercises:
+            return
+        if self.incremental:
+            # The same per-day updates the signals make, once for the whole batch
+            refresh_daily_activity(self.user.pk, self.dates)
+            record_workout_days(self.user.pk, self.dates)
+            bump_user_stats(
+                self.user.pk,
+                workout_count=self.result.workouts_created,
+                custom_exercise_count=len(self.new_exercises),
+            )
+        else:
+            # One grouped rebuild costs the same however many days the file covers
+            rebuild_daily_activity([self.user.pk])
+            recompute_workout_streak(self.user.pk)
+            rebuild_user_stats([self.user.pk])
+        if self.new_exercises:
+            bump_custom_exercise_choices(self.user)
+
+
+def import_workouts(user, lines, file_format='csv', **kwargs):
+    """Import workouts for `user` from an iterable of text lines; returns an ImportResult"""
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {file_format}")
+    workouts = iter_jsonl_workouts(lines) if file_format == 'jsonl' else iter_csv_workouts(lines)
+    return WorkoutImporter(user, **kwargs).run(workouts)
@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from workouts.import_utils import IMPORT_BATCH_SIZE, IMPORT_FORMATS, guess_format, import_workouts
+
+
+class Command(BaseCommand):
+    help = 'Import workouts for a user from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--user', required=True, help='Username to import the workouts for')
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help='File format (detected from the file extension by default)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Workouts written per transaction',
+        )
+        parser.add_argument(
+            '--no-create-exercises', action='store_true',
+            help='Skip workouts that use exercise names not in the library instead of creating them',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        file_format = options['format'] or guess_format(options['path'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                result = import_workouts(
+                    user, lines, file_format=file_format,
+                    batch_size=options['batch_size'],
+                    create_exercises=not options['no_create_exercises'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stdout.write(f'⚠️ {error}')
+        if result.skipped:
+            self.stdout.write(self.style.WARNING(f'Skipped {result.skipped} workouts'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Imported {result.workouts_created} workouts with {result.exercises_created} exercises '
+            f'({result.custom_exercises_created} new custom exercises)'
+        ))
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from workouts.rollup_utils import rebuild_daily_activity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailyActivity rollup table from workout history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help='Only rebuild for this username (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(
+                User.objects.filter(username__in=options['usernames']).values_list('id', flat=True)
+            )
+            if len(user_ids) != len(set(options['usernames'])):
+                raise CommandError('One or more usernames do not exist.')
+
+        written = rebuild_daily_activity(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {written} daily activity rows'))
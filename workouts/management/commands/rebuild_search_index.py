@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from workouts.search_utils import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the workout full-text search index from the workout tables'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend.vendor is None:
+            self.stdout.write(self.style.WARNING('No full-text index for this database; search uses icontains'))
+            return
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {indexed} workouts'))
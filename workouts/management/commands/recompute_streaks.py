@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from users.models import UserProfile
+from workouts.utils import calculate_streaks_in_db, recompute_workout_streaks
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored workout streaks in the database (gaps-and-islands)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report profiles whose stored streak differs, without writing',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            updated = recompute_workout_streaks()
+            self.stdout.write(self.style.SUCCESS(f'✅ Recomputed streaks for {updated} users'))
+            return
+
+        profiles = list(UserProfile.objects.select_related('user').only(
+            'user__username', 'user_id', *UserProfile.STREAK_FIELDS
+        ))
+        streaks = calculate_streaks_in_db([profile.user_id for profile in profiles])
+        empty = {'current_streak': 0, 'best_streak': 0, 'last_active_date': None}
+
+        drifted = 0
+        for profile in profiles:
+            expected = streaks.get(profile.user_id, empty)
+            stored = {field: getattr(profile, field) for field in UserProfile.STREAK_FIELDS}
+            if stored != expected:
+                drifted += 1
+                self.stdout.write(f'⚠️ {profile.user.username}: stored {stored}, expected {expected}')
+
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'{drifted} of {len(profiles)} profiles have drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ All {len(profiles)} profiles are in sync'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from workouts.models import Workout
+from workouts.summary_utils import repair_workout_summaries
+
+
+class Command(BaseCommand):
+    help = 'Check the stored workout summary columns against their exercises and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report workouts whose stored summary differs, without writing',
+        )
+
+    def handle(self, *args, **options):
+        drifted = repair_workout_summaries(dry_run=options['check'])
+        total = Workout.objects.count()
+
+        for workout_id, diff in drifted.items():
+            changes = ', '.join(f'{name} {stored} → {expected}' for name, (stored, expected) in diff.items())
+            self.stdout.write(f'⚠️ Workout {workout_id}: {changes}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f'✅ All {total} workouts are in sync'))
+        elif options['check']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} of {total} workouts have drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Repaired {len(drifted)} of {total} workouts'))
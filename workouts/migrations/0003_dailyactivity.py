@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_daily_activity(apps, schema_editor):
+    """Populate the rollup from existing workouts"""
+    Workout = apps.get_model('workouts', 'Workout')
+    WorkoutExercise = apps.get_model('workouts', 'WorkoutExercise')
+    DailyActivity = apps.get_model('workouts', 'DailyActivity')
+
+    exercise_counts = {
+        (row['workout__user_id'], row['workout__date']): row['total']
+        for row in WorkoutExercise.objects.values('workout__user_id', 'workout__date')
+        .annotate(total=Count('id')).order_by()
+    }
+    day_totals = Workout.objects.values('user_id', 'date').annotate(
+        workout_count=Count('id'), total_minutes=Sum('duration')
+    ).order_by()
+
+    DailyActivity.objects.bulk_create([
+        DailyActivity(
+            user_id=row['user_id'],
+            date=row['date'],
+            workout_count=row['workout_count'],
+            total_minutes=row['total_minutes'] or 0,
+            exercise_count=exercise_counts.get((row['user_id'], row['date']), 0),
+        )
+        for row in day_totals
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0002_alter_workoutexercise_unit_workouttemplate_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('workout_count', models.PositiveIntegerField(default=0)),
+                ('total_minutes', models.PositiveIntegerField(default=0)),
+                ('exercise_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'daily activity',
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_activity, migrations.RunPython.noop),
+    ]
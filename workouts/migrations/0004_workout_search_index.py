@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """Create the vendor's full-text index table and fill it from existing workouts"""
+    from workouts.search_utils import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection)
+    backend.create_index(schema_editor.connection)
+    backend.rebuild(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from workouts.search_utils import get_search_backend
+
+    get_search_backend(schema_editor.connection).drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0003_dailyactivity'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-18 13:38
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_workout_summaries(apps, schema_editor):
+    """Compute the summary columns for existing workouts"""
+    Workout = apps.get_model('workouts', 'Workout')
+    WorkoutExercise = apps.get_model('workouts', 'WorkoutExercise')
+    lbs_to_kg = Decimal('0.45359237')
+
+    summaries = {}
+    rows = WorkoutExercise.objects.values_list('workout_id', 'sets', 'reps', 'weight', 'unit', 'distance')
+    for workout_id, sets, reps, weight, unit, distance in rows.iterator():
+        summary = summaries.setdefault(workout_id, {
+            'exercise_count': 0, 'total_sets': 0, 'total_volume_kg': Decimal(0), 'total_distance_km': Decimal(0),
+        })
+        summary['exercise_count'] += 1
+        summary['total_sets'] += sets or 0
+        if sets and reps and weight:
+            summary['total_volume_kg'] += sets * reps * (weight * lbs_to_kg if unit == 'lbs' else weight)
+        summary['total_distance_km'] += distance or 0
+
+    workouts = []
+    for workout in Workout.objects.filter(pk__in=summaries).only('pk').iterator():
+        for name, value in summaries[workout.pk].items():
+            if isinstance(value, Decimal):
+                value = value.quantize(Decimal('0.01'))
+            setattr(workout, name, value)
+        workouts.append(workout)
+    Workout.objects.bulk_update(
+        workouts, ['exercise_count', 'total_sets', 'total_volume_kg', 'total_distance_km'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0004_workout_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workout',
+            name='exercise_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workout',
+            name='total_distance_km',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name='workout',
+            name='total_sets',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workout',
+            name='total_volume_kg',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of sets x reps x weight, in kg', max_digits=12),
+        ),
+        migrations.RunPython(backfill_workout_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 13:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0005_workout_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exercise',
+            index=models.Index(condition=models.Q(('is_custom', False)), fields=['category', 'name'], name='exercise_library_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exercise',
+            index=models.Index(condition=models.Q(('is_custom', True)), fields=['created_by', 'category', 'name'], name='exercise_custom_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='templateexercise',
+            index=models.Index(fields=['template', 'order', 'id'], name='templateexercise_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workout',
+            index=models.Index(fields=['user', '-date', '-id'], name='workout_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0006_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workout',
+            name='client_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='workout',
+            constraint=models.UniqueConstraint(fields=('user', 'client_key'), name='workout_user_client_key_uniq'),
+        ),
+    ]
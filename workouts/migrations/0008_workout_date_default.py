@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 18:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0007_workout_client_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workout',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
@@ -1,5 +1,11 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 
@@ -23,6 +29,14 @@ class Exercise(models.Model):
 
     class Meta:
         ordering = ['name']
+        # Booleans filter as a bare "NOT is_custom" on SQLite, which a leading index
+        # column can't serve, so each exercise picker gets its own partial index
+        indexes = [
+            models.Index(fields=['category', 'name'], condition=Q(is_custom=False), name='exercise_library_idx'),
+            models.Index(
+                fields=['created_by', 'category', 'name'], condition=Q(is_custom=True), name='exercise_custom_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -34,20 +48,78 @@ class Workout(models.Model):
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='workouts')
     title = models.CharField(max_length=200)
-    date = models.DateField(default=timezone.now)
+    date = models.DateField(default=timezone.localdate)
     duration = models.PositiveIntegerField(help_text="Duration in minutes", null=True, blank=True)
     notes = models.TextField(blank=True)
+    # Idempotency key chosen by an offline client, so a retried sync never duplicates the workout
+    client_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    # Summary of the workout's exercises, recomputed whenever they change
+    exercise_count = models.PositiveIntegerField(default=0)
+    total_sets = models.PositiveIntegerField(default=0)
+    total_volume_kg = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, help_text="Sum of sets x reps x weight, in kg")
+    total_distance_km = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    SUMMARY_FIELDS = ['exercise_count', 'total_sets', 'total_volume_kg', 'total_distance_km']
+
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Per-user lists, keyset pages and date ranges: WHERE user_id = ? ORDER BY date DESC, id DESC
+            models.Index(fields=['user', '-date', '-id'], name='workout_user_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_key'], name='workout_user_client_key_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.date}"
 
+    def save(self, *args, **kwargs):
+        # The signal receivers compare dates, so coerce a datetime or ISO string first
+        self.date = self._meta.get_field('date').to_python(self.date)
+        # Summary columns are written by update_summary() only, so saving a copy
+        # loaded before its exercises changed never overwrites them
+        if self.pk and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.SUMMARY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored date so a date change can update both rollup days
+        instance._loaded_date = instance.__dict__.get('date')
+        return instance
+
+    @property
     def total_exercises(self):
-        return self.workout_exercises.count()
+        return self.exercise_count
+
+    def exercises_changed(self):
+        """
+        Refresh everything derived from this workout's exercises (summary columns,
+        daily rollup, search entry) after a bulk write that bypassed the signals.
+        """
+        from .rollup_utils import refresh_daily_activity
+        from .search_utils import index_workouts
+
+        self.update_summary()
+        refresh_daily_activity(self.user_id, {self.date})
+        index_workouts([self.pk])
+
+    def update_summary(self):
+        """Recompute the summary columns from this workout's exercises"""
+        from .summary_utils import update_workout_summary
+
+        for name, value in update_workout_summary(self.pk).items():
+            setattr(self, name, value)
 
 
 class WorkoutExercise(models.Model):
@@ -76,4 +148,161 @@ class WorkoutExercise(models.Model):
         return f"{self.exercise.name} in {self.workout.title}"
 
 
+class DailyActivity(models.Model):
+    """
+    Per-user daily rollup of workouts, kept current by signals
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    workout_count = models.PositiveIntegerField(default=0)
+    total_minutes = models.PositiveIntegerField(default=0)
+    exercise_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+        verbose_name_plural = 'daily activity'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+
+
+@receiver(post_save, sender=Workout)
+def update_activity_on_workout_save(sender, instance, created, **kwargs):
+    """Refresh the rollup and streak for the workout's day (and its previous day if moved)"""
+    from .rollup_utils import refresh_daily_activity
+    from .search_utils import index_workouts
+    from .utils import record_workout_day, recompute_workout_streak
+    from users.stats_utils import bump_user_stats
+
+    index_workouts([instance.pk])
+
+    previous_date = getattr(instance, '_loaded_date', None)
+    moved = not created and previous_date is not None and previous_date != instance.date
+
+    dates = {instance.date}
+    if moved:
+        dates.add(previous_date)
+    refresh_daily_activity(instance.user_id, dates)
+
+    if created:
+        record_workout_day(instance.user_id, instance.date)
+        bump_user_stats(instance.user_id, workout_count=1)
+    elif moved:
+        recompute_workout_streak(instance.user_id)
+    instance._loaded_date = instance.date
+
+
+@receiver(post_delete, sender=Workout)
+def update_activity_on_workout_delete(sender, instance, origin=None, **kwargs):
+    """Refresh the rollup, streak and workout count for the deleted workout's day"""
+    from .ical_utils import mark_feed_deleted
+    from .rollup_utils import refresh_daily_activity
+    from .search_utils import remove_workouts
+    from .utils import recompute_workout_streak
+    from users.stats_utils import bump_user_stats
+
+    # The search index has no foreign key, so it is cleaned up even on user deletes
+    remove_workouts([instance.pk])
+    if isinstance(origin, User):
+        # The rollup rows, profile and stats are removed with the user
+        return
+    refresh_daily_activity(instance.user_id, {instance.date})
+    bump_user_stats(instance.user_id, workout_count=-1)
+    mark_feed_deleted(instance.user_id)
+
+    # The streak only changes if that day no longer has any workouts
+    if not Workout.objects.filter(user_id=instance.user_id, date=instance.date).exists():
+        recompute_workout_streak(instance.user_id)
+
+
+def _bump_exercise_choices(exercise):
+    from .choice_utils import bump_custom_exercise_choices, bump_default_exercise_choices
+
+    if exercise.is_custom and exercise.created_by_id:
+        bump_custom_exercise_choices(exercise.created_by)
+    else:
+        bump_default_exercise_choices()
+
+
+@receiver(post_save, sender=Exercise)
+def update_stats_on_exercise_save(sender, instance, created, **kwargs):
+    """Count a newly created custom exercise, refresh cached choices and touch and reindex workouts using it"""
+    from .search_utils import index_workouts
+    from users.stats_utils import bump_user_stats
+
+    if created and instance.is_custom and instance.created_by_id:
+        bump_user_stats(instance.created_by_id, custom_exercise_count=1)
+    _bump_exercise_choices(instance)
+    if not created:
+        workout_ids = list(
+            WorkoutExercise.objects.filter(exercise=instance).values_list('workout_id', flat=True).distinct()
+        )
+        # Exports fingerprint workouts by updated_at, and the detailed PDF shows exercise names
+        Workout.objects.filter(pk__in=workout_ids).update(updated_at=timezone.now())
+        index_workouts(workout_ids)
+
+
+@receiver(post_delete, sender=Exercise)
+def count_custom_exercise_on_delete(sender, instance, origin=None, **kwargs):
+    """Uncount a deleted custom exercise and refresh cached choices"""
+    from users.stats_utils import bump_user_stats
+
+    if isinstance(origin, User):
+        return
+    if instance.is_custom and instance.created_by_id:
+        bump_user_stats(instance.created_by_id, custom_exercise_count=-1)
+    _bump_exercise_choices(instance)
+
+
+@receiver(post_save, sender=WorkoutExercise)
+def update_activity_on_exercise_save(sender, instance, created, **kwargs):
+    """Refresh the workout's summary and search entry, and the rollup when an exercise is added"""
+    from .rollup_utils import refresh_daily_activity
+    from .search_utils import index_workouts
+    from .summary_utils import update_workout_summary
+
+    update_workout_summary(instance.workout_id)
+    if created:
+        refresh_daily_activity(instance.workout.user_id, {instance.workout.date})
+    index_workouts([instance.workout_id])
+
+
+# True while a caller deleting several exercise rows refreshes their workout itself
+_exercise_refresh_deferred = ContextVar('exercise_refresh_deferred', default=False)
+
+
+@contextmanager
+def deferred_exercise_refresh():
+    """
+    Skip the per-row refresh in the WorkoutExercise delete receiver inside
+    the block; the caller must call Workout.exercises_changed() once after it.
+    """
+    token = _exercise_refresh_deferred.set(True)
+    try:
+        yield
+    finally:
+        _exercise_refresh_deferred.reset(token)
+
+
+@receiver(post_delete, sender=WorkoutExercise)
+def update_activity_on_exercise_delete(sender, instance, origin=None, **kwargs):
+    """Refresh the summary, rollup and search entry when an exercise is removed from a workout"""
+    from .rollup_utils import refresh_daily_activity
+    from .search_utils import index_workouts
+    from .summary_utils import update_workout_summary
+
+    if _exercise_refresh_deferred.get():
+        return
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if origin_model not in (WorkoutExercise, Exercise):
+        # Cascades from a workout or user delete are handled by their own signals
+        return
+    workout = Workout.objects.filter(pk=instance.workout_id).values('user_id', 'date').first()
+    if workout:
+        update_workout_summary(instance.workout_id)
+        refresh_daily_activity(workout['user_id'], {workout['date']})
+        index_workouts([instance.workout_id])
+
+
 # Import template models
@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.db.models import Q
+
+WORKOUTS_PER_PAGE = 20
+
+
+def encode_cursor(workout):
+    """Cursor pointing just after `workout` in (-date, -id) order, e.g. '2025-06-18.42'"""
+    return f"{workout.date.isoformat()}.{workout.pk}"
+
+
+def decode_cursor(value):
+    """Parse a cursor back into (date, id), or None if it is missing or malformed"""
+    try:
+        day, pk = value.split('.')
+        return date.fromisoformat(day), int(pk)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def after_cursor(queryset, cursor=None):
+    """`queryset` in (-date, -id) order, starting at the row after `cursor`"""
+    position = decode_cursor(cursor)
+    if position:
+        day, pk = position
+        queryset = queryset.filter(Q(date__lt=day) | Q(date=day, pk__lt=pk))
+    return queryset.order_by('-date', '-id')
+
+
+def keyset_page(queryset, cursor=None, per_page=WORKOUTS_PER_PAGE):
+    """
+    Return (items, next_cursor) for one page of `queryset` ordered by (-date, -id).
+    Instead of OFFSET, the page starts at the row after the cursor, so the
+    database seeks straight to it and deep pages cost the same as the first.
+    """
+    # Fetch one extra row to know whether there is a next page
+    items = list(after_cursor(queryset, cursor)[:per_page + 1])
+    next_cursor = encode_cursor(items[per_page - 1]) if len(items) > per_page else None
+    return items[:per_page], next_cursor
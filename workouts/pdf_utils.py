@@ -1,137 +1,258 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER
+from decimal import Decimal
 from io import BytesIO
+from itertools import islice
 from datetime import datetime
+from xml.sax.saxutils import escape
 
+from .summary_utils import LBS_TO_KG, TWO_PLACES
 
-def generate_workouts_pdf(workouts, user):
-    """Generate PDF report of user's workouts"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#a855f7'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
+# Rows per table chunk: about one page, so layout never splits a huge table
+PDF_ROWS_PER_TABLE = 35
+PDF_CHUNK_SIZE = 500
 
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#ec4899'),
-        spaceAfter=12,
-    )
+# Styles are built once at import instead of on every report
+styles = getSampleStyleSheet()
 
-    # Title
-    title = Paragraph("💪 FitTrack Aura - Workout Report", title_style)
-    elements.append(title)
+title_style = ParagraphStyle(
+    'CustomTitle',
+    parent=styles['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#a855f7'),
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
 
-    # User info
-    user_info_text = (
-        f"<b>User:</b> {user.username} | "
-        f"<b>Generated:</b> {datetime.now().strftime('%B %d, %Y')}"
-    )
-    user_info = Paragraph(user_info_text, styles['Normal'])
-    elements.append(user_info)
-    elements.append(Spacer(1, 20))
+heading_style = ParagraphStyle(
+    'CustomHeading',
+    parent=styles['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#ec4899'),
+    spaceAfter=12,
+)
 
-    # Summary
-    summary = Paragraph(f"<b>Total Workouts:</b> {workouts.count()}", heading_style)
-    elements.append(summary)
-    elements.append(Spacer(1, 12))
+workout_heading_style = ParagraphStyle(
+    'WorkoutHeading',
+    parent=styles['Heading3'],
+    textColor=colors.HexColor('#a855f7'),
+    spaceBefore=12,
+    keepWithNext=1,
+)
 
-    # Workouts table
-    if workouts.exists():
-        data = [['Date', 'Title', 'Duration', 'Exercises']]
+table_style = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a855f7')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
 
-        for workout in workouts:
-            exercise_count = workout.workout_exercises.count()
-            data.append([
-                workout.date.strftime('%m/%d/%Y'),
-                workout.title[:30],
-                f"{workout.duration or 0} min",
-                str(exercise_count)
-            ])
+WORKOUT_COLUMNS = ['Date', 'Title', 'Duration', 'Exercises']
+WORKOUT_COL_WIDTHS = [1.5*inch, 3*inch, 1.5*inch, 1.5*inch]
+EXERCISE_COLUMNS = ['Exercise', 'Sets', 'Reps', 'Weight', 'Distance', 'Duration']
+EXERCISE_COL_WIDTHS = [2.5*inch, 0.8*inch, 0.8*inch, 1.1*inch, 1.1*inch, 1.1*inch]
+EXERCISE_SUMMARY_COLUMNS = ['Exercise', 'Sessions', 'Sets', 'Best (kg)', 'Volume (kg)', 'Distance (km)']
+EXERCISE_SUMMARY_COL_WIDTHS = [2.2*inch, 0.9*inch, 0.8*inch, 1*inch, 1.2*inch, 1.3*inch]
 
-        table = Table(data, colWidths=[1.5*inch, 3*inch, 1.5*inch, 1.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a855f7')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
 
-        elements.append(table)
+class StreamingDocTemplate(SimpleDocTemplate):
+    """
+    Document template fed from an iterator of flowables. platypus consumes
+    its flowable list from the front, so the list is topped up as it drains
+    and only the flowables for the page being laid out are ever alive.
+    """
+
+    def build_from(self, flowables):
+        self._pending = iter(flowables)
+        self._queue = []
+        self._top_up(self._queue)
+        self.build(self._queue)
+
+    def _top_up(self, flowables):
+        # platypus also handles its own internal lists here; only refill ours.
+        # A couple stay queued so keepWithNext can look ahead.
+        if flowables is self._queue:
+            flowables.extend(islice(self._pending, max(0, 2 - len(flowables))))
+
+    def handle_flowable(self, flowables):
+        self._top_up(flowables)
+        super().handle_flowable(flowables)
+        self._top_up(flowables)
+
+
+def report_header(title, user):
+    """Title and user/date line shared by the reports"""
+    return [
+        Paragraph(title, title_style),
+        Paragraph(
+            f"<b>User:</b> {user.username} | "
+            f"<b>Generated:</b> {datetime.now().strftime('%B %d, %Y')}",
+            styles['Normal']
+        ),
+        Spacer(1, 20),
+    ]
+
+
+def report_footer():
+    return [Spacer(1, 30), Paragraph("Generated by FitTrack Aura | © 2025", styles['Normal'])]
+
+
+def chunked_tables(header, rows, col_widths, size=PDF_ROWS_PER_TABLE):
+    """Yield one LongTable per `size` rows, each repeating the header row"""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        table = LongTable([header] + chunk, colWidths=col_widths, repeatRows=1)
+        table.setStyle(table_style)
+        yield table
+
+
+def iter_workout_flowables(workouts, user, chunk_size=PDF_CHUNK_SIZE):
+    """Flowables of the workout report, reading rows lazily from the database"""
+    yield from report_header("💪 FitTrack Aura - Workout Report", user)
+
+    total = workouts.count()
+    yield Paragraph(f"<b>Total Workouts:</b> {total}", heading_style)
+    yield Spacer(1, 12)
+
+    if total:
+        rows = (
+            [day.strftime('%m/%d/%Y'), title[:30], f"{duration or 0} min", str(exercise_count)]
+            for day, title, duration, exercise_count in workouts.values_list(
+                'date', 'title', 'duration', 'exercise_count'
+            ).iterator(chunk_size=chunk_size)
+        )
+        yield from chunked_tables(WORKOUT_COLUMNS, rows, WORKOUT_COL_WIDTHS)
     else:
-        no_data = Paragraph("No workouts found.", styles['Normal'])
-        elements.append(no_data)
+        yield Paragraph("No workouts found.", styles['Normal'])
 
-    # Footer
-    elements.append(Spacer(1, 30))
-    footer = Paragraph("Generated by FitTrack Aura | © 2025", styles['Normal'])
-    elements.append(footer)
+    yield from report_footer()
 
-    # Build PDF
-    doc.build(elements)
+
+def write_workouts_pdf(workouts, user, out):
+    """
+    Write the workout report to the file object `out`.
+    Memory stays flat with history length: rows stream from iterator(),
+    are laid out a page-sized table at a time, and go straight to `out`.
+    """
+    StreamingDocTemplate(out, pagesize=letter).build_from(iter_workout_flowables(workouts, user))
+
+
+def generate_workouts_pdf(workouts, user):
+    """Generate PDF report of user's workouts"""
+    buffer = BytesIO()
+    write_workouts_pdf(workouts, user, buffer)
     buffer.seek(0)
     return buffer
 
 
-def generate_goals_pdf(goals, user):
-    """Generate PDF report of user's goals"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#a855f7'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
+def _exercise_row(entry):
+    def value(number, suffix=''):
+        return '-' if number is None else f"{number:g}{suffix}"
 
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#ec4899'),
-        spaceAfter=12,
-    )
+    return [
+        entry.exercise.name[:35],
+        value(entry.sets),
+        value(entry.reps),
+        value(entry.weight, f' {entry.unit}'),
+        value(entry.distance, ' km'),
+        value(entry.duration, ' min'),
+    ]
 
-    # Title
-    title = Paragraph("🎯 FitTrack Aura - Goals Report", title_style)
-    elements.append(title)
 
-    # User info
-    user_info_text = (
-        f"<b>User:</b> {user.username} | "
-        f"<b>Generated:</b> {datetime.now().strftime('%B %d, %Y')}"
-    )
-    user_info = Paragraph(user_info_text, styles['Normal'])
-    elements.append(user_info)
-    elements.append(Spacer(1, 20))
+def _add_to_exercise_totals(totals, entry):
+    """Fold one logged exercise into the running per-exercise summary"""
+    stats = totals.setdefault(entry.exercise.name, {
+        'sessions': 0, 'sets': 0, 'best_kg': None, 'volume_kg': Decimal(0), 'distance_km': Decimal(0),
+    })
+    stats['sessions'] += 1
+    stats['sets'] += entry.sets or 0
+    stats['distance_km'] += entry.distance or 0
+    if entry.weight is not None:
+        weight_kg = entry.weight * LBS_TO_KG if entry.unit == 'lbs' else entry.weight
+        stats['best_kg'] = weight_kg if stats['best_kg'] is None else max(stats['best_kg'], weight_kg)
+        if entry.sets is not None and entry.reps is not None:
+            stats['volume_kg'] += entry.sets * entry.reps * weight_kg
+
+
+def _exercise_summary_rows(totals):
+    for name in sorted(totals, key=str.lower):
+        stats = totals[name]
+        yield [
+            name[:30],
+            str(stats['sessions']),
+            str(stats['sets']),
+            '-' if stats['best_kg'] is None else str(stats['best_kg'].quantize(TWO_PLACES)),
+            str(stats['volume_kg'].quantize(TWO_PLACES)),
+            str(Decimal(stats['distance_km']).quantize(TWO_PLACES)),
+        ]
+
+
+def iter_detailed_workout_flowables(workouts, user, chunk_size=PDF_CHUNK_SIZE):
+    """
+    Flowables of the detailed report: every workout with its exercises, then
+    a summary table per exercise. Exercises are loaded by prefetch_related for
+    each chunk of workouts (a fixed number of queries, not one per workout)
+    and the per-exercise totals are accumulated in Python as rows stream past.
+    """
+    yield from report_header("📋 FitTrack Aura - Detailed Workout Report", user)
+
+    total = workouts.count()
+    yield Paragraph(f"<b>Total Workouts:</b> {total}", heading_style)
+    yield Spacer(1, 12)
+
+    if not total:
+        yield Paragraph("No workouts found.", styles['Normal'])
+        yield from report_footer()
+        return
+
+    totals = {}
+    workouts = workouts.only('id', 'title', 'date', 'duration').prefetch_related('workout_exercises__exercise')
+    for workout in workouts.iterator(chunk_size=chunk_size):
+        yield Paragraph(
+            f"{workout.date.strftime('%m/%d/%Y')} · {escape(workout.title)}"
+            + (f" · {workout.duration} min" if workout.duration else ''),
+            workout_heading_style
+        )
+        entries = workout.workout_exercises.all()
+        if not entries:
+            yield Paragraph("No exercises logged.", styles['Normal'])
+            continue
+        for entry in entries:
+            _add_to_exercise_totals(totals, entry)
+        yield from chunked_tables(EXERCISE_COLUMNS, map(_exercise_row, entries), EXERCISE_COL_WIDTHS)
+
+    yield Spacer(1, 20)
+    yield Paragraph("Exercise Summary", heading_style)
+    if totals:
+        yield from chunked_tables(
+            EXERCISE_SUMMARY_COLUMNS, _exercise_summary_rows(totals), EXERCISE_SUMMARY_COL_WIDTHS
+        )
+    else:
+        yield Paragraph("No exercises logged.", styles['Normal'])
+
+    yield from report_footer()
+
+
+def write_detailed_workouts_pdf(workouts, user, out):
+    """Write the detailed (per-exercise) workout report to the file object `out`"""
+    StreamingDocTemplate(out, pagesize=letter).build_from(iter_detailed_workout_flowables(workouts, user))
+
+
+def write_goals_pdf(goals, user, out):
+    """Write the goals report to the file object `out`"""
+    doc = SimpleDocTemplate(out, pagesize=letter)
+    elements = report_header("🎯 FitTrack Aura - Goals Report", user)
 
     # Summary
     completed = goals.filter(is_completed=True).count()
@@ -159,31 +280,22 @@ def generate_goals_pdf(goals, user):
             ])
 
         table = Table(data, colWidths=[2*inch, 1.5*inch, 1*inch, 1.2*inch, 1.3*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#a855f7')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        table.setStyle(table_style)
 
         elements.append(table)
     else:
         no_data = Paragraph("No goals found.", styles['Normal'])
         elements.append(no_data)
 
-    # Footer
-    elements.append(Spacer(1, 30))
-    footer = Paragraph("Generated by FitTrack Aura | © 2025", styles['Normal'])
-    elements.append(footer)
+    elements.extend(report_footer())
 
     # Build PDF
     doc.build(elements)
+
+
+def generate_goals_pdf(goals, user):
+    """Generate PDF report of user's goals"""
+    buffer = BytesIO()
+    write_goals_pdf(goals, user, buffer)
     buffer.seek(0)
     return buffer
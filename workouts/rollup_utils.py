@@ -0,0 +1,103 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+
+def refresh_daily_activity(user_id, dates):
+    """
+    Recompute the DailyActivity rows for a user on the given dates.
+    Days left without workouts lose their row. Runs a fixed number of
+    queries however many dates are passed.
+    """
+    from .heatmap_utils import invalidate_activity_months
+    from .models import DailyActivity, Workout, WorkoutExercise
+
+    dates = set(dates)
+    if not dates:
+        return
+    invalidate_activity_months(user_id, dates)
+
+    day_totals = Workout.objects.filter(user_id=user_id, date__in=dates).values('date').annotate(
+        workout_count=Count('id'),
+        total_minutes=Sum('duration'),
+    ).order_by()
+    exercise_counts = dict(
+        WorkoutExercise.objects.filter(workout__user_id=user_id, workout__date__in=dates)
+        .values('workout__date').annotate(total=Count('id')).order_by()
+        .values_list('workout__date', 'total')
+    )
+
+    rollups = [
+        DailyActivity(
+            user_id=user_id,
+            date=row['date'],
+            workout_count=row['workout_count'],
+            total_minutes=row['total_minutes'] or 0,
+            exercise_count=exercise_counts.get(row['date'], 0),
+        )
+        for row in day_totals
+    ]
+    empty_days = dates - {rollup.date for rollup in rollups}
+    if empty_days:
+        DailyActivity.objects.filter(user_id=user_id, date__in=empty_days).delete()
+    if rollups:
+        DailyActivity.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=['workout_count', 'total_minutes', 'exercise_count'],
+        )
+
+
+def rebuild_daily_activity(user_ids=None, batch_size=1000):
+    """
+    Rebuild DailyActivity from scratch for the given users (all users if None).
+    Returns the number of rollup rows written.
+    """
+    from .heatmap_utils import invalidate_activity_months, invalidate_all_activity_months
+    from .models import DailyActivity, Workout, WorkoutExercise
+
+    workouts = Workout.objects.all()
+    exercises = WorkoutExercise.objects.all()
+    rollups = DailyActivity.objects.all()
+    if user_ids is not None:
+        workouts = workouts.filter(user_id__in=user_ids)
+        exercises = exercises.filter(workout__user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    # Exercise counts per (user, day), grouped in the database
+    exercise_counts = {
+        (row['workout__user_id'], row['workout__date']): row['total']
+        for row in exercises.values('workout__user_id', 'workout__date').annotate(total=Count('id')).order_by()
+    }
+
+    day_totals = workouts.values('user_id', 'date').annotate(
+        workout_count=Count('id'),
+        total_minutes=Sum('duration'),
+    ).order_by()
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in day_totals.iterator(chunk_size=batch_size):
+            batch.append(DailyActivity(
+                user_id=row['user_id'],
+                date=row['date'],
+                workout_count=row['workout_count'],
+                total_minutes=row['total_minutes'] or 0,
+                exercise_count=exercise_counts.get((row['user_id'], row['date']), 0),
+            ))
+            if len(batch) >= batch_size:
+                DailyActivity.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            DailyActivity.objects.bulk_create(batch)
+            written += len(batch)
+
+    if user_ids is None:
+        invalidate_all_activity_months()
+    else:
+        for user_id in user_ids:
+            invalidate_activity_months(user_id)
+    return written
@@ -0,0 +1,299 @@
+import re
+from functools import lru_cache
+
+from django.db import connection
+
+# Default number of ranked matches fetched from the index for one search
+SEARCH_LIMIT = 200
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split a search box query into plain word tokens (quotes and operators dropped)"""
+    return TERM_RE.findall(query.lower())[:10]
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def _filter_sql(date_from=None, date_to=None, category=None):
+    """
+    Extra WHERE conditions on the workout table (aliased `w`) for the list
+    filters, so they narrow the matches inside the index query itself
+    """
+    conditions, params = [], []
+    if date_from:
+        conditions.append('AND w.date >= %s')
+        params.append(date_from)
+    if date_to:
+        conditions.append('AND w.date <= %s')
+        params.append(date_to)
+    if category:
+        conditions.append(
+            'AND EXISTS (SELECT 1 FROM workouts_workoutexercise we '
+            'JOIN workouts_exercise e ON e.id = we.exercise_id '
+            'WHERE we.workout_id = w.id AND e.category = %s)'
+        )
+        params.append(category)
+    return ' '.join(conditions), params
+
+
+class BasicSearchBackend:
+    """
+    Fallback for databases without a full-text index: icontains on the
+    title and exercise names, newest first. Nothing to maintain on writes.
+    """
+    vendor = None
+
+    def create_index(self, conn):
+        pass
+
+    def drop_index(self, conn):
+        pass
+
+    def index_workouts(self, workout_ids, conn=None):
+        pass
+
+    def remove_workouts(self, workout_ids, conn=None):
+        pass
+
+    def rebuild(self, conn=None):
+        return 0
+
+    def search(self, user_id, query, limit=SEARCH_LIMIT, offset=0, date_from=None, date_to=None, category=None):
+        from django.db.models import Exists, OuterRef, Q
+        from .models import Workout, WorkoutExercise
+
+        query = query.strip()
+        if not query:
+            return []
+        matching_exercises = WorkoutExercise.objects.filter(
+            workout=OuterRef('pk'), exercise__name__icontains=query
+        )
+        workouts = Workout.objects.filter(user_id=user_id).filter(
+            Q(title__icontains=query) | Exists(matching_exercises)
+        )
+        if date_from:
+            workouts = workouts.filter(date__gte=date_from)
+        if date_to:
+            workouts = workouts.filter(date__lte=date_to)
+        if category:
+            workouts = workouts.filter(
+                Exists(WorkoutExercise.objects.filter(workout=OuterRef('pk'), exercise__category=category))
+            )
+        return list(workouts.order_by('-date', '-id').values_list('id', flat=True)[offset:offset + limit])
+
+
+class SQLiteSearchBackend(BasicSearchBackend):
+    """
+    SQLite FTS5 virtual table keyed by workout id (rowid), ranked with bm25.
+    Title matches weigh most, then exercise names, then notes.
+    """
+    vendor = 'sqlite'
+    table = 'workouts_workout_fts'
+
+    DOCUMENT_SQL = """
+        SELECT w.id, w.user_id, w.title, w.notes,
+               COALESCE((
+                   SELECT group_concat(e.name, ' ')
+                   FROM workouts_workoutexercise we
+                   JOIN workouts_exercise e ON e.id = we.exercise_id
+                   WHERE we.workout_id = w.id
+               ), '')
+        FROM workouts_workout w
+    """
+
+    def create_index(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "user_id UNINDEXED, title, notes, exercises, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def drop_index(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index_workouts(self, workout_ids, conn=None):
+        workout_ids = list(workout_ids)
+        if not workout_ids:
+            return
+        with (conn or connection).cursor() as cursor:
+            # FTS5 has no upsert, so replace the rows outright
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({_placeholders(workout_ids)})", workout_ids)
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, user_id, title, notes, exercises) "
+                f"{self.DOCUMENT_SQL} WHERE w.id IN ({_placeholders(workout_ids)})",
+                workout_ids,
+            )
+
+    def remove_workouts(self, workout_ids, conn=None):
+        workout_ids = list(workout_ids)
+        if workout_ids:
+            with (conn or connection).cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({_placeholders(workout_ids)})", workout_ids)
+
+    def rebuild(self, conn=None):
+        with (conn or connection).cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(f"INSERT INTO {self.table} (rowid, user_id, title, notes, exercises) {self.DOCUMENT_SQL}")
+            return cursor.rowcount
+
+    def search(self, user_id, query, limit=SEARCH_LIMIT, offset=0, date_from=None, date_to=None, category=None):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # Every term must match, each as a prefix: "pus"* "leg"*
+        match = ' '.join(f'"{term}"*' for term in terms)
+        filters, params = _filter_sql(date_from, date_to, category)
+        with connection.cursor() as cursor:
+            # Equal scores fall back to newest first, so pages never overlap
+            cursor.execute(
+                f"SELECT w.id FROM {self.table} JOIN workouts_workout w ON w.id = {self.table}.rowid "
+                f"WHERE {self.table} MATCH %s AND {self.table}.user_id = %s {filters} "
+                f"ORDER BY bm25({self.table}, 0, 10.0, 1.0, 5.0), w.date DESC, w.id DESC LIMIT %s OFFSET %s",
+                [match, user_id, *params, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(BasicSearchBackend):
+    """
+    PostgreSQL side table holding a weighted tsvector per workout with a GIN
+    index, ranked with ts_rank. Rows go away with their workout (ON DELETE CASCADE).
+    """
+    vendor = 'postgresql'
+    table = 'workouts_workout_search'
+
+    DOCUMENT_SQL = """
+        SELECT w.id, w.user_id,
+               setweight(to_tsvector('simple', w.title), 'A')
+               || setweight(to_tsvector('simple', COALESCE(string_agg(e.name, ' '), '')), 'B')
+               || setweight(to_tsvector('simple', w.notes), 'C')
+        FROM workouts_workout w
+        LEFT JOIN workouts_workoutexercise we ON we.workout_id = w.id
+        LEFT JOIN workouts_exercise e ON e.id = we.exercise_id
+    """
+
+    def create_index(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "workout_id bigint PRIMARY KEY REFERENCES workouts_workout (id) ON DELETE CASCADE, "
+                "user_id bigint NOT NULL, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_document ON {self.table} USING GIN (document)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_user ON {self.table} (user_id)")
+
+    def drop_index(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def _upsert_sql(self, where=''):
+        return (
+            f"INSERT INTO {self.table} (workout_id, user_id, document) "
+            f"{self.DOCUMENT_SQL} {where} GROUP BY w.id "
+            "ON CONFLICT (workout_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+
+    def index_workouts(self, workout_ids, conn=None):
+        workout_ids = list(workout_ids)
+        if workout_ids:
+            with (conn or connection).cursor() as cursor:
+                cursor.execute(self._upsert_sql(f"WHERE w.id IN ({_placeholders(workout_ids)})"), workout_ids)
+
+    def remove_workouts(self, workout_ids, conn=None):
+        workout_ids = list(workout_ids)
+        if workout_ids:
+            with (conn or connection).cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE workout_id IN ({_placeholders(workout_ids)})", workout_ids
+                )
+
+    def rebuild(self, conn=None):
+        with (conn or connection).cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(self._upsert_sql())
+            return cursor.rowcount
+
+    def search(self, user_id, query, limit=SEARCH_LIMIT, offset=0, date_from=None, date_to=None, category=None):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # Every term must match, each as a prefix: pus:* & leg:*
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        filters, params = _filter_sql(date_from, date_to, category)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT w.id FROM {self.table} s JOIN workouts_workout w ON w.id = s.workout_id, "
+                "to_tsquery('simple', %s) query "
+                f"WHERE s.user_id = %s AND s.document @@ query {filters} "
+                "ORDER BY ts_rank(s.document, query) DESC, w.date DESC, w.id DESC LIMIT %s OFFSET %s",
+                [tsquery, user_id, *params, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _sqlite_has_fts5():
+    import sqlite3
+
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(text)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def get_search_backend(conn=None):
+    """Pick the full-text backend for the database vendor, or the icontains fallback"""
+    vendor = (conn or connection).vendor
+    if vendor == 'sqlite' and not _sqlite_has_fts5():
+        # Some SQLite builds are compiled without FTS5
+        return BasicSearchBackend()
+    return SEARCH_BACKENDS.get(vendor, BasicSearchBackend)()
+
+
+def search_workouts(user, query, limit=SEARCH_LIMIT, offset=0, **filters):
+    """
+    Ids of the user's workouts matching `query`, best match first (newest
+    first among equal matches). `filters` are date_from, date_to and category.
+    """
+    return get_search_backend().search(user.pk, query, limit, offset, **filters)
+
+
+def search_page(user, query, cursor=None, per_page=None, **filters):
+    """
+    Return (ids, next_cursor) for one page of ranked search results. Relevance
+    has no natural key to seek on, so the cursor here is the row offset.
+    """
+    from .pagination_utils import WORKOUTS_PER_PAGE
+
+    per_page = per_page or WORKOUTS_PER_PAGE
+    try:
+        offset = max(int(cursor), 0)
+    except (TypeError, ValueError):
+        offset = 0
+    # Fetch one extra id to know whether there is a next page
+    ids = search_workouts(user, query, per_page + 1, offset, **filters)
+    next_cursor = str(offset + per_page) if len(ids) > per_page else None
+    return ids[:per_page], next_cursor
+
+
+def index_workouts(workout_ids):
+    """(Re)index workouts after their title, notes or exercises changed"""
+    get_search_backend().index_workouts(workout_ids)
+
+
+def remove_workouts(workout_ids):
+    """Drop deleted workouts from the index"""
+    get_search_backend().remove_workouts(workout_ids)
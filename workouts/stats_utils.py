@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+
+@dataclass
+class DashboardStats:
+    """
+    Headline numbers shown on the dashboard.
+    Built by DashboardStats.for_user() with a fixed number of queries.
+    """
+    workouts_count: int = 0
+    workouts_this_month: int = 0
+    total_time: int = 0
+    current_streak: int = 0
+    best_streak: int = 0
+    goals_count: int = 0
+    goals_progress: int = 0
+    badge_count: int = 0
+    week_labels: list = field(default_factory=list)
+    week_data: list = field(default_factory=list)
+    recent_workouts: list = field(default_factory=list)
+    active_goals: list = field(default_factory=list)
+    recent_badges: list = field(default_factory=list)
+
+    @property
+    def weekly_total(self):
+        return sum(self.week_data)
+
+    @property
+    def weekly_average(self):
+        return int(self.weekly_total / 7) if self.weekly_total > 0 else 0
+
+    @property
+    def max_day_duration(self):
+        return max(self.week_data) if self.week_data else 0
+
+    @property
+    def most_active_day(self):
+        if self.max_day_duration > 0:
+            return self.week_labels[self.week_data.index(self.max_day_duration)]
+        return None
+
+    @classmethod
+    def for_user(cls, user, today=None):
+        """Collect all dashboard statistics for a user"""
+        from .models import DailyActivity, Workout
+        from goals.models import Badge, Goal
+        from users.models import UserProfile
+
+        today = today or timezone.now().date()
+        first_day_of_month = today.replace(day=1)
+        week_start = today - timedelta(days=today.weekday())  # Monday
+        week_days = [week_start + timedelta(days=i) for i in range(7)]
+
+        workouts = Workout.objects.filter(user=user)
+        activity = DailyActivity.objects.filter(user=user)
+
+        # One conditional-aggregation query over the daily rollup for all counters and the week chart
+        aggregates = {
+            'workouts_this_month': Sum('workout_count', filter=Q(date__gte=first_day_of_month)),
+            'total_time': Sum('total_minutes', filter=Q(date__gte=first_day_of_month)),
+        }
+        for i, day in enumerate(week_days):
+            aggregates[f'day_{i}'] = Sum('total_minutes', filter=Q(date=day))
+        totals = activity.aggregate(**aggregates)
+
+        # Streaks live on the profile and counters on UserStats, so both are one joined row
+        profile = UserProfile.objects.filter(user=user).select_related('user__stats').first()
+        current_streak = profile.get_current_streak(today) if profile else 0
+        best_streak = profile.best_streak if profile else 0
+        stats = getattr(profile.user, 'stats', None) if profile else None
+        workouts_count = stats.workout_count if stats else 0
+        badge_count = stats.badge_count if stats else 0
+
+        # Exercise counts are stored on each workout, so no join is needed
+        recent_workouts = list(workouts.order_by('-date', '-created_at')[:5])
+
+        # Active goals are loaded once and reused for count, average and preview
+        active_goals = list(Goal.objects.filter(user=user, is_completed=False).order_by('target_date'))
+        for goal in active_goals:
+            goal.progress = goal.progress_percentage
+        goals_count = len(active_goals)
+        goals_progress = int(sum(goal.progress for goal in active_goals) / goals_count) if goals_count else 0
+
+        # Only look up badges when the counter says there are some
+        recent_badges = list(Badge.objects.filter(user=user)[:5]) if badge_count else []
+
+        return cls(
+            workouts_count=workouts_count,
+            workouts_this_month=totals['workouts_this_month'] or 0,
+            total_time=totals['total_time'] or 0,
+            current_streak=current_streak,
+            best_streak=best_streak,
+            goals_count=goals_count,
+            goals_progress=goals_progress,
+            badge_count=badge_count,
+            week_labels=[day.strftime('%a') for day in week_days],  # Mon, Tue, Wed, etc.
+            week_data=[totals[f'day_{i}'] or 0 for i in range(7)],
+            recent_workouts=recent_workouts,
+            active_goals=active_goals[:3],
+            recent_badges=recent_badges,
+        )
+
+    def as_context(self):
+        """Flatten into the template context used by pages/dashboard.html"""
+        return {
+            'workouts_count': self.workouts_count,
+            'workouts_this_month': self.workouts_this_month,
+            'total_time': self.total_time,
+            'current_streak': self.current_streak,
+            'best_streak': self.best_streak,
+            'active_goals': self.active_goals,
+            'goals_count': self.goals_count,
+            'goals_progress': self.goals_progress,
+            'recent_workouts': self.recent_workouts,
+            'badge_count': self.badge_count,
+            'recent_badges': self.recent_badges,
+            # Chart data
+            'week_labels': self.week_labels,
+            'week_data': self.week_data,
+            'weekly_total': self.weekly_total,
+            'weekly_average': self.weekly_average,
+            'most_active_day': self.most_active_day,
+            'max_day_duration': int(self.max_day_duration),
+        }
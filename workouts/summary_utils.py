@@ -0,0 +1,124 @@
+from decimal import Decimal
+
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+from django.utils import timezone
+
+LBS_TO_KG = Decimal('0.45359237')
+TWO_PLACES = Decimal('0.01')
+
+EMPTY_SUMMARY = {
+    'exercise_count': 0,
+    'total_sets': 0,
+    'total_volume_kg': Decimal('0.00'),
+    'total_distance_km': Decimal('0.00'),
+}
+
+
+def summary_aggregates():
+    """Aggregates over WorkoutExercise rows that produce the Workout summary columns"""
+    weight_kg = Case(
+        When(unit='lbs', then=F('weight') * Value(LBS_TO_KG)),
+        default=F('weight'),
+        output_field=DecimalField(max_digits=12, decimal_places=4),
+    )
+    # Rows missing sets, reps or weight contribute no volume (NULL is skipped by SUM)
+    volume = ExpressionWrapper(
+        F('sets') * F('reps') * weight_kg,
+        output_field=DecimalField(max_digits=14, decimal_places=4),
+    )
+    return {
+        'exercise_count': Count('id'),
+        'total_sets': Sum('sets'),
+        'total_volume_kg': Sum(volume),
+        'total_distance_km': Sum('distance'),
+    }
+
+
+def _normalize(row):
+    return {
+        'exercise_count': row['exercise_count'],
+        'total_sets': row['total_sets'] or 0,
+        'total_volume_kg': Decimal(row['total_volume_kg'] or 0).quantize(TWO_PLACES),
+        'total_distance_km': Decimal(row['total_distance_km'] or 0).quantize(TWO_PLACES),
+    }
+
+
+def calculate_workout_summaries(workout_ids):
+    """Return {workout_id: summary} for the given workouts in one grouped query"""
+    from .models import WorkoutExercise
+
+    rows = WorkoutExercise.objects.filter(workout_id__in=workout_ids).order_by().values(
+        'workout_id'
+    ).annotate(**summary_aggregates())
+    summaries = {workout_id: dict(EMPTY_SUMMARY) for workout_id in workout_ids}
+    for row in rows:
+        summaries[row['workout_id']] = _normalize(row)
+    return summaries
+
+
+def summarize_exercises(exercises):
+    """
+    The summary for unsaved WorkoutExercise objects, matching summary_aggregates().
+    Lets bulk writers fill the columns in before inserting the workout.
+    """
+    summary = dict(EMPTY_SUMMARY)
+    for exercise in exercises:
+        summary['exercise_count'] += 1
+        summary['total_sets'] += exercise.sets or 0
+        if exercise.sets is not None and exercise.reps is not None and exercise.weight is not None:
+            weight = exercise.weight * LBS_TO_KG if exercise.unit == 'lbs' else exercise.weight
+            summary['total_volume_kg'] += exercise.sets * exercise.reps * weight
+        summary['total_distance_km'] += exercise.distance or 0
+    summary['total_volume_kg'] = summary['total_volume_kg'].quantize(TWO_PLACES)
+    summary['total_distance_km'] = Decimal(summary['total_distance_km']).quantize(TWO_PLACES)
+    return summary
+
+
+def update_workout_summary(workout_id):
+    """Recompute one workout's summary columns and return the new values"""
+    from .models import Workout
+
+    summary = calculate_workout_summaries([workout_id])[workout_id]
+    # A queryset update skips post_save, so the rollup and search index are not touched.
+    # updated_at still moves, so anything fingerprinting the workout sees the new exercises.
+    Workout.objects.filter(pk=workout_id).update(**summary, updated_at=timezone.now())
+    return summary
+
+
+def repair_workout_summaries(workout_ids=None, dry_run=False, batch_size=1000):
+    """
+    Compare the stored summary columns with the exercises and fix any drift.
+    Returns {workout_id: {field: (stored, expected)}} for drifted workouts.
+    """
+    from .models import Workout
+
+    workouts = Workout.objects.order_by('pk').only('pk', *Workout.SUMMARY_FIELDS)
+    if workout_ids is not None:
+        workouts = workouts.filter(pk__in=workout_ids)
+
+    drifted = {}
+    last_pk = 0
+    while True:
+        batch = list(workouts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        expected = calculate_workout_summaries([workout.pk for workout in batch])
+
+        changed = []
+        for workout in batch:
+            diff = {
+                name: (getattr(workout, name), value)
+                for name, value in expected[workout.pk].items()
+                if getattr(workout, name) != value
+            }
+            if diff:
+                drifted[workout.pk] = diff
+                for name, value in expected[workout.pk].items():
+                    setattr(workout, name, value)
+                changed.append(workout)
+
+        if changed and not dry_run:
+            Workout.objects.bulk_update(changed, Workout.SUMMARY_FIELDS)
+
+    return drifted
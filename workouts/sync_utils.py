@@ -0,0 +1,84 @@
+from django.db import IntegrityError, transaction
+
+MAX_SYNC_WORKOUTS = 500
+MAX_CLIENT_KEY_LENGTH = 64
+
+
+class SyncError(ValueError):
+    """A sync batch that cannot be applied; `errors` lists what is wrong with it"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _client_keys(workouts):
+    """Validate the batch shape and return the client keys in order"""
+    if not isinstance(workouts, list):
+        raise SyncError(["workouts must be a list"])
+    if len(workouts) > MAX_SYNC_WORKOUTS:
+        raise SyncError([f"a sync can hold at most {MAX_SYNC_WORKOUTS} workouts"])
+
+    keys, errors = [], []
+    for index, data in enumerate(workouts):
+        key = data.get('client_key') if isinstance(data, dict) else None
+        if not isinstance(key, str) or not key.strip():
+            errors.append(f"Workout {index}: client_key is required")
+        elif len(key) > MAX_CLIENT_KEY_LENGTH:
+            errors.append(f"Workout {index}: client_key is longer than {MAX_CLIENT_KEY_LENGTH} characters")
+        elif key in keys:
+            errors.append(f"Workout {index}: duplicate client_key '{key}'")
+        keys.append(key)
+    if errors:
+        raise SyncError(errors)
+    return keys
+
+
+def _apply(user, workouts, keys):
+    from .import_utils import ImportRowError, WorkoutImporter
+    from .models import Workout
+
+    synced = dict(Workout.objects.filter(user=user, client_key__in=keys).values_list('client_key', 'id'))
+    created = set()
+
+    importer = WorkoutImporter(user, batch_size=len(workouts) or 1, incremental=True)
+    errors = []
+    for index, (key, data) in enumerate(zip(keys, workouts)):
+        if key in synced:
+            continue
+        try:
+            workout, exercises = importer.build(data)
+        except ImportRowError as exc:
+            errors.append(f"Workout {index}: {exc}")
+            continue
+        workout.client_key = key
+        importer.batch.append((workout, exercises))
+    if errors:
+        raise SyncError(errors)
+
+    with transaction.atomic():
+        new_workouts = [workout for workout, _ in importer.batch]
+        importer.flush()
+        importer.finish()
+    for workout in new_workouts:
+        synced[workout.client_key] = workout.pk
+        created.add(workout.client_key)
+
+    return [{'client_key': key, 'id': synced[key], 'created': key in created} for key in keys]
+
+
+def sync_workouts(user, workouts):
+    """
+    Apply a batch of workouts logged offline, all or nothing.
+    Each workout carries a client-generated `client_key`; keys the user has
+    already synced are returned with their existing id instead of being
+    created again, so a client can safely retry a sync whose response it lost.
+    Returns [{'client_key', 'id', 'created'}] in request order, or raises SyncError.
+    """
+    keys = _client_keys(workouts)
+    try:
+        return _apply(user, workouts, keys)
+    except IntegrityError:
+        # A concurrent retry of the same batch inserted some keys first:
+        # everything rolled back, so look the keys up again and create the rest
+        return _apply(user, workouts, keys)
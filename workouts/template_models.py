@@ -43,6 +43,9 @@ class TemplateExercise(models.Model):
 
     class Meta:
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['template', 'order', 'id'], name='templateexercise_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.exercise.name} in {self.template.name}"
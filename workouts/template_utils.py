@@ -0,0 +1,61 @@
+from django.db import transaction
+
+# Fields copied between WorkoutExercise and TemplateExercise rows
+EXERCISE_FIELDS = ['exercise_id', 'sets', 'reps', 'weight', 'unit', 'distance', 'duration', 'notes']
+
+MAX_TEMPLATE_DATES = 366
+
+
+def capture_template(workout, name, description=''):
+    """Save `workout` and its exercises as a new template with two INSERTs"""
+    from .template_models import TemplateExercise, WorkoutTemplate
+
+    rows = workout.workout_exercises.order_by('id').values(*EXERCISE_FIELDS)
+    with transaction.atomic():
+        template = WorkoutTemplate.objects.create(user=workout.user, name=name, description=description)
+        TemplateExercise.objects.bulk_create([
+            TemplateExercise(template=template, order=order, **row) for order, row in enumerate(rows)
+        ])
+    return template
+
+
+def instantiate_template(template, dates, title=None, notes=None):
+    """
+    Create one workout per date from `template` and return them in date order.
+    The template's exercises are read once and every workout and exercise row
+    is inserted with bulk_create, so the query count does not depend on the
+    number of dates or exercises. Derived data the skipped signals would have
+    maintained (summary, rollup, streak, stats, search index) is refreshed here.
+    """
+    from .models import Workout, WorkoutExercise
+    from .rollup_utils import refresh_daily_activity
+    from .search_utils import index_workouts
+    from .summary_utils import summarize_exercises
+    from .utils import recompute_workout_streak
+    from users.stats_utils import bump_user_stats
+
+    dates = sorted(set(dates))
+    if not dates:
+        return []
+
+    rows = list(template.exercises.values(*EXERCISE_FIELDS))
+    summary = summarize_exercises(WorkoutExercise(**row) for row in rows)
+    if notes is None:
+        notes = f"Created from template: {template.name}"
+
+    with transaction.atomic():
+        workouts = Workout.objects.bulk_create([
+            Workout(user_id=template.user_id, title=title or template.name, date=day, notes=notes, **summary)
+            for day in dates
+        ])
+        WorkoutExercise.objects.bulk_create([
+            WorkoutExercise(workout=workout, **row) for workout in workouts for row in rows
+        ])
+
+        user_id = template.user_id
+        refresh_daily_activity(user_id, dates)
+        recompute_workout_streak(user_id)
+        bump_user_stats(user_id, workout_count=len(workouts))
+        index_workouts([workout.pk for workout in workouts])
+
+    return workouts
@@ -0,0 +1,90 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .choice_utils import custom_exercise_choices, default_exercise_choices, exercise_choices
+from .forms import WorkoutExerciseForm, WorkoutExerciseFormSet
+from .models import Exercise, Workout, WorkoutExercise
+
+
+def exercise_queries(context):
+    return [q for q in context.captured_queries if 'FROM "workouts_exercise"' in q['sql']]
+
+
+class ExerciseChoiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        self.bench = Exercise.objects.create(name='Bench Press', category='strength')
+
+    def test_custom_exercises_listed_first(self):
+        """Test custom exercises come first, marked, followed by the library"""
+        mine = Exercise.objects.create(name='Mine', category='cardio', created_by=self.user, is_custom=True)
+
+        self.assertEqual(exercise_choices(self.user), [
+            ('My Custom Exercises', [(mine.pk, 'Mine ✨')]),
+            ('Default Exercises', [(self.bench.pk, 'Bench Press'), (self.squat.pk, 'Squat')]),
+        ])
+
+    def test_lists_are_cached(self):
+        """Test repeated lookups only read the version counters"""
+        exercise_choices(self.user)
+        with self.assertNumQueries(1):
+            exercise_choices(self.user)
+
+    def test_custom_list_follows_writes(self):
+        """Test creating, renaming and deleting a custom exercise refreshes only that user's list"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        custom_exercise_choices(other)
+
+        mine = Exercise.objects.create(name='Mine', category='cardio', created_by=self.user, is_custom=True)
+        self.assertEqual(custom_exercise_choices(self.user), [(mine.pk, 'Mine ✨')])
+
+        mine.name = 'Renamed'
+        mine.save()
+        self.assertEqual(custom_exercise_choices(self.user), [(mine.pk, 'Renamed ✨')])
+
+        mine.delete()
+        self.assertEqual(custom_exercise_choices(self.user), [])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(custom_exercise_choices(other), [])
+
+    def test_default_list_follows_writes(self):
+        """Test adding a library exercise refreshes the shared list"""
+        default_exercise_choices()
+        deadlift = Exercise.objects.create(name='Deadlift', category='strength')
+        self.assertIn((deadlift.pk, 'Deadlift'), default_exercise_choices())
+
+    def test_formset_builds_choices_once(self):
+        """Test a 10-exercise formset shares one choice list and runs no exercise queries when cached"""
+        workout = Workout.objects.create(user=self.user, title='Big Day', date=date.today())
+        for _ in range(10):
+            WorkoutExercise.objects.create(workout=workout, exercise=self.squat, sets=3, reps=5)
+
+        with CaptureQueriesContext(connection) as cold:
+            formset = WorkoutExerciseFormSet(instance=workout, form_kwargs={'user': self.user})
+            formset.as_p()
+        self.assertEqual(len(exercise_queries(cold)), 2)
+
+        with CaptureQueriesContext(connection) as warm:
+            formset = WorkoutExerciseFormSet(instance=workout, form_kwargs={'user': self.user})
+            formset.as_p()
+        self.assertEqual(exercise_queries(warm), [])
+
+    def test_other_users_custom_exercise_is_rejected(self):
+        """Test the form only accepts the library and the user's own exercises"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        theirs = Exercise.objects.create(name='Theirs', category='cardio', created_by=other, is_custom=True)
+
+        form = WorkoutExerciseForm(data={'exercise': theirs.pk, 'unit': 'kg'}, user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('exercise', form.errors)
+
+        form = WorkoutExerciseForm(data={'exercise': self.squat.pk, 'unit': 'kg'}, user=self.user)
+        self.assertTrue(form.is_valid())
@@ -0,0 +1,94 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .data_export_utils import iter_csv_export, iter_jsonl_export
+from .import_utils import CSV_COLUMNS, import_workouts
+from .models import Exercise, Workout, WorkoutExercise
+
+
+class DataExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        legs = Workout.objects.create(
+            user=self.user, title='Legs, heavy', date=date(2025, 6, 1), duration=45, notes='Felt "strong"'
+        )
+        WorkoutExercise.objects.create(workout=legs, exercise=self.squat, sets=3, reps=5, weight=Decimal('100.5'))
+        WorkoutExercise.objects.create(
+            workout=legs, exercise=self.squat, sets=1, reps=8, weight=Decimal('135'), unit='lbs', notes='Back-off'
+        )
+        Workout.objects.create(user=self.user, title='Rest day walk', date=date(2025, 6, 2))
+
+    def history(self, user):
+        return [
+            (w.date, w.title, w.duration, w.notes, [
+                (e.exercise.name, e.sets, e.reps, e.weight, e.unit, e.distance, e.duration, e.notes)
+                for e in w.workout_exercises.all()
+            ])
+            for w in Workout.objects.filter(user=user).order_by('date', 'id')
+        ]
+
+    def test_csv_round_trips_through_the_importer(self):
+        """Test a CSV export re-imports into the same history"""
+        text = ''.join(iter_csv_export(self.user))
+        other = User.objects.create_user(username='other', password='testpass123')
+
+        result = import_workouts(other, text.splitlines(keepends=True), file_format='csv')
+
+        self.assertEqual(text.splitlines()[0], ','.join(CSV_COLUMNS))
+        self.assertEqual(len(text.splitlines()), 4)
+        self.assertEqual(result.skipped, 0)
+        self.assertEqual(self.history(other), self.history(self.user))
+
+    def test_csv_keeps_same_day_workouts_with_the_same_title_apart(self):
+        """Test two same-titled workouts on one day come back as two workouts"""
+        Workout.objects.create(user=self.user, title='Run', date=date(2025, 6, 3), notes='AM')
+        Workout.objects.create(user=self.user, title='Run', date=date(2025, 6, 3), notes='PM')
+        other = User.objects.create_user(username='other', password='testpass123')
+
+        import_workouts(other, ''.join(iter_csv_export(self.user)).splitlines(keepends=True), file_format='csv')
+
+        self.assertEqual(self.history(other), self.history(self.user))
+
+    def test_jsonl_round_trips_through_the_importer(self):
+        """Test a JSON Lines export has one workout per line and re-imports into the same history"""
+        lines = ''.join(iter_jsonl_export(self.user)).splitlines(keepends=True)
+        other = User.objects.create_user(username='other', password='testpass123')
+
+        import_workouts(other, lines, file_format='jsonl')
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])['exercises'][1]['weight'], 135.0)
+        self.assertEqual(json.loads(lines[1])['exercises'], [])
+        self.assertEqual(self.history(other), self.history(self.user))
+
+    def test_one_query_and_header_first(self):
+        """Test the export reads everything in one query and yields the header on its own first"""
+        chunks = iter_csv_export(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(next(chunks), ','.join(CSV_COLUMNS) + '\r\n')
+        with self.assertNumQueries(1):
+            list(chunks)
+        with self.assertNumQueries(1):
+            list(iter_jsonl_export(self.user))
+
+    def test_download_view(self):
+        """Test the view streams only the user's own workouts and rejects unknown formats"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        Workout.objects.create(user=other, title='Not mine', date=date(2025, 6, 1))
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.get(reverse('export_workouts_data', args=['jsonl']))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertIn('.jsonl"', response['Content-Disposition'])
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('Rest day walk', body)
+        self.assertNotIn('Not mine', body)
+        self.assertEqual(self.client.get(reverse('export_workouts_data', args=['xml'])).status_code, 404)
@@ -0,0 +1,137 @@
+import shutil
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Task
+from jobs.worker import run_pending
+from .export_utils import export_path, export_version, render_export, request_export
+from .models import Exercise, Workout, WorkoutExercise
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.exports_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.exports_root, ignore_errors=True)
+        settings_override = override_settings(EXPORTS_ROOT=self.exports_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.workout = Workout.objects.create(user=self.user, title='Leg Day', date=date(2025, 6, 18), duration=45)
+
+    def test_version_changes_with_data(self):
+        """Test edits, inserts and deletes change the export version"""
+        initial = export_version(self.user.pk, 'workouts')
+
+        self.workout.title = 'Renamed'
+        self.workout.save()
+        edited = export_version(self.user.pk, 'workouts')
+        Workout.objects.create(user=self.user, title='Run', date=date(2025, 6, 19))
+        inserted = export_version(self.user.pk, 'workouts')
+        self.workout.delete()
+        deleted = export_version(self.user.pk, 'workouts')
+
+        self.assertEqual(len({initial, edited, inserted, deleted}), 4)
+
+    def test_exercise_rename_changes_the_version(self):
+        """Test renaming an exercise used in a workout invalidates the stored exports"""
+        sled = Exercise.objects.create(name='Sled', category='strength', created_by=self.user, is_custom=True)
+        WorkoutExercise.objects.create(workout=self.workout, exercise=sled, sets=3, reps=10)
+        before = export_version(self.user.pk, 'detailed')
+
+        sled.name = 'Sled Push'
+        sled.save()
+
+        self.assertNotEqual(export_version(self.user.pk, 'detailed'), before)
+
+    def test_request_queues_one_render(self):
+        """Test repeated requests while a render is pending queue a single task"""
+        self.assertIsNone(request_export(self.user.pk, 'workouts'))
+        self.assertIsNone(request_export(self.user.pk, 'workouts'))
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_download_flow(self):
+        """Test the download redirects to the status page until the job has rendered the PDF"""
+        response = self.client.get(reverse('export_workouts_pdf'))
+        self.assertRedirects(response, reverse('export_status', args=['workouts']))
+        self.assertContains(self.client.get(response.url), 'Preparing your workouts PDF')
+
+        run_pending()
+
+        self.assertContains(self.client.get(reverse('export_status', args=['workouts'])), 'Download PDF')
+        response = self.client.get(reverse('export_workouts_pdf'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_detailed_mode(self):
+        """Test the detailed report is a separate export with its own status page"""
+        response = self.client.get(reverse('export_workouts_pdf'), {'mode': 'detailed'})
+        self.assertRedirects(response, reverse('export_status', args=['detailed']))
+        self.assertContains(self.client.get(response.url), 'Preparing your detailed workout PDF')
+
+        run_pending()
+
+        self.assertContains(
+            self.client.get(reverse('export_status', args=['detailed'])),
+            f"{reverse('export_workouts_pdf')}?mode=detailed"
+        )
+        response = self.client.get(reverse('export_workouts_pdf'), {'mode': 'detailed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('FitTrack_Detailed_', response['Content-Disposition'])
+        self.assertNotEqual(export_version(self.user.pk, 'detailed'), export_version(self.user.pk, 'workouts'))
+
+    def test_status_page_requeues_after_data_changes(self):
+        """Test data edited after a render finished gets a fresh render instead of a spinner forever"""
+        self.client.get(reverse('export_workouts_pdf'))
+        run_pending()
+        Workout.objects.create(user=self.user, title='Run', date=date(2025, 6, 19))
+
+        response = self.client.get(reverse('export_status', args=['workouts']))
+
+        self.assertContains(response, 'Preparing your workouts PDF')
+        self.assertEqual(Task.objects.filter(status=Task.STATUS_QUEUED).count(), 1)
+        run_pending()
+        self.assertContains(self.client.get(reverse('export_status', args=['workouts'])), 'Download PDF')
+
+    def test_cached_file_is_served_without_rendering(self):
+        """Test an up-to-date export is served straight from disk with no new task"""
+        render_export(self.user.pk, 'workouts')
+
+        response = self.client.get(reverse('export_workouts_pdf'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Task.objects.exists())
+
+    def test_render_replaces_old_versions(self):
+        """Test rendering a new version removes the stale file"""
+        old = render_export(self.user.pk, 'workouts')
+        self.workout.title = 'Renamed'
+        self.workout.save()
+
+        new = render_export(self.user.pk, 'workouts')
+
+        self.assertNotEqual(old, new)
+        self.assertEqual(
+            sorted(p.name for p in export_path(self.user.pk, 'workouts', 'x').parent.iterdir()),
+            [export_path(self.user.pk, 'workouts', export_version(self.user.pk, 'workouts')).name]
+        )
+
+    def test_failed_render_offers_retry(self):
+        """Test the status page reports a failed job"""
+        request_export(self.user.pk, 'workouts')
+        Task.objects.update(status=Task.STATUS_FAILED)
+
+        response = self.client.get(reverse('export_status', args=['workouts']))
+
+        self.assertContains(response, 'The export failed')
+        self.assertContains(response, 'Try Again')
+
+    def test_unknown_kind(self):
+        """Test the status page 404s for an unknown export"""
+        self.assertEqual(self.client.get(reverse('export_status', args=['nope'])).status_code, 404)
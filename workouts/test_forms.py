@@ -1,5 +1,10 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
-from workouts.forms import WorkoutForm, WorkoutExerciseForm
+from django.test.utils import CaptureQueriesContext
+from workouts.forms import WorkoutForm, WorkoutExerciseForm, WorkoutExerciseFormSet
+from workouts.models import DailyActivity, Exercise, Workout, WorkoutExercise
+from workouts.search_utils import search_workouts
 from datetime import date
 
 
@@ -68,3 +73,89 @@ class WorkoutExerciseFormTest(TestCase):
         }
         form = WorkoutExerciseForm(data=form_data)
         self.assertTrue(form.is_valid())
+
+
+class BulkFormsetSaveTest(TestCase):
+    """Test cases for the bulk save path of WorkoutExerciseFormSet"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        self.workout = Workout.objects.create(user=self.user, title='Legs', date=date.today())
+
+    def formset_data(self, rows, initial=0):
+        data = {
+            'workout_exercises-TOTAL_FORMS': str(len(rows)),
+            'workout_exercises-INITIAL_FORMS': str(initial),
+            'workout_exercises-MIN_NUM_FORMS': '1',
+            'workout_exercises-MAX_NUM_FORMS': '1000',
+        }
+        for i, row in enumerate(rows):
+            for key, value in row.items():
+                data[f'workout_exercises-{i}-{key}'] = value
+        return data
+
+    def save(self, rows, initial=0):
+        formset = WorkoutExerciseFormSet(
+            self.formset_data(rows, initial), instance=self.workout, form_kwargs={'user': self.user}
+        )
+        self.assertTrue(formset.is_valid(), formset.errors)
+        with CaptureQueriesContext(connection) as queries:
+            formset.save()
+        return queries
+
+    def new_row(self, sets):
+        return {'exercise': self.squat.pk, 'sets': sets, 'reps': 5, 'weight': '100', 'unit': 'kg'}
+
+    def test_statement_count_does_not_grow_with_rows(self):
+        """Test saving 20 new exercises takes as many statements as saving 2"""
+        small = self.save([self.new_row(1) for _ in range(2)])
+        self.workout.workout_exercises.all().delete()
+        large = self.save([self.new_row(1) for _ in range(20)])
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(self.workout.workout_exercises.count(), 20)
+
+    def test_create_update_delete_in_one_save(self):
+        """Test new, changed and deleted rows are all applied and derived data refreshed"""
+        keep = WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=3, reps=5)
+        drop = WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=3, reps=5)
+
+        rows = [
+            {'id': keep.pk, 'exercise': self.squat.pk, 'sets': 4, 'reps': 5, 'unit': 'kg'},
+            {'id': drop.pk, 'exercise': self.squat.pk, 'sets': 3, 'reps': 5, 'unit': 'kg', 'DELETE': 'on'},
+            self.new_row(2),
+        ]
+        self.save(rows, initial=2)
+
+        keep.refresh_from_db()
+        self.assertEqual(keep.sets, 4)
+        self.assertFalse(WorkoutExercise.objects.filter(pk=drop.pk).exists())
+
+        self.workout.refresh_from_db()
+        self.assertEqual(self.workout.exercise_count, 2)
+        self.assertEqual(self.workout.total_sets, 6)
+        activity = DailyActivity.objects.get(user=self.user, date=self.workout.date)
+        self.assertEqual(activity.exercise_count, 2)
+        self.assertEqual(search_workouts(self.user, 'squat'), [self.workout.pk])
+
+    def test_deleting_rows_refreshes_the_workout_once(self):
+        """Test deleting 10 rows takes as many statements as deleting 1, and single deletes still refresh"""
+        def delete_rows(count):
+            rows = [WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=1, reps=5)
+                    for _ in range(count + 1)]
+            data = [
+                {'id': row.pk, 'exercise': self.squat.pk, 'sets': 1, 'reps': 5, 'unit': 'kg', 'DELETE': 'on'}
+                for row in rows[:count]
+            ]
+            data.append({'id': rows[-1].pk, 'exercise': self.squat.pk, 'sets': 1, 'reps': 5, 'unit': 'kg'})
+            queries = self.save(data, initial=count + 1)
+            self.workout.workout_exercises.all().delete()
+            return queries
+
+        self.assertEqual(len(delete_rows(1)), len(delete_rows(10)))
+
+        row = WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=3, reps=5)
+        row.delete()
+        self.workout.refresh_from_db()
+        self.assertEqual(self.workout.exercise_count, 0)
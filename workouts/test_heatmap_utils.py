@@ -0,0 +1,116 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .heatmap_utils import activity_by_month, shift_month, year_heatmap
+from .models import Workout
+from .rollup_utils import rebuild_daily_activity
+
+
+class HeatmapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_shift_month(self):
+        """Test month arithmetic across year boundaries"""
+        self.assertEqual(shift_month(2025, 1, -1), (2024, 12))
+        self.assertEqual(shift_month(2025, 6, -11), (2024, 7))
+        self.assertEqual(shift_month(2024, 12, 12), (2025, 12))
+
+    def test_year_heatmap(self):
+        """Test the heatmap covers 12 months in Monday-first weeks with per-day totals and levels"""
+        Workout.objects.create(user=self.user, title='Long', date=date(2024, 7, 1), duration=90)
+        Workout.objects.create(user=self.user, title='Short', date=date(2025, 3, 10), duration=10)
+        Workout.objects.create(user=self.user, title='Extra', date=date(2025, 3, 10), duration=20)
+        Workout.objects.create(user=self.user, title='Too old', date=date(2024, 6, 30), duration=30)
+
+        heatmap = year_heatmap(self.user, 2025, 6)
+
+        self.assertEqual((heatmap['first_day'], heatmap['last_day']), (date(2024, 7, 1), date(2025, 6, 30)))
+        self.assertEqual((heatmap['total_workouts'], heatmap['total_duration'], heatmap['active_days']), (3, 120, 2))
+        days = {day['date']: day for week in heatmap['weeks'] for day in week['days']}
+        self.assertTrue(all(day['date'].weekday() == 0 for day in (w['days'][0] for w in heatmap['weeks'])))
+        self.assertEqual(days[date(2024, 7, 1)]['level'], 4)
+        self.assertEqual((days[date(2025, 3, 10)]['workout_count'], days[date(2025, 3, 10)]['level']), (2, 2))
+        self.assertEqual(days[date(2025, 3, 11)]['level'], 0)
+        self.assertEqual([w['label'] for w in heatmap['weeks'] if w['label']][:2], ['Jul', 'Aug'])
+        self.assertEqual(len([w for w in heatmap['weeks'] if w['label']]), 12)
+
+    def test_finished_months_are_cached(self):
+        """Test a past window is read once and then served from the cache"""
+        Workout.objects.create(user=self.user, title='Run', date=date(2024, 3, 5), duration=30)
+
+        # The version counters, then the rollup
+        with self.assertNumQueries(2):
+            year_heatmap(self.user, 2024, 6)
+        with self.assertNumQueries(1):
+            heatmap = year_heatmap(self.user, 2024, 6)
+        self.assertEqual(heatmap['total_workouts'], 1)
+
+    def test_current_month_is_live(self):
+        """Test the current month is always queried and today's workouts do not invalidate past months"""
+        today = timezone.localdate()
+        months = [shift_month(today.year, today.month, -1), (today.year, today.month)]
+        activity_by_month(self.user, months)
+
+        Workout.objects.create(user=self.user, title='Today', date=today, duration=25)
+
+        with self.assertNumQueries(2):
+            activity = activity_by_month(self.user, months)
+        self.assertEqual(activity[(today.year, today.month)], {today: (1, 25)})
+
+    def test_back_dated_workout_invalidates(self):
+        """Test adding, moving and deleting a workout in a finished month refreshes the cached month"""
+        activity_by_month(self.user, [(2024, 3)])
+
+        workout = Workout.objects.create(user=self.user, title='Late entry', date=date(2024, 3, 5), duration=40)
+        self.assertEqual(activity_by_month(self.user, [(2024, 3)])[(2024, 3)], {date(2024, 3, 5): (1, 40)})
+
+        workout.date = date(2024, 4, 1)
+        workout.save()
+        self.assertEqual(activity_by_month(self.user, [(2024, 3)])[(2024, 3)], {})
+
+        activity_by_month(self.user, [(2024, 4)])
+        workout.delete()
+        self.assertEqual(activity_by_month(self.user, [(2024, 4)])[(2024, 4)], {})
+
+    def test_invalidation_reaches_other_processes(self):
+        """Test a back-dated workout saved by another worker (with its own local cache) refreshes this one"""
+        activity_by_month(self.user, [(2024, 3)])
+
+        other_worker = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'other'}}
+        with override_settings(CACHES=other_worker):
+            Workout.objects.create(user=self.user, title='Late entry', date=date(2024, 3, 5), duration=40)
+
+        self.assertEqual(activity_by_month(self.user, [(2024, 3)])[(2024, 3)], {date(2024, 3, 5): (1, 40)})
+
+    def test_rollup_rebuild_invalidates(self):
+        """Test rebuilding the rollup drops cached months"""
+        workout = Workout.objects.create(user=self.user, title='Run', date=date(2024, 3, 5), duration=30)
+        activity_by_month(self.user, [(2024, 3)])
+
+        # Simulate drift the rebuild will repair
+        Workout.objects.filter(pk=workout.pk).update(duration=45)
+        rebuild_daily_activity()
+
+        self.assertEqual(activity_by_month(self.user, [(2024, 3)])[(2024, 3)], {date(2024, 3, 5): (1, 45)})
+
+    def test_year_view(self):
+        """Test the calendar's year mode renders the heatmap and both views link to each other"""
+        self.client.login(username='testuser', password='testpass123')
+        Workout.objects.create(user=self.user, title='Run', date=date(2025, 3, 10), duration=30)
+
+        response = self.client.get(reverse('workout_calendar'), {'view': 'year', 'year': 2025, 'month': 6})
+
+        self.assertTemplateUsed(response, 'workouts/calendar_year.html')
+        self.assertContains(response, 'Mon, Mar 10, 2025: 1 workout, 30 min')
+        self.assertContains(response, '?view=year&amp;month=6&amp;year=2024')
+
+        response = self.client.get(reverse('workout_calendar'), {'year': 2025, 'month': 3})
+        self.assertContains(response, '?view=year&amp;month=3&amp;year=2025')
+        self.assertEqual(response.context['total_duration'], 30)
@@ -0,0 +1,119 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from users.models import UserProfile
+from .ical_utils import escape_text, fold_line
+from .models import Workout
+
+
+class ICalendarFormatTests(TestCase):
+    def test_escape_text(self):
+        """Test commas, semicolons, backslashes and newlines are escaped"""
+        self.assertEqual(escape_text('Legs, core; done\\\nnext'), 'Legs\\, core\\; done\\\\\\nnext')
+
+    def test_fold_line(self):
+        """Test long lines fold at 75 octets without splitting multi-byte characters"""
+        folded = fold_line('SUMMARY:' + '💪' * 30)
+
+        lines = folded.split('\r\n')[:-1]
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in lines))
+        self.assertTrue(all(line.startswith(' ') for line in lines[1:]))
+        self.assertEqual(''.join(line[1:] if i else line for i, line in enumerate(lines)), 'SUMMARY:' + '💪' * 30)
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = UserProfile.objects.get(user=self.user).reset_calendar_token()
+        self.url = reverse('workout_calendar_feed', args=[self.token])
+        self.workout = Workout.objects.create(
+            user=self.user, title='Leg Day, heavy', date=date(2025, 6, 18), duration=45, notes='Squats'
+        )
+
+    def body(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_feed_lists_the_users_workouts(self):
+        """Test the feed streams one all-day event per workout of its owner only"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        Workout.objects.create(user=other, title='Not mine', date=date(2025, 6, 18))
+        Workout.objects.create(user=self.user, title='Planned', date=date(2030, 1, 1))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        body = self.body(response)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn(f'UID:workout-{self.workout.pk}@testserver\r\n', body)
+        self.assertIn('DTSTART;VALUE=DATE:20250618\r\nDTEND;VALUE=DATE:20250619\r\n', body)
+        self.assertIn('SUMMARY:Leg Day\\, heavy\r\n', body)
+        self.assertIn('DESCRIPTION:Duration: 45 min\\nSquats\r\n', body)
+        self.assertNotIn('Not mine', body)
+
+    def test_unchanged_feed_is_not_modified(self):
+        """Test a poll with a matching ETag or date gets a 304 from two queries and no body"""
+        first = self.client.get(self.url)
+        self.body(first)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_every_worker_builds_the_same_etag(self):
+        """Test the validators come from the database, so a fresh process (empty cache) agrees"""
+        Workout.objects.create(user=self.user, title='Gone', date=date(2025, 6, 19)).delete()
+        first = self.client.get(self.url)
+
+        cache.clear()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_and_delete_change_the_etag(self):
+        """Test editing or deleting a workout invalidates the ETag"""
+        etag = self.client.get(self.url)['ETag']
+
+        self.workout.title = 'Renamed'
+        self.workout.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('SUMMARY:Renamed', self.body(response))
+
+        etag = response['ETag']
+        self.workout.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('BEGIN:VEVENT', self.body(response))
+
+    def test_unknown_token(self):
+        """Test a wrong token is a 404"""
+        response = self.client.get(reverse('workout_calendar_feed', args=['nope']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_reset_link(self):
+        """Test resetting the link from the profile revokes the old feed URL"""
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.post(reverse('reset_calendar_feed'))
+
+        self.assertRedirects(response, reverse('profile'))
+        new_token = UserProfile.objects.get(user=self.user).calendar_token
+        self.assertNotEqual(new_token, self.token)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertContains(
+            self.client.get(reverse('profile')), reverse('workout_calendar_feed', args=[new_token])
+        )
@@ -0,0 +1,173 @@
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import UserProfile, UserStats
+from .import_utils import import_workouts, iter_csv_workouts
+from .models import DailyActivity, Exercise, Workout, WorkoutExercise
+from .search_utils import search_workouts
+
+CSV_HEADER = 'date,title,duration,notes,exercise,sets,reps,weight,unit,distance,exercise_duration,exercise_notes\n'
+
+
+class WorkoutImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        self.run = Exercise.objects.create(name='Running', category='cardio')
+
+    def test_csv_rows_are_grouped_into_workouts(self):
+        """Test consecutive rows with the same date and title become one workout"""
+        lines = StringIO(
+            CSV_HEADER
+            + '2025-06-18,Leg Day,45,Heavy,Squat,5,5,100,kg,,,\n'
+            + '2025-06-18,Leg Day,45,Heavy,Running,,,,,2.5,15,Cooldown\n'
+            + '2025-06-19,Rest Walk,20,,,,,,,,,\n'
+        )
+
+        workouts = list(iter_csv_workouts(lines))
+        self.assertEqual([line for line, _ in workouts], [2, 4])
+        self.assertEqual(len(workouts[0][1]['exercises']), 2)
+        self.assertEqual(workouts[1][1]['exercises'], [])
+
+    def test_csv_workout_key_column_groups_rows(self):
+        """Test the workout key, when present, decides the grouping instead of date and title"""
+        lines = StringIO(
+            'workout,' + CSV_HEADER
+            + '7,2025-06-18,Run,30,AM,Running,,,,,5,30,\n'
+            + '8,2025-06-18,Run,30,PM,Running,,,,,5,30,\n'
+            + '8,2025-06-18,Run,30,PM,Squat,3,5,100,kg,,,\n'
+        )
+
+        workouts = list(iter_csv_workouts(lines))
+
+        self.assertEqual([(data['notes'], len(data['exercises'])) for _, data in workouts], [('AM', 1), ('PM', 2)])
+
+    def test_import_csv(self):
+        """Test a CSV import creates workouts, exercises and the derived data"""
+        lines = StringIO(
+            CSV_HEADER
+            + '2025-06-18,Leg Day,45,Heavy,squat,5,5,100,kg,,,\n'
+            + '2025-06-18,Leg Day,45,Heavy,Running,,,,,2.5,15,Cooldown\n'
+            + '2025-06-19,Rest Walk,20,,,,,,,,,\n'
+        )
+
+        result = import_workouts(self.user, lines, batch_size=1)
+
+        self.assertEqual((result.workouts_created, result.exercises_created, result.skipped), (2, 2, 0))
+        leg_day = Workout.objects.get(user=self.user, title='Leg Day')
+        self.assertEqual(leg_day.exercise_count, 2)
+        self.assertEqual(leg_day.total_volume_kg, Decimal('2500.00'))
+        self.assertEqual(leg_day.total_distance_km, Decimal('2.50'))
+        self.assertEqual(
+            set(leg_day.workout_exercises.values_list('exercise_id', flat=True)), {self.squat.pk, self.run.pk}
+        )
+
+        self.assertEqual(DailyActivity.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(UserStats.objects.get(user=self.user).workout_count, 2)
+        self.assertEqual(UserProfile.objects.get(user=self.user).best_streak, 2)
+        self.assertEqual(list(search_workouts(self.user, 'leg')), [leg_day.pk])
+
+    def test_import_jsonl_creates_unknown_exercises(self):
+        """Test JSON Lines import adds unknown exercise names once, as custom exercises"""
+        rows = [
+            {'date': '2025-06-18', 'title': 'Pull', 'exercises': [{'exercise': 'Muscle Up', 'sets': 3, 'reps': 5}]},
+            {'date': '2025-06-20', 'title': 'Pull', 'exercises': [{'exercise': 'muscle up', 'sets': 4, 'reps': 5}]},
+        ]
+        lines = StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+
+        result = import_workouts(self.user, lines, file_format='jsonl')
+
+        self.assertEqual(result.custom_exercises_created, 1)
+        custom = Exercise.objects.get(created_by=self.user, is_custom=True)
+        self.assertEqual(custom.name, 'Muscle Up')
+        self.assertEqual(WorkoutExercise.objects.filter(exercise=custom).count(), 2)
+        self.assertEqual(UserStats.objects.get(user=self.user).custom_exercise_count, 1)
+
+    def test_user_exercise_wins_over_library(self):
+        """Test a name matching both the library and the user's own exercise resolves to the user's"""
+        mine = Exercise.objects.create(name='Squat', category='strength', created_by=self.user, is_custom=True)
+        lines = StringIO(json.dumps({'date': '2025-06-18', 'title': 'Legs', 'exercises': [{'exercise': 'Squat'}]}))
+
+        import_workouts(self.user, lines, file_format='jsonl')
+
+        self.assertEqual(WorkoutExercise.objects.get().exercise, mine)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        """Test bad rows are skipped with their line numbers while the rest import"""
+        lines = StringIO('\n'.join([
+            json.dumps({'date': '2025-06-18', 'title': 'Good'}),
+            json.dumps({'date': '18/06/2025', 'title': 'Bad date'}),
+            '{not json',
+            json.dumps({'date': '2025-06-19', 'title': ''}),
+            json.dumps({'date': '2025-06-20', 'title': 'Bad sets', 'exercises': [{'exercise': 'Squat', 'sets': -1}]}),
+            json.dumps({'date': '2025-06-21', 'title': 'Bad unit', 'exercises': [{'exercise': 'Squat', 'unit': 'st'}]}),
+        ]))
+
+        result = import_workouts(self.user, lines, file_format='jsonl')
+
+        self.assertEqual((result.workouts_created, result.skipped), (1, 5))
+        self.assertEqual(result.errors[0], 'Line 2: date must be YYYY-MM-DD')
+        self.assertTrue(result.errors[1].startswith('Line 3: Invalid JSON'))
+        self.assertEqual(list(Workout.objects.values_list('title', flat=True)), ['Good'])
+
+    def test_unknown_exercise_rejected_without_create(self):
+        """Test create_exercises=False skips workouts with unknown exercises"""
+        lines = StringIO(json.dumps({'date': '2025-06-18', 'title': 'X', 'exercises': [{'exercise': 'Nope'}]}))
+
+        result = import_workouts(self.user, lines, file_format='jsonl', create_exercises=False)
+
+        self.assertEqual(result.errors, ["Line 1: unknown exercise 'Nope'"])
+        self.assertFalse(Exercise.objects.filter(is_custom=True).exists())
+
+    def test_batches_use_a_fixed_number_of_queries(self):
+        """Test the write cost depends on the number of batches, not on the number of rows"""
+        def lines(count):
+            start = date(2025, 1, 1)
+            return StringIO(CSV_HEADER + ''.join(
+                f'{start + timedelta(days=i)},Workout {i},30,,Squat,3,5,80,kg,,,\n' for i in range(count)
+            ))
+
+        with CaptureQueriesContext(connection) as small:
+            import_workouts(self.user, lines(5), batch_size=50)
+        Workout.objects.all().delete()
+        with CaptureQueriesContext(connection) as large:
+            import_workouts(self.user, lines(20), batch_size=50)
+
+        self.assertEqual(Workout.objects.count(), 20)
+        self.assertEqual(len(small), len(large))
+
+    def test_command(self):
+        """Test the import_workouts command reads a file and reports the counts"""
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as handle:
+            handle.write(json.dumps({'date': '2025-06-18', 'title': 'Run', 'exercises': [{'exercise': 'Running'}]}))
+        self.addCleanup(os.remove, handle.name)
+
+        out = StringIO()
+        call_command('import_workouts', handle.name, '--user', 'testuser', stdout=out)
+
+        self.assertIn('Imported 1 workouts with 1 exercises', out.getvalue())
+        self.assertTrue(Workout.objects.filter(user=self.user, title='Run').exists())
+
+    def test_import_view(self):
+        """Test uploading a file imports it for the logged-in user"""
+        self.client.login(username='testuser', password='testpass123')
+        upload = SimpleUploadedFile(
+            'workouts.csv', (CSV_HEADER + '2025-06-18,Leg Day,45,,Squat,5,5,100,kg,,,\n').encode()
+        )
+
+        response = self.client.post(reverse('workout_import'), {'file': upload})
+
+        self.assertRedirects(response, reverse('workout_list'))
+        self.assertEqual(Workout.objects.get(user=self.user).title, 'Leg Day')
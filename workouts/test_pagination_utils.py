@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Exercise, Workout, WorkoutExercise
+from .pagination_utils import decode_cursor, encode_cursor, keyset_page
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        today = date(2025, 6, 18)
+        # Two workouts per day so pages have to break ties on id
+        self.workouts = [
+            Workout.objects.create(user=self.user, title=f'W{i}', date=today - timedelta(days=i // 2))
+            for i in range(9)
+        ]
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the workout's date and id"""
+        workout = self.workouts[0]
+        self.assertEqual(decode_cursor(encode_cursor(workout)), (workout.date, workout.pk))
+
+    def test_malformed_cursor_is_ignored(self):
+        """Test garbage cursors fall back to the first page"""
+        for value in [None, '', 'abc', '2025-13-01.1', '2025-06-01.x']:
+            self.assertIsNone(decode_cursor(value))
+
+    def test_pages_cover_every_workout_once(self):
+        """Test walking the cursors returns each workout exactly once in order"""
+        queryset = Workout.objects.filter(user=self.user)
+        seen, cursor = [], None
+        while True:
+            page, cursor = keyset_page(queryset, cursor, per_page=4)
+            seen.extend(page)
+            if not cursor:
+                break
+
+        expected = list(queryset.order_by('-date', '-id'))
+        self.assertEqual(seen, expected)
+
+    def test_deep_page_uses_one_query(self):
+        """Test a page deep in the history still costs a single query"""
+        queryset = Workout.objects.filter(user=self.user)
+        cursor = encode_cursor(self.workouts[6])
+
+        with self.assertNumQueries(1):
+            page, next_cursor = keyset_page(queryset, cursor, per_page=4)
+
+        # W7 shares W6's date but has a higher id, so it sorts before the cursor
+        self.assertEqual([w.title for w in page], ['W8'])
+        self.assertIsNone(next_cursor)
+
+
+class WorkoutListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.exercise = Exercise.objects.create(name='Squat', category='strength')
+
+    def test_list_annotates_exercise_counts(self):
+        """Test exercise counts come from the list query, not one query per row"""
+        workout = Workout.objects.create(user=self.user, title='Legs', date=date.today())
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise, sets=3, reps=5)
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise, sets=3, reps=5)
+
+        response = self.client.get(reverse('workout_list'))
+
+        self.assertEqual(response.context['workouts'][0].total_exercises, 2)
+        self.assertContains(response, '2 exercises')
+
+    def test_category_filter_keeps_exact_counts(self):
+        """Test filtering by category does not multiply the exercise count"""
+        workout = Workout.objects.create(user=self.user, title='Legs', date=date.today())
+        for _ in range(3):
+            WorkoutExercise.objects.create(workout=workout, exercise=self.exercise, sets=3, reps=5)
+
+        response = self.client.get(reverse('workout_list') + '?category=strength')
+
+        self.assertEqual([w.total_exercises for w in response.context['workouts']], [3])
+
+    def test_next_page_link_keeps_filters(self):
+        """Test a full page links to the next one with the filters preserved"""
+        for i in range(25):
+            Workout.objects.create(user=self.user, title=f'Run {i}', date=date.today() - timedelta(days=i))
+
+        date_from = (date.today() - timedelta(days=30)).isoformat()
+        response = self.client.get(reverse('workout_list'), {'date_from': date_from})
+        self.assertEqual(len(response.context['workouts']), 20)
+        next_cursor = response.context['next_cursor']
+        self.assertContains(response, f'date_from={date_from}&amp;cursor=')
+
+        response = self.client.get(reverse('workout_list'), {'date_from': date_from, 'cursor': next_cursor})
+        self.assertEqual(len(response.context['workouts']), 5)
+        self.assertIsNone(response.context['next_cursor'])
@@ -1,9 +1,17 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from datetime import date
-from .models import Workout
-from .pdf_utils import generate_workouts_pdf
+from decimal import Decimal
+from .models import Exercise, Workout, WorkoutExercise
+from .pdf_utils import (
+    PDF_ROWS_PER_TABLE, StreamingDocTemplate, generate_workouts_pdf, iter_detailed_workout_flowables,
+    iter_workout_flowables, write_detailed_workouts_pdf,
+)
 from io import BytesIO
+from reportlab.platypus import LongTable, Paragraph
+from reportlab.lib.styles import getSampleStyleSheet
 
 
 class PDFGenerationTests(TestCase):
@@ -112,3 +120,99 @@ class PDFGenerationTests(TestCase):
 
         self.assertIsInstance(pdf_buffer, BytesIO)
         self.assertGreater(pdf_buffer.getbuffer().nbytes, 0)
+
+    def test_long_history_is_chunked_into_page_sized_tables(self):
+        """Test long histories become several repeated-header tables over several pages"""
+        Workout.objects.bulk_create([
+            Workout(user=self.user, title=f'Workout {i}', date=date(2024, 1, 1), duration=30)
+            for i in range(PDF_ROWS_PER_TABLE * 3)
+        ])
+        workouts = Workout.objects.filter(user=self.user)
+
+        tables = [f for f in iter_workout_flowables(workouts, self.user) if isinstance(f, LongTable)]
+        pdf_content = generate_workouts_pdf(workouts, self.user).getvalue()
+
+        self.assertEqual(len(tables), 3)
+        self.assertTrue(all(table._cellvalues[0][0] == 'Date' for table in tables))
+        self.assertGreaterEqual(pdf_content.count(b'/Type /Page\n'), 3)
+
+    def test_streaming_template_pulls_flowables_lazily(self):
+        """Test the document only draws flowables ahead of the page being laid out"""
+        pulled, pages = [], []
+
+        def flowables():
+            for i in range(200):
+                pulled.append(i)
+                yield Paragraph(f'Line {i}', getSampleStyleSheet()['Normal'])
+
+        class Probe(StreamingDocTemplate):
+            def afterPage(doc):
+                pages.append(len(pulled))
+
+        Probe(BytesIO()).build_from(flowables())
+
+        self.assertGreater(len(pages), 2)
+        self.assertLess(pages[0], 100)
+        self.assertEqual(pulled, list(range(200)))
+
+
+class DetailedReportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        self.run = Exercise.objects.create(name='Run', category='cardio')
+
+    def add_workout(self, title, day, *entries):
+        workout = Workout.objects.create(user=self.user, title=title, date=day, duration=45)
+        WorkoutExercise.objects.bulk_create([WorkoutExercise(workout=workout, **entry) for entry in entries])
+        return workout
+
+    def tables(self, workouts):
+        return [f._cellvalues for f in iter_detailed_workout_flowables(workouts, self.user) if isinstance(f, LongTable)]
+
+    def test_lists_exercises_and_per_exercise_summary(self):
+        """Test each workout gets its exercise table and the report ends with per-exercise totals"""
+        self.add_workout(
+            'Legs', date(2025, 6, 1),
+            {'exercise': self.squat, 'sets': 3, 'reps': 5, 'weight': Decimal('100')},
+            {'exercise': self.run, 'distance': Decimal('2.5'), 'duration': 15},
+        )
+        self.add_workout(
+            'More legs', date(2025, 6, 3),
+            {'exercise': self.squat, 'sets': 2, 'reps': 5, 'weight': 225, 'unit': 'lbs'},
+        )
+        self.add_workout('Rest', date(2025, 6, 5))
+
+        legs, more_legs, summary = self.tables(Workout.objects.filter(user=self.user).order_by('date'))
+
+        self.assertEqual(legs[1:], [
+            ['Squat', '3', '5', '100.00 kg', '-', '-'],
+            ['Run', '-', '-', '-', '2.50 km', '15 min'],
+        ])
+        self.assertEqual(more_legs[1], ['Squat', '2', '5', '225.00 lbs', '-', '-'])
+        self.assertEqual(summary[1:], [
+            ['Run', '1', '0', '-', '0.00', '2.50'],
+            ['Squat', '2', '5', '102.06', '2520.58', '0.00'],
+        ])
+
+    def test_query_count_does_not_grow_with_history(self):
+        """Test exercises are prefetched per chunk instead of queried per workout"""
+        for i in range(3):
+            self.add_workout(f'W{i}', date(2025, 6, i + 1), {'exercise': self.squat, 'sets': 3, 'reps': 5})
+
+        with CaptureQueriesContext(connection) as few:
+            write_detailed_workouts_pdf(Workout.objects.filter(user=self.user), self.user, BytesIO())
+
+        for i in range(3, 20):
+            self.add_workout(f'W{i}', date(2025, 6, i + 1), {'exercise': self.run, 'distance': 5})
+        with CaptureQueriesContext(connection) as many:
+            write_detailed_workouts_pdf(Workout.objects.filter(user=self.user), self.user, BytesIO())
+
+        self.assertEqual(len(few), 4)
+        self.assertEqual(len(many), len(few))
+
+    def test_empty_history(self):
+        """Test a report with no workouts renders"""
+        out = BytesIO()
+        write_detailed_workouts_pdf(Workout.objects.filter(user=self.user), self.user, out)
+        self.assertTrue(out.getvalue().startswith(b'%PDF'))
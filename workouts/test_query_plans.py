@@ -0,0 +1,100 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+
+from goals.models import Badge, Goal
+from .models import Exercise, Workout
+from .pagination_utils import after_cursor, encode_cursor
+from .template_models import TemplateExercise, WorkoutTemplate
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN the hot queries from workouts.views and goals.views and check they
+    search one of our composite indexes instead of scanning the table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123')
+        Workout.objects.create(user=cls.user, title='Run', date=date.today())
+
+    def plan(self, queryset):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are asserted against SQLite output')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.plan(queryset)
+        self.assertRegex(plan, rf'SEARCH \S+ USING (COVERING )?INDEX {index_name}\b', plan)
+
+    def assertNoSort(self, queryset):
+        plan = self.plan(queryset)
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan, plan)
+
+    def test_workout_list_page(self):
+        """Test workout_list pages seek the (user, date, id) index in order"""
+        queryset = Workout.objects.filter(user=self.user).only('id', 'title', 'date')
+        page = queryset.filter(date__lte=date.today()).order_by('-date', '-id')[:21]
+
+        self.assertUsesIndex(page, 'workout_user_date_idx')
+        self.assertNoSort(page)
+
+    def test_workout_keyset_cursor(self):
+        """Test a deep keyset page still uses the index without sorting"""
+        workout = Workout.objects.get(user=self.user)
+        queryset = after_cursor(Workout.objects.filter(user=self.user), encode_cursor(workout))[:21]
+
+        self.assertUsesIndex(queryset, 'workout_user_date_idx')
+        self.assertNoSort(queryset)
+
+    def test_dashboard_recent_workouts(self):
+        """Test the dashboard's recent workouts use the (user, date) prefix"""
+        queryset = Workout.objects.filter(user=self.user).order_by('-date', '-created_at')[:5]
+        self.assertUsesIndex(queryset, 'workout_user_date_idx')
+
+    def test_active_goals(self):
+        """Test goal_list and the dashboard read active goals in target_date order from the index"""
+        queryset = Goal.objects.filter(user=self.user, is_completed=False).order_by('target_date')
+
+        self.assertUsesIndex(queryset, 'goal_active_idx')
+        self.assertNoSort(queryset)
+
+    def test_completed_goals(self):
+        """Test completed goals are read newest first from their partial index"""
+        queryset = Goal.objects.filter(user=self.user, is_completed=True).order_by('-completed_date')
+
+        self.assertUsesIndex(queryset, 'goal_completed_idx')
+        self.assertNoSort(queryset)
+
+    def test_custom_exercise_picker(self):
+        """Test a user's custom exercises are read in category, name order from the index"""
+        queryset = Exercise.objects.filter(created_by=self.user, is_custom=True).order_by('category', 'name')
+
+        self.assertUsesIndex(queryset, 'exercise_custom_idx')
+        self.assertNoSort(queryset)
+
+    def test_library_exercise_picker(self):
+        """Test the default exercise library is read in category, name order from its partial index"""
+        queryset = Exercise.objects.filter(is_custom=False).order_by('category', 'name')
+
+        self.assertNoSort(queryset)
+        self.assertIn('exercise_library_idx', self.plan(queryset))
+
+    def test_badges_page(self):
+        """Test a user's badges come newest first from the index"""
+        queryset = Badge.objects.filter(user=self.user)
+
+        self.assertUsesIndex(queryset, 'badge_user_earned_idx')
+        self.assertNoSort(queryset)
+
+    def test_template_exercises(self):
+        """Test a template's exercises are read in order from the index"""
+        template = WorkoutTemplate.objects.create(user=self.user, name='Push')
+        queryset = TemplateExercise.objects.filter(template=template)
+
+        self.assertUsesIndex(queryset, 'templateexercise_order_idx')
+        self.assertNoSort(queryset)
@@ -0,0 +1,88 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from datetime import date, timedelta
+from io import StringIO
+from .models import Workout, WorkoutExercise, Exercise, DailyActivity
+from .rollup_utils import rebuild_daily_activity
+
+
+class DailyActivityRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.exercise = Exercise.objects.create(name='Squat', category='strength')
+        self.today = date.today()
+
+    def get_row(self, day):
+        return DailyActivity.objects.get(user=self.user, date=day)
+
+    def test_workout_create_updates_rollup(self):
+        """Test creating workouts keeps the daily row current"""
+        Workout.objects.create(user=self.user, title='A', date=self.today, duration=30)
+        Workout.objects.create(user=self.user, title='B', date=self.today, duration=None)
+
+        row = self.get_row(self.today)
+        self.assertEqual(row.workout_count, 2)
+        self.assertEqual(row.total_minutes, 30)
+
+    def test_exercise_changes_update_rollup(self):
+        """Test adding and removing exercises updates exercise counts"""
+        workout = Workout.objects.create(user=self.user, title='A', date=self.today, duration=30)
+        first = WorkoutExercise.objects.create(workout=workout, exercise=self.exercise)
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise)
+        self.assertEqual(self.get_row(self.today).exercise_count, 2)
+
+        first.delete()
+        self.assertEqual(self.get_row(self.today).exercise_count, 1)
+
+    def test_moving_workout_updates_both_days(self):
+        """Test changing a workout's date moves it between rollup rows"""
+        yesterday = self.today - timedelta(days=1)
+        workout = Workout.objects.create(user=self.user, title='A', date=self.today, duration=30)
+
+        workout = Workout.objects.get(pk=workout.pk)
+        workout.date = yesterday
+        workout.save()
+
+        self.assertFalse(DailyActivity.objects.filter(user=self.user, date=self.today).exists())
+        self.assertEqual(self.get_row(yesterday).total_minutes, 30)
+
+    def test_workout_delete_removes_empty_day(self):
+        """Test deleting the last workout of a day removes the row"""
+        workout = Workout.objects.create(user=self.user, title='A', date=self.today, duration=30)
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise)
+
+        workout.delete()
+        self.assertFalse(DailyActivity.objects.filter(user=self.user).exists())
+
+    def test_rebuild_matches_incremental_rollup(self):
+        """Test a full rebuild produces the same rows as incremental updates"""
+        for i in range(3):
+            workout = Workout.objects.create(
+                user=self.user, title=f'W{i}', date=self.today - timedelta(days=i), duration=10 * (i + 1)
+            )
+            WorkoutExercise.objects.create(workout=workout, exercise=self.exercise)
+        expected = list(DailyActivity.objects.values_list('date', 'workout_count', 'total_minutes', 'exercise_count'))
+
+        DailyActivity.objects.all().delete()
+        written = rebuild_daily_activity()
+
+        self.assertEqual(written, 3)
+        self.assertEqual(
+            list(DailyActivity.objects.values_list('date', 'workout_count', 'total_minutes', 'exercise_count')),
+            expected
+        )
+
+    def test_rebuild_command(self):
+        """Test the management command rebuilds the rollup"""
+        Workout.objects.create(user=self.user, title='A', date=self.today, duration=30)
+        DailyActivity.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_daily_activity', stdout=out)
+
+        self.assertIn('Rebuilt 1 daily activity rows', out.getvalue())
+        self.assertEqual(self.get_row(self.today).workout_count, 1)
@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Exercise, Workout, WorkoutExercise
+from .search_utils import BasicSearchBackend, get_search_backend, index_workouts, search_terms, search_workouts
+
+
+class SearchTermsTests(TestCase):
+    def test_operators_and_quotes_are_dropped(self):
+        """Test queries are reduced to plain lowercase words"""
+        self.assertEqual(search_terms('Push "legs" OR -core*'), ['push', 'legs', 'or', 'core'])
+
+
+class WorkoutSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Back Squat', category='strength')
+        today = date.today()
+        self.legs = Workout.objects.create(user=self.user, title='Leg Day', date=today - timedelta(days=2))
+        self.run = Workout.objects.create(
+            user=self.user, title='Easy Run', notes='Legs felt heavy', date=today - timedelta(days=1)
+        )
+        WorkoutExercise.objects.create(workout=self.legs, exercise=self.squat, sets=5, reps=5)
+
+    def test_prefix_matching(self):
+        """Test partial words match as prefixes"""
+        self.assertEqual(search_workouts(self.user, 'squ'), [self.legs.pk])
+
+    def test_title_ranks_above_notes(self):
+        """Test a title match outranks a match in the notes"""
+        self.assertEqual(search_workouts(self.user, 'leg'), [self.legs.pk, self.run.pk])
+
+    def test_all_terms_must_match(self):
+        """Test multi-word queries require every word"""
+        self.assertEqual(search_workouts(self.user, 'easy heavy'), [self.run.pk])
+        self.assertEqual(search_workouts(self.user, 'easy squat'), [])
+
+    def test_other_users_are_not_searched(self):
+        """Test results are limited to the searching user"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        Workout.objects.create(user=other, title='Leg Day', date=date.today())
+        self.assertEqual(len(search_workouts(self.user, 'leg')), 2)
+
+    def test_index_follows_writes(self):
+        """Test renames, new exercises and deletes are reflected in the index"""
+        self.run.title = 'Tempo Run'
+        self.run.save()
+        self.assertEqual(search_workouts(self.user, 'tempo'), [self.run.pk])
+
+        WorkoutExercise.objects.create(workout=self.run, exercise=self.squat, sets=1, reps=1)
+        self.assertEqual(sorted(search_workouts(self.user, 'squat')), sorted([self.legs.pk, self.run.pk]))
+
+        self.squat.name = 'Goblet Squat'
+        self.squat.save()
+        self.assertEqual(len(search_workouts(self.user, 'goblet')), 2)
+
+        self.run.delete()
+        self.assertEqual(search_workouts(self.user, 'tempo'), [])
+
+    def test_rebuild_command(self):
+        """Test the index can be rebuilt from the workout tables"""
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 2 workouts', out.getvalue())
+        self.assertEqual(search_workouts(self.user, 'squat'), [self.legs.pk])
+
+    def test_basic_backend_fallback(self):
+        """Test the icontains fallback finds title and exercise matches"""
+        backend = BasicSearchBackend()
+        self.assertEqual(backend.search(self.user.pk, 'Squat'), [self.legs.pk])
+        self.assertEqual(backend.search(self.user.pk, 'run'), [self.run.pk])
+
+    def test_sqlite_uses_fts(self):
+        """Test SQLite databases get the FTS5 backend"""
+        self.assertEqual(get_search_backend().vendor, 'sqlite')
+
+    def test_list_view_orders_by_relevance(self):
+        """Test the workout list shows search results best match first"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('workout_list'), {'search': 'leg'})
+        self.assertEqual([w.pk for w in response.context['workouts']], [self.legs.pk, self.run.pk])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_filters_apply_to_every_match(self):
+        """Test date and category filters narrow all matches, not only the best-ranked ones"""
+        start = date(2024, 1, 1)
+        Workout.objects.bulk_create([
+            Workout(user=self.user, title='Leg Day', date=start + timedelta(days=day)) for day in range(251)
+        ])
+        # bulk_create skips the signals that keep the index current
+        index_workouts(Workout.objects.filter(user=self.user).values_list('id', flat=True))
+
+        date_from = start + timedelta(days=240)
+        ids = search_workouts(self.user, 'leg', date_from=date_from, date_to=start + timedelta(days=250))
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(search_workouts(self.user, 'leg', category='strength'), [self.legs.pk])
+
+        # Equal scores come back newest first
+        dates = list(Workout.objects.filter(pk__in=ids).order_by('-date').values_list('id', flat=True))
+        self.assertEqual(ids, dates)
+
+    def test_list_view_pages_through_results(self):
+        """Test search results are paged with no gaps or repeats"""
+        Workout.objects.bulk_create([
+            Workout(user=self.user, title='Leg Day', date=date(2024, 1, 1) + timedelta(days=day)) for day in range(45)
+        ])
+        index_workouts(Workout.objects.filter(user=self.user).values_list('id', flat=True))
+        self.client.login(username='testuser', password='testpass123')
+
+        seen, params = [], {'search': 'leg', 'date_from': '2024-01-01'}
+        while True:
+            response = self.client.get(reverse('workout_list'), params)
+            seen += [w.pk for w in response.context['workouts']]
+            self.assertLessEqual(len(response.context['workouts']), 20)
+            if not response.context['next_cursor']:
+                break
+            params['cursor'] = response.context['next_cursor']
+
+        # The 45 new workouts plus the two from setUp, each exactly once
+        self.assertEqual(len(set(seen)), 47)
+        self.assertEqual(seen, search_workouts(self.user, 'leg', date_from='2024-01-01'))
@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from datetime import date, timedelta
+from goals.models import Goal
+from .models import Workout, WorkoutExercise, Exercise
+from .stats_utils import DashboardStats
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.exercise = Exercise.objects.create(name='Squat', category='strength')
+
+    def test_empty_user(self):
+        """Test stats for a user with no data"""
+        stats = DashboardStats.for_user(self.user)
+        self.assertEqual(stats.workouts_count, 0)
+        self.assertEqual(stats.total_time, 0)
+        self.assertEqual(stats.current_streak, 0)
+        self.assertEqual(stats.week_data, [0] * 7)
+        self.assertIsNone(stats.most_active_day)
+
+    def test_counts_and_week_chart(self):
+        """Test headline numbers and weekly chart values"""
+        today = date(2025, 6, 18)  # Wednesday
+        Workout.objects.create(user=self.user, title='A', date=today, duration=30)
+        Workout.objects.create(user=self.user, title='B', date=today, duration=15)
+        Workout.objects.create(user=self.user, title='C', date=today - timedelta(days=1), duration=20)
+        Workout.objects.create(user=self.user, title='Old', date=date(2025, 5, 1), duration=60)
+
+        stats = DashboardStats.for_user(self.user, today=today)
+
+        self.assertEqual(stats.workouts_count, 4)
+        self.assertEqual(stats.workouts_this_month, 3)
+        self.assertEqual(stats.total_time, 65)
+        self.assertEqual(stats.week_labels[0], 'Mon')
+        self.assertEqual(stats.week_data, [0, 20, 45, 0, 0, 0, 0])
+        self.assertEqual(stats.weekly_total, 65)
+        self.assertEqual(stats.most_active_day, 'Wed')
+        self.assertEqual(stats.current_streak, 2)
+
+    def test_recent_workouts_have_exercise_counts(self):
+        """Test recent workouts are annotated with exercise counts"""
+        workout = Workout.objects.create(user=self.user, title='Legs', date=date.today(), duration=30)
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise, sets=3, reps=5)
+        WorkoutExercise.objects.create(workout=workout, exercise=self.exercise, sets=3, reps=5)
+
+        stats = DashboardStats.for_user(self.user)
+        self.assertEqual(stats.recent_workouts[0].total_exercises, 2)
+
+    def test_goal_progress(self):
+        """Test active goal count and average progress"""
+        Goal.objects.create(user=self.user, title='G1', target_number=100, current_number=50,
+                            target_date=date.today())
+        Goal.objects.create(user=self.user, title='G2', target_number=100, current_number=100,
+                            target_date=date.today())
+        stats = DashboardStats.for_user(self.user)
+        self.assertEqual(stats.goals_count, 2)
+        self.assertEqual(stats.goals_progress, 75)
+
+    def test_query_count_is_constant(self):
+        """Test the number of queries does not grow with history size"""
+        for i in range(20):
+            Workout.objects.create(user=self.user, title=f'W{i}', date=date.today() - timedelta(days=i), duration=10)
+
+        with self.assertNumQueries(4):
+            stats = DashboardStats.for_user(self.user)
+            [w.total_exercises for w in stats.recent_workouts]
+
+    def test_badges_read_from_counter(self):
+        """Test badge count comes from UserStats and badges load only when there are some"""
+        from goals.models import Badge
+
+        with self.assertNumQueries(4):
+            self.assertEqual(DashboardStats.for_user(self.user).recent_badges, [])
+
+        Badge.objects.create(user=self.user, badge_type='first_workout')
+        stats = DashboardStats.for_user(self.user)
+        self.assertEqual(stats.badge_count, 1)
+        self.assertEqual([b.badge_type for b in stats.recent_badges], ['first_workout'])
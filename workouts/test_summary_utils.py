@@ -0,0 +1,126 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Exercise, Workout, WorkoutExercise
+from .summary_utils import calculate_workout_summaries, repair_workout_summaries, summarize_exercises
+
+
+class WorkoutSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        self.run = Exercise.objects.create(name='Run', category='cardio')
+        self.workout = Workout.objects.create(user=self.user, title='Mixed', date=date.today())
+
+    def refresh(self):
+        self.workout.refresh_from_db()
+        return self.workout
+
+    def test_summary_follows_exercise_writes(self):
+        """Test the summary is recomputed when exercises are added, edited and removed"""
+        squat = WorkoutExercise.objects.create(
+            workout=self.workout, exercise=self.squat, sets=3, reps=5, weight=Decimal('100')
+        )
+        WorkoutExercise.objects.create(workout=self.workout, exercise=self.run, distance=Decimal('5.5'))
+
+        workout = self.refresh()
+        self.assertEqual(workout.exercise_count, 2)
+        self.assertEqual(workout.total_exercises, 2)
+        self.assertEqual(workout.total_sets, 3)
+        self.assertEqual(workout.total_volume_kg, Decimal('1500.00'))
+        self.assertEqual(workout.total_distance_km, Decimal('5.50'))
+
+        squat.sets = 4
+        squat.save()
+        self.assertEqual(self.refresh().total_volume_kg, Decimal('2000.00'))
+
+        squat.delete()
+        workout = self.refresh()
+        self.assertEqual(workout.exercise_count, 1)
+        self.assertEqual(workout.total_volume_kg, Decimal('0.00'))
+
+    def test_pounds_are_converted(self):
+        """Test volume logged in lbs is stored in kg"""
+        WorkoutExercise.objects.create(
+            workout=self.workout, exercise=self.squat, sets=1, reps=10, weight=Decimal('100'), unit='lbs'
+        )
+        self.assertEqual(self.refresh().total_volume_kg, Decimal('453.59'))
+
+    def test_summarize_unsaved_exercises_matches_database(self):
+        """Test the in-Python summary used by bulk imports agrees with the SQL aggregate"""
+        exercises = [
+            WorkoutExercise(workout=self.workout, exercise=self.squat, sets=3, reps=5, weight=Decimal('80.5')),
+            WorkoutExercise(
+                workout=self.workout, exercise=self.squat, sets=1, reps=10, weight=Decimal('100'), unit='lbs'
+            ),
+            WorkoutExercise(workout=self.workout, exercise=self.squat, sets=2),
+            WorkoutExercise(workout=self.workout, exercise=self.run, distance=Decimal('5.25')),
+        ]
+        expected = summarize_exercises(exercises)
+        WorkoutExercise.objects.bulk_create(exercises)
+
+        self.assertEqual(expected, calculate_workout_summaries([self.workout.pk])[self.workout.pk])
+
+    def test_stale_copy_does_not_overwrite_summary(self):
+        """Test saving a workout loaded before its exercises changed keeps the summary"""
+        stale = Workout.objects.get(pk=self.workout.pk)
+        WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=3, reps=5)
+
+        stale.title = 'Renamed'
+        stale.save()
+
+        workout = self.refresh()
+        self.assertEqual(workout.title, 'Renamed')
+        self.assertEqual(workout.exercise_count, 1)
+
+    def test_update_summary(self):
+        """Test update_summary recomputes and sets the in-memory values"""
+        WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=3, reps=5)
+        Workout.objects.filter(pk=self.workout.pk).update(exercise_count=0, total_sets=0)
+
+        self.workout.update_summary()
+        self.assertEqual(self.workout.total_sets, 3)
+        self.assertEqual(self.refresh().exercise_count, 1)
+
+    def test_repair_reports_and_fixes_drift(self):
+        """Test repair lists drifted workouts and rewrites their columns"""
+        WorkoutExercise.objects.create(workout=self.workout, exercise=self.squat, sets=3, reps=5)
+        Workout.objects.filter(pk=self.workout.pk).update(exercise_count=9)
+
+        self.assertEqual(repair_workout_summaries(dry_run=True), {self.workout.pk: {'exercise_count': (9, 1)}})
+        self.assertEqual(self.refresh().exercise_count, 9)
+
+        repair_workout_summaries()
+        self.assertEqual(self.refresh().exercise_count, 1)
+        self.assertEqual(repair_workout_summaries(), {})
+
+    def test_repair_command(self):
+        """Test repair_workout_summaries --check reports without writing"""
+        Workout.objects.filter(pk=self.workout.pk).update(total_sets=4)
+
+        out = StringIO()
+        call_command('repair_workout_summaries', '--check', stdout=out)
+        self.assertIn('total_sets 4 → 0', out.getvalue())
+        self.assertEqual(self.refresh().total_sets, 4)
+
+        out = StringIO()
+        call_command('repair_workout_summaries', stdout=out)
+        self.assertIn('Repaired 1 of 1 workouts', out.getvalue())
+        self.assertEqual(self.refresh().total_sets, 0)
+
+    def test_admin_shows_summary_read_only(self):
+        """Test the admin change form displays the summary columns without inputs that would be ignored"""
+        admin_user = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:workouts_workout_change', args=[self.workout.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        for name in Workout.SUMMARY_FIELDS:
+            self.assertNotContains(response, f'name="{name}"')
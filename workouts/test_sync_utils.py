@@ -0,0 +1,134 @@
+import json
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import UserProfile, UserStats
+from .models import DailyActivity, Exercise, Workout, WorkoutExercise
+from .sync_utils import SyncError, sync_workouts
+
+
+def offline_workout(key, title='Gym', day='2025-06-18', **extra):
+    return {
+        'client_key': key,
+        'date': day,
+        'title': title,
+        'exercises': [{'exercise': 'Squat', 'sets': 3, 'reps': 5, 'weight': 100}],
+        **extra,
+    }
+
+
+class WorkoutSyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+
+    def test_sync_creates_workouts_and_returns_ids(self):
+        """Test a batch is created with its exercises and ids come back in request order"""
+        synced = sync_workouts(self.user, [offline_workout('a'), offline_workout('b', day='2025-06-19')])
+
+        workouts = {w.client_key: w for w in Workout.objects.filter(user=self.user)}
+        self.assertEqual(synced, [
+            {'client_key': 'a', 'id': workouts['a'].pk, 'created': True},
+            {'client_key': 'b', 'id': workouts['b'].pk, 'created': True},
+        ])
+        self.assertEqual(workouts['a'].exercise_count, 1)
+        self.assertEqual(WorkoutExercise.objects.filter(workout__user=self.user).count(), 2)
+        self.assertEqual(UserStats.objects.get(user=self.user).workout_count, 2)
+
+    def test_sync_refreshes_only_the_synced_days(self):
+        """Test a sync updates the rollup, streak and counters for its own days without rebuilding the rest"""
+        Workout.objects.create(user=self.user, title='Earlier', date=date(2025, 6, 10))
+        # Drift on a day the sync does not touch stays as it is
+        DailyActivity.objects.filter(user=self.user, date=date(2025, 6, 10)).update(workout_count=9)
+
+        sync_workouts(self.user, [
+            offline_workout('a', day='2025-06-17'), offline_workout('b', day='2025-06-18', duration=30),
+            offline_workout('c', day='2025-06-18', exercises=[{'exercise': 'Sled Push'}]),
+        ])
+
+        rollup = dict(DailyActivity.objects.filter(user=self.user).values_list('date', 'workout_count'))
+        self.assertEqual(rollup, {date(2025, 6, 10): 9, date(2025, 6, 17): 1, date(2025, 6, 18): 2})
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual((profile.current_streak, profile.last_active_date), (2, date(2025, 6, 18)))
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.workout_count, stats.custom_exercise_count), (4, 1))
+
+    def test_retry_is_deduplicated(self):
+        """Test re-sending already synced keys returns the same ids without new rows"""
+        first = sync_workouts(self.user, [offline_workout('a')])
+        second = sync_workouts(self.user, [offline_workout('a'), offline_workout('c')])
+
+        self.assertEqual(second[0], {'client_key': 'a', 'id': first[0]['id'], 'created': False})
+        self.assertTrue(second[1]['created'])
+        self.assertEqual(Workout.objects.filter(user=self.user).count(), 2)
+
+    def test_keys_are_per_user(self):
+        """Test another user's identical key does not hide this user's workout"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        sync_workouts(other, [offline_workout('a')])
+
+        synced = sync_workouts(self.user, [offline_workout('a')])
+
+        self.assertTrue(synced[0]['created'])
+        self.assertEqual(Workout.objects.get(pk=synced[0]['id']).user, self.user)
+
+    def test_invalid_batch_applies_nothing(self):
+        """Test one bad workout rejects the whole batch"""
+        with self.assertRaises(SyncError) as raised:
+            sync_workouts(self.user, [offline_workout('a'), offline_workout('b', day='yesterday')])
+
+        self.assertEqual(raised.exception.errors, ['Workout 1: date must be YYYY-MM-DD'])
+        self.assertFalse(Workout.objects.exists())
+
+    def test_client_keys_are_validated(self):
+        """Test missing and repeated keys are reported"""
+        with self.assertRaises(SyncError) as raised:
+            sync_workouts(self.user, [offline_workout(''), offline_workout('a'), offline_workout('a')])
+
+        self.assertEqual(raised.exception.errors, [
+            'Workout 0: client_key is required',
+            "Workout 2: duplicate client_key 'a'",
+        ])
+
+    def test_batch_uses_a_fixed_number_of_queries(self):
+        """Test the number of queries does not grow with the batch size"""
+        def queries(keys, first_day):
+            with CaptureQueriesContext(connection) as context:
+                sync_workouts(self.user, [
+                    offline_workout(key, day=(first_day + timedelta(days=i)).isoformat()) for i, key in enumerate(keys)
+                ])
+            return len(context)
+
+        # Each batch starts after a gap (so checks it for uncounted workouts), the second spans 30 days
+        self.assertEqual(
+            queries(['a', 'b'], date(2025, 6, 1)), queries([f'k{i}' for i in range(30)], date(2025, 6, 5))
+        )
+
+    def test_sync_view(self):
+        """Test the endpoint applies a JSON batch for the logged-in user"""
+        self.client.login(username='testuser', password='testpass123')
+        url = reverse('workout_sync')
+        body = json.dumps({'workouts': [offline_workout('a')]})
+
+        response = self.client.post(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['workouts'][0]['created'])
+
+        retry = self.client.post(url, body, content_type='application/json')
+        self.assertEqual(retry.json()['workouts'][0], {**response.json()['workouts'][0], 'created': False})
+
+    def test_sync_view_errors(self):
+        """Test bad bodies get 400 and anonymous clients get 401"""
+        url = reverse('workout_sync')
+        self.assertEqual(self.client.post(url, '[]', content_type='application/json').status_code, 401)
+
+        self.client.login(username='testuser', password='testpass123')
+        self.assertEqual(self.client.post(url, 'nope', content_type='application/json').status_code, 400)
+        response = self.client.post(url, json.dumps({'workouts': {}}), content_type='application/json')
+        self.assertEqual(response.json(), {'errors': ['workouts must be a list']})
+        self.assertEqual(self.client.get(url).status_code, 405)
@@ -0,0 +1,158 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from goals.models import Badge
+from users.models import UserProfile, UserStats
+from .models import DailyActivity, Exercise, Workout, WorkoutExercise
+from .search_utils import search_workouts
+from .template_models import TemplateExercise, WorkoutTemplate
+from .template_utils import capture_template, instantiate_template
+
+
+class TemplateUtilsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.squat = Exercise.objects.create(name='Squat', category='strength')
+        self.run = Exercise.objects.create(name='Run', category='cardio')
+        self.workout = Workout.objects.create(user=self.user, title='Legs', date=date(2025, 6, 1))
+        WorkoutExercise.objects.create(
+            workout=self.workout, exercise=self.squat, sets=5, reps=5, weight=Decimal('100'), notes='Deep'
+        )
+        WorkoutExercise.objects.create(workout=self.workout, exercise=self.run, distance=Decimal('3'))
+
+    def test_capture_template(self):
+        """Test capturing copies every exercise in order with two inserts"""
+        with self.assertNumQueries(5):
+            # SELECT exercises, SAVEPOINT, INSERT template, INSERT exercises, RELEASE
+            template = capture_template(self.workout, 'Leg Day', 'Weekly')
+
+        self.assertEqual(template.description, 'Weekly')
+        self.assertEqual(
+            list(template.exercises.values_list('exercise_id', 'sets', 'notes', 'order')),
+            [(self.squat.pk, 5, 'Deep', 0), (self.run.pk, None, '', 1)],
+        )
+
+    def test_instantiate_on_dates(self):
+        """Test a template creates one full workout per date with the derived data in sync"""
+        template = capture_template(self.workout, 'Leg Day')
+        dates = [date(2025, 6, 2), date(2025, 6, 3), date(2025, 6, 4)]
+
+        workouts = instantiate_template(template, dates)
+
+        self.assertEqual([w.date for w in workouts], dates)
+        for workout in Workout.objects.filter(pk__in=[w.pk for w in workouts]):
+            self.assertEqual(workout.title, 'Leg Day')
+            self.assertEqual(workout.notes, 'Created from template: Leg Day')
+            self.assertEqual(workout.exercise_count, 2)
+            self.assertEqual(workout.total_volume_kg, Decimal('2500.00'))
+            self.assertEqual(workout.workout_exercises.count(), 2)
+
+        self.assertEqual(DailyActivity.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(DailyActivity.objects.get(user=self.user, date=date(2025, 6, 3)).exercise_count, 2)
+        self.assertEqual(UserProfile.objects.get(user=self.user).best_streak, 4)
+        self.assertEqual(UserStats.objects.get(user=self.user).workout_count, 4)
+        self.assertEqual(len(search_workouts(self.user, 'leg day')), 3)
+
+    def test_instantiate_query_count_is_constant(self):
+        """Test a month of workouts costs the same number of queries as one"""
+        template = WorkoutTemplate.objects.create(user=self.user, name='Block')
+        TemplateExercise.objects.bulk_create([
+            TemplateExercise(template=template, exercise=self.squat, sets=3, reps=5, order=i) for i in range(8)
+        ])
+
+        with CaptureQueriesContext(connection) as one:
+            instantiate_template(template, [date(2025, 1, 1)])
+        with CaptureQueriesContext(connection) as month:
+            instantiate_template(template, [date(2025, 3, 1) + timedelta(days=i) for i in range(30)])
+
+        # bulk_create may split the exercise INSERT to fit the backend's parameter limit
+        def statements(context):
+            return [q['sql'] for q in context if not q['sql'].startswith('INSERT INTO "workouts_workoutexercise"')]
+
+        self.assertEqual(len(statements(one)), len(statements(month)))
+        self.assertEqual(WorkoutExercise.objects.filter(workout__title='Block').count(), 31 * 8)
+
+    def test_schedule_view(self):
+        """Test the schedule form creates workouts on the chosen weekdays only"""
+        template = capture_template(self.workout, 'Leg Day')
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.post(reverse('schedule_template', args=[template.pk]), {
+            'start_date': '2025-06-02',  # a Monday
+            'end_date': '2025-06-15',
+            'weekdays': ['0', '3'],
+        })
+
+        self.assertRedirects(response, reverse('workout_list'))
+        self.assertEqual(
+            list(Workout.objects.filter(title='Leg Day').order_by('date').values_list('date', flat=True)),
+            [date(2025, 6, 2), date(2025, 6, 5), date(2025, 6, 9), date(2025, 6, 12)],
+        )
+
+    def test_scheduling_future_workouts_leaves_streak_and_badges(self):
+        """Test a planned block does not count towards the streak or earn badges before it happens"""
+        template = capture_template(self.workout, 'Leg Day')
+        self.client.login(username='testuser', password='testpass123')
+        streak_fields = ['current_streak', 'best_streak', 'last_active_date']
+        before = UserProfile.objects.filter(user=self.user).values(*streak_fields).get()
+        start = timezone.localdate() + timedelta(days=10)
+
+        self.client.post(reverse('schedule_template', args=[template.pk]), {
+            'start_date': start.isoformat(),
+            'end_date': (start + timedelta(days=8)).isoformat(),
+            'weekdays': [str(day) for day in range(7)],
+        })
+
+        self.assertEqual(Workout.objects.filter(title='Leg Day').count(), 9)
+        self.assertEqual(UserProfile.objects.filter(user=self.user).values(*streak_fields).get(), before)
+        self.assertFalse(Badge.objects.filter(user=self.user).exists())
+
+        Workout.objects.create(user=self.user, title='Today', date=timezone.localdate())
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual((profile.current_streak, profile.last_active_date), (1, timezone.localdate()))
+
+    def test_schedule_view_rejects_backwards_range(self):
+        """Test an end date before the start date is a form error"""
+        template = capture_template(self.workout, 'Leg Day')
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.post(reverse('schedule_template', args=[template.pk]), {
+            'start_date': '2025-06-15', 'end_date': '2025-06-02', 'weekdays': ['0'],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'End date must be on or after the start date.')
+        self.assertFalse(Workout.objects.filter(title='Leg Day').exists())
+
+    def test_template_list_query_count_is_constant(self):
+        """Test the template list costs the same queries for 1 or 6 templates and previews the first three"""
+        self.client.login(username='testuser', password='testpass123')
+
+        def add_template(name, exercise_count):
+            template = WorkoutTemplate.objects.create(user=self.user, name=name)
+            TemplateExercise.objects.bulk_create([
+                TemplateExercise(template=template, exercise=self.squat if i else self.run, order=i)
+                for i in range(exercise_count)
+            ])
+
+        add_template('Template 0', 5)
+        with CaptureQueriesContext(connection) as one:
+            response = self.client.get(reverse('template_list'))
+        self.assertContains(response, '💪 5 exercises')
+        self.assertContains(response, '+2 more')
+        self.assertEqual([e.exercise for e in response.context['templates'][0].preview_exercises],
+                         [self.run, self.squat, self.squat])
+
+        for i in range(1, 6):
+            add_template(f'Template {i}', 5)
+        with CaptureQueriesContext(connection) as six:
+            self.client.get(reverse('template_list'))
+
+        self.assertEqual(len(one), len(six))
@@ -1,8 +1,17 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
 from datetime import date, timedelta
+from io import StringIO
+from users.models import UserProfile
 from .models import Workout
-from .utils import calculate_workout_streak
+from .utils import (
+    calculate_workout_streak, record_workout_day, record_workout_days, calculate_streaks_in_db,
+    calculate_streaks_in_python, recompute_workout_streaks
+)
 
 
 class WorkoutStreakTests(TestCase):
@@ -150,3 +159,182 @@ class WorkoutStreakTests(TestCase):
         result = calculate_workout_streak(self.user)
         self.assertEqual(result['current_streak'], 2)
         self.assertEqual(result['best_streak'], 7)
+
+
+class StoredStreakTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.today = date.today()
+
+    def get_profile(self):
+        return UserProfile.objects.get(user=self.user)
+
+    def test_new_workouts_extend_stored_streak(self):
+        """Test logging consecutive days updates the profile"""
+        for i in reversed(range(3)):
+            Workout.objects.create(user=self.user, title=f'W{i}', date=self.today - timedelta(days=i))
+
+        profile = self.get_profile()
+        self.assertEqual(profile.current_streak, 3)
+        self.assertEqual(profile.best_streak, 3)
+        self.assertEqual(profile.last_active_date, self.today)
+
+    def test_appending_workout_does_not_scan_history(self):
+        """Test the next day's workout updates the streak without a recompute"""
+        Workout.objects.create(user=self.user, title='Yesterday', date=self.today - timedelta(days=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            record_workout_day(self.user.id, self.today)
+        self.assertFalse(any('workouts_' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(self.get_profile().current_streak, 2)
+
+    def test_batch_of_days_walks_forward_without_scanning_history(self):
+        """Test a batch of consecutive later days extends the streak without reading workouts, ignoring future days"""
+        Workout.objects.create(user=self.user, title='Start', date=self.today - timedelta(days=3))
+        days = [self.today + timedelta(days=1), *(self.today - timedelta(days=i) for i in range(3))]
+
+        with CaptureQueriesContext(connection) as queries:
+            record_workout_days(self.user.id, days)
+
+        self.assertFalse(any('workouts_' in query['sql'] for query in queries.captured_queries))
+        profile = self.get_profile()
+        self.assertEqual((profile.current_streak, profile.best_streak), (4, 4))
+        self.assertEqual(profile.last_active_date, self.today)
+
+    def test_gap_restarts_the_streak(self):
+        """Test a batch with a gap restarts the count after it"""
+        Workout.objects.create(user=self.user, title='Start', date=self.today - timedelta(days=6))
+
+        record_workout_days(self.user.id, [self.today - timedelta(days=5), self.today - timedelta(days=1), self.today])
+
+        profile = self.get_profile()
+        self.assertEqual((profile.current_streak, profile.best_streak), (2, 2))
+
+    def test_planned_day_counts_once_it_has_passed(self):
+        """Test a workout planned for tomorrow joins the streak when the day after is logged"""
+        day = self.today - timedelta(days=2)
+        Workout.objects.create(user=self.user, title='Logged', date=day)
+        # Planned while it was still in the future, so it was not counted then
+        Workout.objects.create(user=self.user, title='Planned', date=self.today + timedelta(days=3))
+        Workout.objects.filter(title='Planned').update(date=day + timedelta(days=1))
+
+        Workout.objects.create(user=self.user, title='Next log', date=day + timedelta(days=2))
+
+        profile = self.get_profile()
+        self.assertEqual((profile.current_streak, profile.best_streak), (3, 3))
+        self.assertEqual(calculate_streaks_in_db([self.user.id])[self.user.id]['current_streak'], 3)
+
+    def test_default_and_datetime_dates_are_saved_as_dates(self):
+        """Test a workout created without a date, or with a datetime or string, updates the streak"""
+        workouts = [
+            Workout.objects.create(user=self.user, title='Default'),
+            Workout.objects.create(user=self.user, title='Datetime', date=timezone.now()),
+            Workout.objects.create(user=self.user, title='String', date=timezone.localdate().isoformat()),
+        ]
+
+        self.assertEqual({type(workout.date) for workout in workouts}, {date})
+        self.assertEqual(self.get_profile().last_active_date, timezone.localdate())
+
+    def test_past_dated_workout_recomputes(self):
+        """Test inserting a past workout that bridges a gap"""
+        Workout.objects.create(user=self.user, title='Today', date=self.today)
+        Workout.objects.create(user=self.user, title='Two days ago', date=self.today - timedelta(days=2))
+        self.assertEqual(self.get_profile().current_streak, 1)
+
+        Workout.objects.create(user=self.user, title='Yesterday', date=self.today - timedelta(days=1))
+        self.assertEqual(self.get_profile().current_streak, 3)
+
+    def test_deleting_only_workout_of_day_recomputes(self):
+        """Test deleting a workout that breaks the streak"""
+        workouts = [
+            Workout.objects.create(user=self.user, title=f'W{i}', date=self.today - timedelta(days=i))
+            for i in reversed(range(3))
+        ]
+        workouts[1].delete()
+
+        profile = self.get_profile()
+        self.assertEqual(profile.current_streak, 1)
+        self.assertEqual(profile.best_streak, 1)
+
+    def test_moving_workout_recomputes(self):
+        """Test changing a workout's date recomputes the streak"""
+        Workout.objects.create(user=self.user, title='Today', date=self.today)
+        workout = Workout.objects.create(user=self.user, title='Old', date=self.today - timedelta(days=5))
+
+        workout = Workout.objects.get(pk=workout.pk)
+        workout.date = self.today - timedelta(days=1)
+        workout.save()
+        self.assertEqual(self.get_profile().current_streak, 2)
+
+    def test_profile_save_keeps_streak(self):
+        """Test saving a stale profile copy does not reset the streak"""
+        stale_profile = self.get_profile()
+        Workout.objects.create(user=self.user, title='Today', date=self.today)
+
+        stale_profile.bio = 'Updated bio'
+        stale_profile.save()
+
+        profile = self.get_profile()
+        self.assertEqual(profile.bio, 'Updated bio')
+        self.assertEqual(profile.current_streak, 1)
+
+
+class DatabaseStreakTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        self.today = date.today()
+
+    def log(self, user, *days_ago):
+        for i in days_ago:
+            Workout.objects.create(user=user, title=f'W{i}', date=self.today - timedelta(days=i))
+
+    def test_islands_for_many_users_in_one_query(self):
+        """Test current and best streaks are computed per user in one query"""
+        self.log(self.user, 0, 1, 5, 6, 7, 8)
+        self.log(self.other_user, 3, 3, 4)
+
+        with self.assertNumQueries(1):
+            streaks = calculate_streaks_in_db([self.user.id, self.other_user.id])
+
+        self.assertEqual(streaks[self.user.id], {
+            'current_streak': 2, 'best_streak': 4, 'last_active_date': self.today,
+        })
+        self.assertEqual(streaks[self.other_user.id], {
+            'current_streak': 2, 'best_streak': 2, 'last_active_date': self.today - timedelta(days=3),
+        })
+
+    def test_python_fallback_matches_the_query(self):
+        """Test the fallback for other databases gives the same streaks, ignoring future days"""
+        self.log(self.user, 0, 1, 5, 6, 7, 8, -3)
+        self.log(self.other_user, 3, 3, 4)
+        user_ids = [self.user.id, self.other_user.id]
+
+        self.assertEqual(calculate_streaks_in_python(user_ids), calculate_streaks_in_db(user_ids))
+        self.assertEqual(calculate_streaks_in_python([self.user.id])[self.user.id]['last_active_date'], self.today)
+
+    def test_user_without_workouts_is_omitted(self):
+        """Test users with no workouts are not in the result"""
+        self.assertEqual(calculate_streaks_in_db([self.user.id]), {})
+
+    def test_recompute_repairs_stored_state(self):
+        """Test a full recompute fixes a drifted profile"""
+        self.log(self.user, 2, 1, 0)
+        UserProfile.objects.filter(user=self.user).update(current_streak=0, best_streak=0, last_active_date=None)
+
+        self.assertEqual(recompute_workout_streaks(), 2)
+        self.assertEqual(calculate_workout_streak(self.user), {'current_streak': 3, 'best_streak': 3})
+
+    def test_recompute_streaks_check_reports_drift(self):
+        """Test the audit command reports drift without writing"""
+        self.log(self.user, 0)
+        UserProfile.objects.filter(user=self.user).update(best_streak=9)
+
+        out = StringIO()
+        call_command('recompute_streaks', '--check', stdout=out)
+
+        self.assertIn('testuser', out.getvalue())
+        self.assertEqual(UserProfile.objects.get(user=self.user).best_streak, 9)
@@ -1,58 +1,211 @@
 from datetime import date, timedelta
 
+from django.db import connection, transaction
+from django.utils import timezone
+
 
 def calculate_workout_streak(user):
     """
-    Calculate the current workout streak for a user.
-    Returns a dictionary with current_streak and best_streak.
+    Return the current and best workout streak for a user.
+    Reads the streak state stored on the user's profile, so the cost does
+    not depend on how many workouts the user has logged.
     """
-    from workouts.models import Workout
-
-    # Get all workout dates for this user, ordered by date (oldest first)
-    workout_dates = Workout.objects.filter(user=user).values_list('date', flat=True).order_by('date').distinct()
+    from users.models import UserProfile
 
-    if not workout_dates:
+    profile = UserProfile.objects.filter(user=user).only(*UserProfile.STREAK_FIELDS).first()
+    if profile is None:
         return {'current_streak': 0, 'best_streak': 0}
 
-    # Convert to list and sort in reverse (newest first)
-    dates = sorted(list(set(workout_dates)), reverse=True)
-
-    # Calculate current streak
-    current_streak = 0
-    today = date.today()
-
-    # Check if there's a workout today or yesterday (to count ongoing streaks)
-    if dates[0] >= today - timedelta(days=1):
-        current_streak = 1
-        current_date = dates[0]
-
-        # Count consecutive days
-        for i in range(1, len(dates)):
-            # Check if this date is exactly 1 day before the previous date
-            if dates[i] == current_date - timedelta(days=1):
-                current_streak += 1
-                current_date = dates[i]
-            else:
-                # Streak broken
-                break
-
-    # Calculate best streak (all-time)
-    best_streak = 0
-    temp_streak = 1
-
-    # Go through dates in chronological order (oldest to newest)
-    dates_chronological = sorted(dates)
-
-    for i in range(1, len(dates_chronological)):
-        if dates_chronological[i] == dates_chronological[i-1] + timedelta(days=1):
-            temp_streak += 1
-            best_streak = max(best_streak, temp_streak)
-        else:
-            temp_streak = 1
-
-    best_streak = max(best_streak, temp_streak)
-
     return {
-        'current_streak': current_streak,
-        'best_streak': best_streak
+        'current_streak': profile.get_current_streak(),
+        'best_streak': profile.best_streak,
     }
+
+
+def record_workout_day(user_id, day):
+    """
+    Update the stored streak after a workout is logged on `day`.
+    Extending or restarting the latest streak is O(1); a past-dated
+    workout falls back to an exact recompute. Planned (future) workouts
+    do not count until their day comes.
+    """
+    record_workout_days(user_id, [day])
+
+
+def record_workout_days(user_id, days):
+    """
+    record_workout_day for a batch of days in a fixed number of queries.
+    Days after the latest active day are walked in order. If any is earlier,
+    or a gap between them holds workouts that were not counted yet (planned
+    days that have since passed), the streak is recomputed exactly instead.
+    """
+    from users.models import UserProfile
+    from .models import Workout
+
+    today = timezone.localdate()
+    days = sorted({day for day in days if day <= today})
+    if not days:
+        return
+
+    with transaction.atomic():
+        profile, _ = UserProfile.objects.select_for_update().get_or_create(user_id=user_id)
+        last_date = profile.last_active_date
+        if last_date is not None and days[0] < last_date:
+            recompute_workout_streak(user_id)
+            return
+
+        # Extending day by day needs no history; only a gap can hide uncounted workouts
+        edges = [last_date, *days]
+        if any(previous is None or day > previous + timedelta(days=1) for previous, day in zip(edges, days)):
+            uncounted = Workout.objects.filter(user_id=user_id, date__lt=days[-1]).exclude(date__in=days)
+            if last_date is not None:
+                uncounted = uncounted.filter(date__gt=last_date)
+            if uncounted.exists():
+                recompute_workout_streak(user_id)
+                return
+
+        current_streak, best_streak, previous = profile.current_streak, profile.best_streak, last_date
+        for day in days:
+            if day == previous:
+                continue
+            current_streak = current_streak + 1 if previous and day == previous + timedelta(days=1) else 1
+            best_streak = max(best_streak, current_streak)
+            previous = day
+        if previous == last_date:
+            return
+
+        UserProfile.objects.filter(pk=profile.pk).update(
+            current_streak=current_streak,
+            best_streak=best_streak,
+            last_active_date=previous,
+        )
+
+
+def recompute_workout_streak(user_id):
+    """Recompute the stored streak exactly for one user"""
+    recompute_workout_streaks([user_id])
+
+
+def recompute_workout_streaks(user_ids=None):
+    """
+    Recompute the stored streak state for many users (all users if None)
+    with one gaps-and-islands query per batch of users.
+    Returns the number of profiles updated.
+    """
+    from users.models import UserProfile
+
+    profiles = UserProfile.objects.only('id', 'user_id', *UserProfile.STREAK_FIELDS)
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    profiles = list(profiles)
+
+    streaks = calculate_streaks_in_db([profile.user_id for profile in profiles])
+    empty = {'current_streak': 0, 'best_streak': 0, 'last_active_date': None}
+    for profile in profiles:
+        for field, value in streaks.get(profile.user_id, empty).items():
+            setattr(profile, field, value)
+
+    UserProfile.objects.bulk_update(profiles, UserProfile.STREAK_FIELDS, batch_size=500)
+    return len(profiles)
+
+
+STREAK_ISLANDS_SQL = """
+    WITH days AS (
+        SELECT DISTINCT {user_column} AS user_id, {date_column} AS workout_day
+        FROM {table}
+        WHERE {user_column} IN ({placeholders}) AND {date_column} <= %s
+    ),
+    numbered AS (
+        SELECT user_id, workout_day,
+               ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY workout_day) AS rn
+        FROM days
+    ),
+    islands AS (
+        SELECT user_id, MAX(workout_day) AS end_day, COUNT(*) AS streak_length
+        FROM numbered
+        GROUP BY user_id, {island_key}
+    ),
+    ranked AS (
+        SELECT user_id, end_day, streak_length,
+               MAX(streak_length) OVER (PARTITION BY user_id) AS best,
+               ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY end_day DESC) AS recency
+        FROM islands
+    )
+    SELECT user_id, end_day, streak_length, best
+    FROM ranked
+    WHERE recency = 1
+"""
+
+# Consecutive days minus their row number give the same value within a streak
+ISLAND_KEYS = {
+    'postgresql': 'workout_day - CAST(rn AS integer)',
+    'sqlite': 'julianday(workout_day) - rn',
+}
+
+
+def calculate_streaks_in_db(user_ids, batch_size=500):
+    """
+    Compute streaks inside the database using the gaps-and-islands technique.
+    Returns {user_id: {'current_streak', 'best_streak', 'last_active_date'}} where
+    current_streak is the length of the latest streak ending on last_active_date.
+    Only days up to today count, so scheduled workouts never extend a streak.
+    Users without workouts are left out.
+    """
+    from .models import Workout
+
+    vendor = connection.vendor
+    if vendor not in ISLAND_KEYS:
+        return calculate_streaks_in_python(user_ids)
+
+    user_field = Workout._meta.get_field('user')
+    user_ids = list(user_ids)
+    today = timezone.localdate()
+    results = {}
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i:i + batch_size]
+            sql = STREAK_ISLANDS_SQL.format(
+                table=connection.ops.quote_name(Workout._meta.db_table),
+                user_column=connection.ops.quote_name(user_field.column),
+                date_column=connection.ops.quote_name(Workout._meta.get_field('date').column),
+                placeholders=', '.join(['%s'] * len(batch)),
+                island_key=ISLAND_KEYS[vendor],
+            )
+            cursor.execute(sql, [*batch, today])
+            for user_id, end_day, streak_length, best in cursor.fetchall():
+                if isinstance(end_day, str):
+                    end_day = date.fromisoformat(end_day)
+                results[user_id] = {
+                    'current_streak': streak_length,
+                    'best_streak': best,
+                    'last_active_date': end_day,
+                }
+
+    return results
+
+
+def calculate_streaks_in_python(user_ids):
+    """
+    Same result as calculate_streaks_in_db for databases without the islands
+    query: walks each user's distinct workout days (up to today) in order.
+    """
+    from .models import Workout
+
+    days = Workout.objects.filter(user_id__in=list(user_ids), date__lte=timezone.localdate()).order_by(
+        'user_id', 'date'
+    ).values_list('user_id', 'date').distinct()
+
+    results = {}
+    for user_id, day in days:
+        streak = results.get(user_id)
+        if streak is None:
+            results[user_id] = {'current_streak': 1, 'best_streak': 1, 'last_active_date': day}
+            continue
+        if day == streak['last_active_date'] + timedelta(days=1):
+            streak['current_streak'] += 1
+        else:
+            streak['current_streak'] = 1
+        streak['best_streak'] = max(streak['best_streak'], streak['current_streak'])
+        streak['last_active_date'] = day
+    return results
@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from goals.badge_utils import check_and_award_badges
+from goals.badge_utils import check_and_award_badges, WORKOUT_CREATED, EXERCISE_CREATED
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Q
-from django.utils import timezone
-from datetime import timedelta
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.views.decorators.http import condition, require_POST
 from .models import Workout, WorkoutExercise, Exercise
 from .forms import WorkoutForm, WorkoutExerciseFormSet, ExerciseForm
-from goals.models import Goal
+from .pagination_utils import keyset_page
+from .search_utils import search_page
+from .stats_utils import DashboardStats
 
 
 def home(request):
@@ -18,163 +20,67 @@ def home(request):
 @login_required
 def dashboard(request):
     """Dashboard view with user statistics"""
-    user = request.user
-    today = timezone.now().date()
-
-    # Get workouts
-    workouts = Workout.objects.filter(user=user).order_by('-date')
-    workouts_count = workouts.count()
-
-    # This month's workouts
-    first_day_of_month = today.replace(day=1)
-    workouts_this_month = workouts.filter(date__gte=first_day_of_month).count()
-
-    # Total training time this month
-    total_time = workouts.filter(date__gte=first_day_of_month).aggregate(
-        total=Sum('duration')
-    )['total'] or 0
-
-    # Calculate workout streak
-    current_streak = 0
-    best_streak = 0
-    temp_streak = 0
-
-    if workouts.exists():
-        workout_dates = set(workouts.values_list('date', flat=True))
-        check_date = today
-
-        # Current streak
-        while check_date in workout_dates:
-            current_streak += 1
-            check_date -= timedelta(days=1)
-
-        # Best streak
-        all_dates = sorted(workout_dates, reverse=True)
-        if all_dates:
-            temp_streak = 1
-            for i in range(len(all_dates) - 1):
-                if (all_dates[i] - all_dates[i + 1]).days == 1:
-                    temp_streak += 1
-                    best_streak = max(best_streak, temp_streak)
-                else:
-                    temp_streak = 1
-            best_streak = max(best_streak, temp_streak, current_streak)
-
-    # Get active goals
-    active_goals = Goal.objects.filter(user=user, is_completed=False).order_by('target_date')
-    goals_count = active_goals.count()
-
-    # Calculate average goal progress
-    if goals_count > 0:
-        total_progress = 0
-        valid_goals = 0
-        for goal in active_goals:
-            goal_progress = goal.progress_percentage
-            total_progress += goal_progress
-            valid_goals += 1
-        avg_progress = total_progress / valid_goals if valid_goals > 0 else 0
-    else:
-        avg_progress = 0
-
-    # Get goals with progress for template
-    goals_with_progress = []
-    for goal in active_goals[:3]:
-        goal.progress = goal.progress_percentage
-        goals_with_progress.append(goal)
+    stats = DashboardStats.for_user(request.user)
 
     # Check if streak notification should be shown (once per session)
     show_streak_notification = False
-    if best_streak >= 3 and 'streak_notification_shown' not in request.session:
+    if stats.best_streak >= 3 and 'streak_notification_shown' not in request.session:
         request.session['streak_notification_shown'] = True
         show_streak_notification = True
 
-    # Recent workouts
-    recent_workouts = workouts[:5]
-    for workout in recent_workouts:
-        workout.total_exercises = workout.workout_exercises.count()
-
-    # Weekly activity data for chart
-    week_start = today - timedelta(days=today.weekday())  # Monday
-    week_data = []
-    day_labels = []
-
-    for i in range(7):
-        day = week_start + timedelta(days=i)
-        day_workouts = workouts.filter(date=day)
-        total_duration = day_workouts.aggregate(total=Sum('duration'))['total'] or 0
-
-        week_data.append(total_duration)
-        day_labels.append(day.strftime('%a'))  # Mon, Tue, Wed, etc.
-
-    # Weekly stats
-    weekly_total = sum(week_data)
-    weekly_average = weekly_total / 7 if weekly_total > 0 else 0
-    max_day_duration = max(week_data) if week_data else 0
-    max_day_index = week_data.index(max_day_duration) if max_day_duration > 0 else None
-    most_active_day = day_labels[max_day_index] if max_day_index is not None else None
-
-    context = {
-        'workouts_count': workouts_count,
-        'workouts_this_month': workouts_this_month,
-        'total_time': total_time,
-        'current_streak': current_streak,
-        'best_streak': best_streak,
-        'active_goals': goals_with_progress,
-        'goals_count': goals_count,
-        'goals_progress': int(avg_progress),
-        'recent_workouts': recent_workouts,
-        'show_streak_notification': show_streak_notification,
-        # Chart data
-        'week_labels': day_labels,
-        'week_data': week_data,
-        'weekly_total': weekly_total,
-        'weekly_average': int(weekly_average),
-        'most_active_day': most_active_day,
-        'max_day_duration': int(max_day_duration),
-    }
+    context = stats.as_context()
+    context['show_streak_notification'] = show_streak_notification
 
     return render(request, 'pages/dashboard.html', context)
 
 
 @login_required
 def workout_list(request):
-    """List all workouts for the logged-in user with search and filters"""
+    """List the logged-in user's workouts with search, filters and keyset pagination"""
     workouts = Workout.objects.filter(user=request.user)
 
-    # Search by title or exercise name
     search_query = request.GET.get('search', '')
-    if search_query:
-        workouts = workouts.filter(
-            Q(title__icontains=search_query) |
-            Q(workout_exercises__exercise__name__icontains=search_query)
-        ).distinct()
-
-    # Filter by date range
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
-
-    if date_from:
-        workouts = workouts.filter(date__gte=date_from)
-    if date_to:
-        workouts = workouts.filter(date__lte=date_to)
-
-    # Filter by category (exercise category)
     category = request.GET.get('category', '')
-    if category:
-        workouts = workouts.filter(workout_exercises__exercise__category=category).distinct()
+    cursor = request.GET.get('cursor')
 
-    # Order by date
-    workouts = workouts.order_by('-date')
+    # Only the columns the list shows; exercise counts and totals are stored on the workout
+    columns = ('id', 'title', 'date', 'duration', 'notes', *Workout.SUMMARY_FIELDS)
+    if search_query:
+        # Search goes through the full-text index, which applies the filters and
+        # returns one page of ids best match first
+        ranked_ids, next_cursor = search_page(
+            request.user, search_query, cursor, date_from=date_from, date_to=date_to, category=category
+        )
+        rank = {workout_id: position for position, workout_id in enumerate(ranked_ids)}
+        page = sorted(workouts.filter(pk__in=ranked_ids).only(*columns), key=lambda workout: rank[workout.pk])
+    else:
+        # Filter by date range
+        if date_from:
+            workouts = workouts.filter(date__gte=date_from)
+        if date_to:
+            workouts = workouts.filter(date__lte=date_to)
+
+        # Filter by category (exercise category); EXISTS keeps rows unique and counts exact
+        if category:
+            workouts = workouts.filter(
+                Exists(WorkoutExercise.objects.filter(workout=OuterRef('pk'), exercise__category=category))
+            )
+        page, next_cursor = keyset_page(workouts.only(*columns), cursor)
 
-    # Add exercise count to each workout
-    for workout in workouts:
-        workout.total_exercises = workout.workout_exercises.count()
+    # Keep the filters when following the next-page link
+    filters = request.GET.copy()
+    filters.pop('cursor', None)
 
     # Get available categories for filter dropdown
     categories = Exercise.CATEGORY_CHOICES
 
     context = {
-        'workouts': workouts,
+        'workouts': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+        'filter_query': filters.urlencode(),
         'search_query': search_query,
         'date_from': date_from,
         'date_to': date_to,
@@ -200,15 +106,16 @@ def workout_create(request):
         formset = WorkoutExerciseFormSet(request.POST, form_kwargs={'user': request.user})
 
         if form.is_valid() and formset.is_valid():
-            workout = form.save(commit=False)
-            workout.user = request.user
-            workout.save()
+            with transaction.atomic():
+                workout = form.save(commit=False)
+                workout.user = request.user
+                workout.save()
 
-            formset.instance = workout
-            formset.save()
+                formset.instance = workout
+                formset.save()
 
             # Check for new badges
-            check_and_award_badges(request.user, request)
+            check_and_award_badges(request.user, request, event=WORKOUT_CREATED)
 
             messages.success(request, f'Workout "{workout.title}" created successfully! 🎉')
             return redirect('dashboard')
@@ -233,8 +140,9 @@ def workout_update(request, pk):
         formset = WorkoutExerciseFormSet(request.POST, instance=workout, form_kwargs={'user': request.user})
 
         if form.is_valid() and formset.is_valid():
-            form.save()
-            formset.save()
+            with transaction.atomic():
+                form.save()
+                formset.save()
 
             messages.success(request, f'Workout "{workout.title}" updated successfully! ✅')
             return redirect('dashboard')
@@ -303,7 +211,7 @@ def exercise_create(request):
             exercise.save()
 
             # Check for new badges
-            check_and_award_badges(request.user, request)
+            check_and_award_badges(request.user, request, event=EXERCISE_CREATED)
 
             messages.success(request, f'Exercise "{exercise.name}" created successfully! ✨')
             return redirect('exercise_library')
@@ -394,34 +302,145 @@ def badges(request):
     return render(request, 'pages/badges.html', context)
 
 
+@login_required
+def workout_import(request):
+    """Import workouts from an uploaded CSV or JSON Lines file"""
+    import io
+    from .forms import WorkoutImportForm
+    from .import_utils import guess_format, import_workouts
+
+    if request.method == 'POST':
+        form = WorkoutImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            file_format = form.cleaned_data['file_format'] or guess_format(upload.name)
+
+            # Decode the upload as a stream so large files are never read into memory at once
+            lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace', newline='')
+            result = import_workouts(request.user, lines, file_format=file_format)
+
+            if result.workouts_created:
+                check_and_award_badges(request.user, request, event=WORKOUT_CREATED)
+                messages.success(
+                    request,
+                    f'Imported {result.workouts_created} workouts with {result.exercises_created} exercises! 📥'
+                )
+            if result.skipped:
+                messages.warning(request, f'Skipped {result.skipped} workouts with errors.')
+                return render(request, 'workouts/workout_import.html', {'form': form, 'errors': result.errors})
+            return redirect('workout_list')
+    else:
+        form = WorkoutImportForm()
+
+    return render(request, 'workouts/workout_import.html', {'form': form})
+
+
+@require_POST
+def workout_sync(request):
+    """
+    JSON endpoint for offline clients: apply a batch of workouts in one request.
+    Body: {"workouts": [{"client_key": "...", "date": ..., "title": ..., "exercises": [...]}]}
+    """
+    import json
+    from django.http import JsonResponse
+    from .sync_utils import SyncError, sync_workouts
+
+    if not request.user.is_authenticated:
+        return JsonResponse({'errors': ['Authentication required']}, status=401)
+    try:
+        payload = json.loads(request.body)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return JsonResponse({'errors': ['Request body must be JSON']}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'errors': ['Request body must be a JSON object']}, status=400)
+
+    try:
+        synced = sync_workouts(request.user, payload.get('workouts'))
+    except SyncError as exc:
+        return JsonResponse({'errors': exc.errors}, status=400)
+
+    if any(item['created'] for item in synced):
+        check_and_award_badges(request.user, event=WORKOUT_CREATED)
+    return JsonResponse({'workouts': synced})
+
+
 @login_required
 def export_workouts_pdf(request):
-    """Export user's workouts to PDF"""
-    from django.http import HttpResponse
-    from .pdf_utils import generate_workouts_pdf
-    from datetime import datetime
+    """
+    Download the user's workouts as a PDF, rendered in the background and cached.
+    ?mode=detailed lists every exercise and adds per-exercise summaries.
+    """
+    from .export_utils import serve_export
 
-    workouts = Workout.objects.filter(user=request.user).order_by('-date')
+    return serve_export(request, 'detailed' if request.GET.get('mode') == 'detailed' else 'workouts')
 
-    # Generate PDF
-    pdf_buffer = generate_workouts_pdf(workouts, request.user)
 
-    # Create response
-    response = HttpResponse(pdf_buffer, content_type='application/pdf')
-    filename = f"FitTrack_Workouts_{datetime.now().strftime('%Y%m%d')}.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+@login_required
+def export_workouts_data(request, file_format):
+    """
+    Stream the user's full workout and exercise history as CSV or JSON Lines,
+    in the same format the importer reads
+    """
+    from datetime import datetime
+    from django.http import Http404, StreamingHttpResponse
+    from .data_export_utils import DATA_EXPORT_FORMATS, iter_data_export
 
-    messages.success(request, 'Workouts exported successfully! 📄')
+    if file_format not in DATA_EXPORT_FORMATS:
+        raise Http404("Unknown export format")
 
+    response = StreamingHttpResponse(
+        iter_data_export(request.user, file_format), content_type=DATA_EXPORT_FORMATS[file_format]
+    )
+    filename = f"FitTrack_Workouts_{datetime.now().strftime('%Y%m%d')}.{file_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
 
+@login_required
+def export_status(request, kind):
+    """'Preparing your export' page, refreshed until the PDF is ready"""
+    from django.http import Http404
+    from jobs.models import Task
+    from .export_utils import (
+        EXPORT_KINDS, EXPORT_LABELS, EXPORT_POLL_SECONDS, export_download_url, export_path, export_task,
+        export_version, request_export,
+    )
+
+    if kind not in EXPORT_KINDS:
+        raise Http404("Unknown export")
+
+    ready = export_path(request.user.pk, kind, export_version(request.user.pk, kind)).exists()
+    task = None if ready else export_task(request.user.pk, kind)
+    failed = task is not None and task.status == Task.STATUS_FAILED
+    if not ready and not failed:
+        # The data may have changed after the last render finished, leaving no
+        # current file and nothing queued, so make sure a render is on its way
+        ready = request_export(request.user.pk, kind) is not None
+
+    return render(request, 'workouts/export_status.html', {
+        'kind': kind,
+        'label': EXPORT_LABELS[kind],
+        'ready': ready,
+        'failed': failed,
+        'download_url': export_download_url(kind),
+        'poll_seconds': EXPORT_POLL_SECONDS,
+    })
+
+
 @login_required
 def template_list(request):
     """List all workout templates for the user"""
-    from .template_models import WorkoutTemplate
-
-    templates = WorkoutTemplate.objects.filter(user=request.user)
+    from django.db.models import Count, Prefetch
+    from .template_models import TemplateExercise, WorkoutTemplate
+
+    # One query for the cards with their exercise counts, one for every card's first three exercises
+    templates = WorkoutTemplate.objects.filter(user=request.user).annotate(
+        exercise_total=Count('exercises')
+    ).prefetch_related(Prefetch(
+        'exercises',
+        queryset=TemplateExercise.objects.select_related('exercise')[:3],
+        to_attr='preview_exercises',
+    ))
 
     context = {
         'templates': templates,
@@ -433,7 +452,7 @@ def template_list(request):
 @login_required
 def save_as_template(request, pk):
     """Save an existing workout as a template"""
-    from .template_models import WorkoutTemplate, TemplateExercise
+    from .template_utils import capture_template
 
     workout = get_object_or_404(Workout, pk=pk, user=request.user)
 
@@ -442,26 +461,7 @@ def save_as_template(request, pk):
         template_description = request.POST.get('template_description', '')
 
         if template_name:
-            # Create template
-            template = WorkoutTemplate.objects.create(
-                user=request.user,
-                name=template_name,
-                description=template_description
-            )
-
-            # Copy exercises from workout to template
-            for workout_exercise in workout.workout_exercises.all():
-                TemplateExercise.objects.create(
-                    template=template,
-                    exercise=workout_exercise.exercise,
-                    sets=workout_exercise.sets,
-                    reps=workout_exercise.reps,
-                    weight=workout_exercise.weight,
-                    unit=workout_exercise.unit,
-                    distance=workout_exercise.distance,
-                    duration=workout_exercise.duration,
-                    notes=workout_exercise.notes,
-                )
+            capture_template(workout, template_name, template_description)
 
             messages.success(request, f'Template "{template_name}" created successfully! 📋')
             return redirect('template_list')
@@ -473,36 +473,43 @@ def save_as_template(request, pk):
 def use_template(request, pk):
     """Create a new workout from a template"""
     from .template_models import WorkoutTemplate
+    from .template_utils import instantiate_template
     from django.utils import timezone
 
     template = get_object_or_404(WorkoutTemplate, pk=pk, user=request.user)
 
-    # Create new workout from template
-    workout = Workout.objects.create(
-        user=request.user,
-        title=template.name,
-        date=timezone.now().date(),
-        notes=f"Created from template: {template.name}"
-    )
-
-    # Copy exercises from template to workout
-    for template_exercise in template.exercises.all():
-        WorkoutExercise.objects.create(
-            workout=workout,
-            exercise=template_exercise.exercise,
-            sets=template_exercise.sets,
-            reps=template_exercise.reps,
-            weight=template_exercise.weight,
-            unit=template_exercise.unit,
-            distance=template_exercise.distance,
-            duration=template_exercise.duration,
-            notes=template_exercise.notes,
-        )
+    workout = instantiate_template(template, [timezone.now().date()])[0]
 
     messages.success(request, f'Workout created from template "{template.name}"! You can now edit it. ✅')
     return redirect('workout_update', pk=workout.pk)
 
 
+@login_required
+def schedule_template(request, pk):
+    """Create a block of workouts from a template on the chosen days"""
+    from django.utils import timezone
+    from .forms import TemplateScheduleForm
+    from .template_models import WorkoutTemplate
+    from .template_utils import instantiate_template
+
+    template = get_object_or_404(WorkoutTemplate, pk=pk, user=request.user)
+
+    if request.method == 'POST':
+        form = TemplateScheduleForm(request.POST)
+        if form.is_valid():
+            workouts = instantiate_template(template, form.cleaned_data['dates'])
+            # A block planned entirely in the future earns nothing until it is done
+            if form.cleaned_data['dates'][0] <= timezone.localdate():
+                check_and_award_badges(request.user, request, event=WORKOUT_CREATED)
+
+            messages.success(request, f'Scheduled {len(workouts)} workouts from "{template.name}"! 📅')
+            return redirect('workout_list')
+    else:
+        form = TemplateScheduleForm()
+
+    return render(request, 'workouts/template_schedule.html', {'template': template, 'form': form})
+
+
 @login_required
 def template_delete(request, pk):
     """Delete a workout template"""
@@ -521,14 +528,23 @@ def template_delete(request, pk):
 
 @login_required
 def workout_calendar(request):
-    """Display workouts in a calendar view"""
+    """Display workouts in a month calendar, or a 12-month heatmap with ?view=year"""
     from datetime import datetime
     from calendar import monthrange
+    from .heatmap_utils import activity_by_month, shift_month, year_heatmap
 
     # Get month/year from query params or use current
     year = int(request.GET.get('year', datetime.now().year))
     month = int(request.GET.get('month', datetime.now().month))
 
+    if request.GET.get('view') == 'year':
+        # The heatmap covers the 12 months ending with the selected one
+        context = year_heatmap(request.user, year, month)
+        context['month'], context['year'] = month, year
+        context['prev_year'], context['prev_month'] = shift_month(year, month, -12)
+        context['next_year'], context['next_month'] = shift_month(year, month, 12)
+        return render(request, 'workouts/calendar_year.html', context)
+
     # Get first and last day of month
     first_day = datetime(year, month, 1).date()
     days_in_month = monthrange(year, month)[1]
@@ -549,6 +565,10 @@ def workout_calendar(request):
             workouts_by_date[date_key] = []
         workouts_by_date[date_key].append(workout)
 
+    # Daily totals come from the rollup table, cached once the month is over
+    activity = activity_by_month(request.user, [(year, month)])[(year, month)]
+    minutes_by_date = {day: total_minutes for day, (_, total_minutes) in activity.items()}
+
     # Calculate calendar grid
     first_weekday = first_day.weekday()  # Monday = 0
 
@@ -570,7 +590,7 @@ def workout_calendar(request):
             'date': current_date,
             'workouts': day_workouts,
             'is_today': current_date == datetime.now().date(),
-            'total_duration': sum(w.duration or 0 for w in day_workouts)
+            'total_duration': minutes_by_date.get(current_date, 0)
         })
 
     # Calculate previous and next month
@@ -598,7 +618,41 @@ def workout_calendar(request):
         'next_month': next_month,
         'next_year': next_year,
         'total_workouts': len(workouts),
-        'total_duration': sum(w.duration or 0 for w in workouts),
+        'total_duration': sum(minutes_by_date.values()),
     }
 
     return render(request, 'workouts/calendar.html', context)
+
+
+def _calendar_feed(request, token):
+    """(owner, (etag, last_modified)) for a feed token, looked up once per request"""
+    from users.models import UserProfile
+    from .ical_utils import feed_state
+
+    if not hasattr(request, '_calendar_feed'):
+        profile = UserProfile.objects.select_related('user').filter(calendar_token=token).first()
+        user = profile.user if profile else None
+        request._calendar_feed = (user, feed_state(user) if user else (None, None))
+    return request._calendar_feed
+
+
+@condition(
+    etag_func=lambda request, token: _calendar_feed(request, token)[1][0],
+    last_modified_func=lambda request, token: _calendar_feed(request, token)[1][1],
+)
+def workout_calendar_feed(request, token):
+    """
+    Read-only iCalendar feed of a user's workouts, authenticated by the token in the URL.
+    Unchanged feeds answer 304 from the ETag/Last-Modified check before any body is built.
+    """
+    from django.http import Http404, StreamingHttpResponse
+    from .ical_utils import iter_calendar
+
+    user = _calendar_feed(request, token)[0]
+    if user is None:
+        raise Http404("Unknown calendar feed")
+
+    domain = request.get_host().split(':')[0]
+    response = StreamingHttpResponse(iter_calendar(user, domain), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="workouts.ics"'
+    return response